@@ -0,0 +1,83 @@
+"""
+Memory benchmark: plain job dictionaries vs JobRecord
+
+Builds the same synthetic jobs twice - once as the dictionaries the scraper
+used to produce and once as JobRecord objects - and reports the memory held
+by each with tracemalloc.
+
+Usage:
+    python benchmarks/bench_job_record_memory.py [--jobs 100000]
+"""
+import argparse
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper.job_record import JobRecord
+
+COMPANIES = [f"Company {i} Ltd" for i in range(500)]
+LOCATIONS = ["London", "Manchester", "Remote", "Leeds", "Bristol", "Edinburgh", "Hybrid remote in London"]
+DATES = [f"Posted {i} days ago" for i in range(1, 31)] + ["Just posted", "Not specified"]
+
+def fresh(text):
+    """Return an equal but distinct string object, as BeautifulSoup would"""
+    return (text + ".")[:-1]
+
+def synthetic_jobs(count, seed=0):
+    """Yield synthetic job field tuples with realistic repetition"""
+    rng = random.Random(seed)
+    for i in range(count):
+        yield (
+            fresh(f"Data Engineer {i % 200}"),
+            fresh(rng.choice(COMPANIES)),
+            fresh(rng.choice(LOCATIONS)),
+            fresh(rng.choice(DATES)),
+            fresh(f"https://uk.indeed.com/rc/clk?jk={i:016x}"),
+            {
+                fresh("experience_level"): fresh(rng.choice(["Not specified", "2+ years", "3-5 years"])),
+                fresh("education"): fresh(rng.choice(["Not specified", "Bachelor's degree"])),
+            },
+        )
+
+def measure(build, count):
+    """Return (bytes held, jobs) for the container built by build()"""
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    jobs = build(count)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return after - before, jobs
+
+def build_dicts(count):
+    return [
+        {'title': t, 'company': c, 'location': l, 'date_posted': d, 'url': u, 'description': "", 'ai_data': a}
+        for t, c, l, d, u, a in synthetic_jobs(count)
+    ]
+
+def build_records(count):
+    return [
+        JobRecord(title=t, company=c, location=l, date_posted=d, url=u, ai_data=a)
+        for t, c, l, d, u, a in synthetic_jobs(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description='JobRecord memory benchmark')
+    parser.add_argument('--jobs', type=int, default=100000, help='Number of synthetic jobs (default: 100000)')
+    args = parser.parse_args()
+
+    dict_bytes, dict_jobs = measure(build_dicts, args.jobs)
+    del dict_jobs
+    record_bytes, record_jobs = measure(build_records, args.jobs)
+    assert record_jobs[0].to_dict().keys() == set(JobRecord.FIELDS)
+    del record_jobs
+
+    print(f"Jobs:            {args.jobs:,}")
+    print(f"dict:            {dict_bytes / 1024 / 1024:8.1f} MiB  ({dict_bytes / args.jobs:6.0f} bytes/job)")
+    print(f"JobRecord:       {record_bytes / 1024 / 1024:8.1f} MiB  ({record_bytes / args.jobs:6.0f} bytes/job)")
+    print(f"Saving per job:  {(dict_bytes - record_bytes) / args.jobs:6.0f} bytes ({100 * (1 - record_bytes / dict_bytes):.0f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+End-to-end throughput benchmark against the offline ScrapingBee stand-in
+
+Starts benchmarks/mock_scrapingbee.py in-process, points
+ScrapingBeeIndeedScraper at it and runs one search per configuration with
+all delays set to zero, reporting jobs per second and request tail latency
+from the scraper's own metrics registry. Output files are written to a
+temporary directory. With --request-timeout below --slow-seconds, slow
+requests time out, so timeouts are mixed with HTTP responses in the
+metrics, the Prometheus export and the run summary.
+
+Usage:
+    python benchmarks/bench_throughput.py [--jobs 60] [--latency-median 0.05] [--rate-429 0.02]
+    python benchmarks/bench_throughput.py --slow-rate 0.1 --slow-seconds 3 --request-timeout 1
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from mock_scrapingbee import MockConfig, MockScrapingBee
+
+# (name, fetch_descriptions, use_ai_extraction)
+CONFIGURATIONS = [
+    ('listing only', False, False),
+    ('descriptions', True, False),
+    ('descriptions + AI', True, True),
+]
+
+def format_seconds(value):
+    return f"{value * 1000:7.1f}ms" if value is not None else "    n/a"
+
+def run_configuration(scraper_class, api_url, name, fetch_descriptions, use_ai_extraction, max_jobs,
+                      request_timeout=None):
+    """Run one search and return its throughput and latency figures"""
+    from scraper.metrics_server import render_prometheus
+    scraper = scraper_class(api_key='benchmark', api_url=api_url)
+    if request_timeout is not None:
+        scraper.request_timeout = request_timeout
+    start_time = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        jobs = sum(1 for _ in scraper.iter_indeed_jobs(
+            'data engineer', 'london',
+            fetch_descriptions=fetch_descriptions,
+            use_ai_extraction=use_ai_extraction,
+            max_jobs=max_jobs,
+            delay_between_pages=0,
+            delay_between_jobs=0
+        ))
+    elapsed = time.perf_counter() - start_time
+    # Every exporter must handle the mix of HTTP and timeout / error statuses
+    render_prometheus(scraper.metrics)
+    scraper.metrics.snapshot()
+
+    latencies = {}
+    for page_type in ('search', 'job', 'ai'):
+        histogram = scraper.metrics.histogram('request_latency_seconds', page_type=page_type)
+        if histogram is not None:
+            latencies[page_type] = histogram
+    requests_made = sum(histogram.count for histogram in latencies.values())
+    merged = sorted(sample for histogram in latencies.values() for sample in histogram._samples)
+
+    def percentile(q):
+        if not merged:
+            return None
+        return merged[max(0, -(-q * len(merged) // 100) - 1)]
+
+    return {
+        'name': name,
+        'jobs': jobs,
+        'requests': requests_made,
+        'errors': scraper.metrics.counter_total('errors_total'),
+        'timeouts': scraper.metrics.counter('errors_total', type='timeout'),
+        'seconds': elapsed,
+        'jobs_per_second': jobs / elapsed if elapsed else 0.0,
+        'p50': percentile(50),
+        'p95': percentile(95),
+        'p99': percentile(99),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end scraper throughput benchmark')
+    parser.add_argument('--jobs', type=int, default=60, help='Jobs per configuration (default: 60)')
+    parser.add_argument('--latency-median', type=float, default=0.05, help='Mock median latency in seconds (default: 0.05)')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Mock log-normal latency shape (default: 0.5)')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Fraction of very slow requests (default: 0)')
+    parser.add_argument('--slow-seconds', type=float, default=5.0, help='Latency of slow requests (default: 5)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses (default: 0)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of HTTP 429 responses (default: 0)')
+    parser.add_argument('--max-concurrency', type=int, default=None, help='Mock concurrent request cap (default: none)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--request-timeout', type=float, default=None,
+                        help='Scraper request timeout in seconds (default: the scraper\'s own)')
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+        slow_rate=args.slow_rate, slow_seconds=args.slow_seconds,
+        error_rate=args.error_rate, rate_429=args.rate_429,
+        max_concurrency=args.max_concurrency, total_jobs=max(args.jobs, 15), seed=args.seed
+    )
+    server = MockScrapingBee(config).start()
+
+    # The scraper writes data/ and logs/ relative to the working directory
+    workdir = tempfile.mkdtemp(prefix='bench_throughput_')
+    os.chdir(workdir)
+    from scraper.core import ScrapingBeeIndeedScraper
+    from scraper.logging_utils import logger
+    logger.setLevel(logging.ERROR)
+
+    results = []
+    try:
+        for name, fetch_descriptions, use_ai_extraction in CONFIGURATIONS:
+            results.append(run_configuration(
+                ScrapingBeeIndeedScraper, server.api_url, name,
+                fetch_descriptions, use_ai_extraction, args.jobs, args.request_timeout
+            ))
+    finally:
+        server.stop()
+
+    print(f"Mock: median {args.latency_median}s, sigma {args.latency_sigma}, "
+          f"500 rate {args.error_rate}, 429 rate {args.rate_429}, cap {args.max_concurrency}, "
+          f"slow rate {args.slow_rate} ({args.slow_seconds}s), request timeout {args.request_timeout}")
+    print(f"{'configuration':<20} {'jobs':>5} {'reqs':>5} {'errs':>5} {'t/o':>5} {'secs':>7} {'jobs/s':>8} "
+          f"{'p50':>9} {'p95':>9} {'p99':>9}")
+    for result in results:
+        print(f"{result['name']:<20} {result['jobs']:>5} {result['requests']:>5} {result['errors']:>5} {result['timeouts']:>5} "
+              f"{result['seconds']:>7.2f} {result['jobs_per_second']:>8.1f} "
+              f"{format_seconds(result['p50'])} {format_seconds(result['p95'])} {format_seconds(result['p99'])}")
+    print(f"Mock served {server.stats['requests']} requests: {server.stats['by_status']}, "
+          f"max in flight {server.stats['max_in_flight']}")
+    print(f"Output written to {workdir}")
+
+if __name__ == "__main__":
+    main()
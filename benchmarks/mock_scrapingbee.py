@@ -0,0 +1,311 @@
+"""
+Offline stand-in for the ScrapingBee API
+
+Serves synthetic Indeed search result pages, job pages and AI-extraction
+headers on /api/v1/, with configurable latency, error rates and a
+concurrency cap, so the scraper can be benchmarked without spending credits.
+
+Usage:
+    python benchmarks/mock_scrapingbee.py --port 8999 --latency-median 1.5 --rate-429 0.02
+    SCRAPINGBEE_API_URL=http://127.0.0.1:8999/api/v1/ python main.py --job "data engineer"
+"""
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, urlencode
+
+JOBS_PER_PAGE = 15
+
+COMPANIES = ["Acme Analytics", "Globex", "Initech", "Umbrella Recruitment", "Hooli", "Stark Industries"]
+LOCATIONS = ["London", "Remote", "Hybrid remote in London", "Manchester", "Leeds"]
+JOB_TYPES = ["fulltime", "permanent", "contract", "parttime", "temporary", "internship"]
+SKILLS = ["Python", "SQL", "Spark", "Airflow", "AWS", "Docker", "Kubernetes", "dbt", "Pandas", "PyTorch"]
+
+BOILERPLATE = (
+    "We are an equal opportunities employer and welcome applications from all suitably "
+    "qualified persons regardless of their race, sex, disability, religion/belief, sexual "
+    "orientation or age. Umbrella Recruitment is acting as an Employment Agency in relation to this vacancy."
+)
+
+class MockConfig:
+    """Behaviour of the stand-in server"""
+
+    def __init__(self, latency_median=0.2, latency_sigma=0.5, slow_rate=0.0, slow_seconds=30.0,
+                 error_rate=0.0, rate_429=0.0, max_concurrency=None, total_jobs=150, seed=None, credits=None,
+                 page_cap=None):
+        """
+        Args:
+            latency_median (float): Median response latency in seconds (log-normal distribution)
+            latency_sigma (float): Log-normal shape parameter - larger means a heavier tail
+            slow_rate (float): Fraction of requests that take slow_seconds instead (stuck renders)
+            slow_seconds (float): Latency of slow requests
+            error_rate (float): Fraction of requests answered with HTTP 500
+            rate_429 (float): Fraction of requests answered with HTTP 429
+            max_concurrency (int): Concurrent requests allowed before answering 429 (None = unlimited)
+            total_jobs (int): Jobs available for every search
+            seed (int): Random seed for reproducible runs
+            credits (int): Account credits; when set, responses report the remaining credits
+                and requests are refused with HTTP 401 once they run out (None = unlimited)
+            page_cap (int): Results pages served per query before pagination stops, like
+                Indeed's depth limit (None = unlimited)
+        """
+        self.latency_median = latency_median
+        self.latency_sigma = latency_sigma
+        self.slow_rate = slow_rate
+        self.slow_seconds = slow_seconds
+        self.error_rate = error_rate
+        self.rate_429 = rate_429
+        self.max_concurrency = max_concurrency
+        self.total_jobs = total_jobs
+        self.random = random.Random(seed)
+        self.credits = credits
+        self.max_credits = credits
+        self.page_cap = page_cap
+
+    def sample_latency(self):
+        if self.slow_rate and self.random.random() < self.slow_rate:
+            return self.slow_seconds
+        if self.latency_median <= 0:
+            return 0.0
+        return self.random.lognormvariate(math.log(self.latency_median), self.latency_sigma)
+
+def job_key_for(query, location, index):
+    return hashlib.sha1(f"{query}|{location}|{index}".encode('utf-8')).hexdigest()[:16]
+
+def job_attributes(query, location, index):
+    """Job type, age in days and distance in miles of a synthetic job"""
+    rng = random.Random(f"{query}|{location}|{index}")
+    return rng.choice(JOB_TYPES), rng.randint(1, 30), rng.randint(0, 25)
+
+def matching_jobs(query, location, total_jobs, filters):
+    """Indexes of the jobs a search returns under Indeed's jt / fromage / radius filters"""
+    if not filters:
+        return range(total_jobs)
+    indexes = []
+    for index in range(total_jobs):
+        job_type, age, distance = job_attributes(query, location, index)
+        if 'jt' in filters and job_type != filters['jt']:
+            continue
+        if 'fromage' in filters and age > int(filters['fromage']):
+            continue
+        if 'radius' in filters and distance > int(filters['radius']):
+            continue
+        indexes.append(index)
+    return indexes
+
+def render_search_page(base_url, query, location, start, total_jobs, filters=None, page_cap=None):
+    """Synthetic Indeed search results page using the selectors the scraper parses"""
+    filters = filters or {}
+    indexes = matching_jobs(query, location, total_jobs, filters)
+    rng = random.Random(f"{query}|{location}|{start}")
+    cards = []
+    for index in indexes[start:start + JOBS_PER_PAGE]:
+        job_key = job_key_for(query, location, index)
+        age = job_attributes(query, location, index)[1]
+        cards.append(
+            '<div class="job_seen_beacon">'
+            f'<h2 class="jobTitle"><span>{query.title()} {index}</span></h2>'
+            f'<span data-testid="company-name">{rng.choice(COMPANIES)}</span>'
+            f'<div data-testid="text-location">{rng.choice(LOCATIONS)}</div>'
+            f'<span class="date">Posted {age} days ago</span>'
+            f'<a class="jcs-JobTitle" href="/rc/clk?jk={job_key}&amp;from=serp">{query.title()}</a>'
+            '</div>'
+        )
+    canonical = f"{base_url}/jobs?{urlencode(dict(filters, q=query, l=location, start=start))}"
+    pagination = ''
+    next_start = start + JOBS_PER_PAGE
+    if next_start < len(indexes) and (page_cap is None or next_start < page_cap * JOBS_PER_PAGE):
+        next_href = f"/jobs?{urlencode(dict(filters, q=query, l=location, start=next_start))}"
+        pagination = f'<nav role="navigation"><a aria-label="Next Page" href="{next_href}">Next</a></nav>'
+    return (
+        f'<html><head><link rel="canonical" href="{canonical}"></head><body>'
+        f'<div class="jobsearch-JobCountAndSortPane-jobCount"><span>{len(indexes)} jobs</span></div>'
+        + ''.join(cards) + pagination + '</body></html>'
+    )
+
+def render_job_page(job_key):
+    """Synthetic Indeed job page with a description and shared agency boilerplate"""
+    rng = random.Random(job_key)
+    skills = rng.sample(SKILLS, 4)
+    salary_low = rng.randrange(30, 80) * 1000
+    paragraphs = [
+        f"We are looking for an engineer to join our data platform team (ref {job_key}).",
+        f"You will build pipelines using {', '.join(skills[:-1])} and {skills[-1]}.",
+        f"Requirements: {rng.randint(1, 6)}+ years of experience and a degree in Computer Science or a related field.",
+        f"Salary: £{salary_low:,} - £{salary_low + 15000:,} per annum.",
+        BOILERPLATE,
+    ]
+    body = ''.join(f'<p>{paragraph}</p>' for paragraph in paragraphs)
+    return f'<html><body><div id="jobDescriptionText">{body}</div></body></html>', skills, salary_low
+
+class MockScrapingBee:
+    """Threaded HTTP server emulating the ScrapingBee endpoint"""
+
+    def __init__(self, config=None, host='127.0.0.1', port=0):
+        self.config = config or MockConfig()
+        self.stats = {'requests': 0, 'in_flight': 0, 'max_in_flight': 0, 'by_status': {}}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(handler):
+                server.handle(handler)
+
+            def log_message(handler, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.api_url = f"http://{host}:{self.port}/api/v1/"
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='mock-scrapingbee', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _count(self, status):
+        with self._lock:
+            self.stats['by_status'][status] = self.stats['by_status'].get(status, 0) + 1
+
+    def _charge(self, headers):
+        # Deduct the request's cost from the emulated account and report what is left
+        with self._lock:
+            if self.config.credits is None:
+                return
+            self.config.credits -= int(headers['Spb-cost'])
+            headers['Spb-remaining-credits'] = str(max(self.config.credits, 0))
+
+    def _send(self, handler, status, body, headers=None):
+        data = body.encode('utf-8')
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            handler.send_header(name, value)
+        handler.end_headers()
+        handler.wfile.write(data)
+        self._count(status)
+
+    def handle(self, handler):
+        config = self.config
+        request = urlparse(handler.path)
+        if not request.path.rstrip('/').endswith(('/api/v1', '/api/v1/usage')):
+            self._send(handler, 404, 'Not found')
+            return
+        params = {key: values[0] for key, values in parse_qs(request.query).items()}
+        if request.path.rstrip('/').endswith('/api/v1/usage'):
+            max_credits = config.max_credits if config.max_credits is not None else 1000000
+            used = max_credits - config.credits if config.credits is not None else 0
+            self._send(handler, 200, json.dumps({'max_api_credit': max_credits, 'used_api_credit': used}))
+            return
+        if config.credits is not None and config.credits <= 0:
+            self._send(handler, 401, '{"message": "Monthly API calls limit reached"}')
+            return
+
+        with self._lock:
+            self.stats['requests'] += 1
+            over_cap = config.max_concurrency is not None and self.stats['in_flight'] >= config.max_concurrency
+            if not over_cap:
+                self.stats['in_flight'] += 1
+                self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.stats['in_flight'])
+            roll = config.random.random()
+            latency = config.sample_latency()
+
+        if over_cap:
+            self._send(handler, 429, '{"message": "Too many concurrent requests"}')
+            return
+
+        try:
+            time.sleep(latency)
+            if roll < config.rate_429:
+                self._send(handler, 429, '{"message": "Too many requests"}')
+                return
+            if roll < config.rate_429 + config.error_rate:
+                self._send(handler, 500, '{"message": "Internal error, try again"}')
+                return
+
+            target = urlparse(params.get('url', ''))
+            target_query = {key: values[0] for key, values in parse_qs(target.query).items()}
+            base_url = f"{target.scheme}://{target.netloc}"
+
+            if target.path.startswith('/jobs'):
+                body = render_search_page(
+                    base_url, target_query.get('q', ''), target_query.get('l', ''),
+                    int(target_query.get('start', 0)), config.total_jobs,
+                    filters={key: target_query[key] for key in ('jt', 'fromage', 'radius') if key in target_query},
+                    page_cap=config.page_cap
+                )
+                headers = {'Spb-cost': '75'}
+                self._charge(headers)
+                self._send(handler, 200, body, headers)
+                return
+
+            job_key = target_query.get('jk', target.path)
+            body, skills, salary_low = render_job_page(job_key)
+            headers = {'Spb-cost': '75'}
+            if params.get('ai_extract_rules'):
+                headers['Spb-cost'] = '80'
+                headers['X-ScrapingBee-AI-Extraction'] = json.dumps({
+                    'job_title': 'Data Engineer',
+                    'salary': f"£{salary_low:,} - £{salary_low + 15000:,} per annum",
+                    'required_skills': skills,
+                    'experience_level': 'Not specified',
+                    'education': "Bachelor's degree",
+                    'job_summary': f"Data engineering role using {skills[0]}.",
+                })
+            self._charge(headers)
+            self._send(handler, 200, body, headers)
+        finally:
+            with self._lock:
+                self.stats['in_flight'] -= 1
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline ScrapingBee stand-in server')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8999, help='Port to listen on (default: 8999)')
+    parser.add_argument('--latency-median', type=float, default=0.2, help='Median latency in seconds (default: 0.2)')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Log-normal latency shape (default: 0.5)')
+    parser.add_argument('--slow-rate', type=float, default=0.0, help='Fraction of very slow requests (default: 0)')
+    parser.add_argument('--slow-seconds', type=float, default=30.0, help='Latency of slow requests (default: 30)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of HTTP 500 responses (default: 0)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of HTTP 429 responses (default: 0)')
+    parser.add_argument('--max-concurrency', type=int, default=None, help='Concurrent request cap (default: none)')
+    parser.add_argument('--total-jobs', type=int, default=150, help='Jobs per search (default: 150)')
+    parser.add_argument('--seed', type=int, default=None, help='Random seed')
+    parser.add_argument('--credits', type=int, default=None, help='Emulated account credits (default: unlimited)')
+    parser.add_argument('--page-cap', type=int, default=None,
+                        help='Results pages per query before pagination stops, like Indeed (default: unlimited)')
+    args = parser.parse_args()
+
+    config = MockConfig(
+        latency_median=args.latency_median, latency_sigma=args.latency_sigma,
+        slow_rate=args.slow_rate, slow_seconds=args.slow_seconds,
+        error_rate=args.error_rate, rate_429=args.rate_429,
+        max_concurrency=args.max_concurrency, total_jobs=args.total_jobs, seed=args.seed,
+        credits=args.credits, page_cap=args.page_cap
+    )
+    server = MockScrapingBee(config, host=args.host, port=args.port)
+    print(f"Mock ScrapingBee listening on {server.api_url}")
+    print(f"Use it with: SCRAPINGBEE_API_URL={server.api_url} python main.py ...")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+        print(f"\nServed {server.stats['requests']} requests: {server.stats['by_status']}")
+
+if __name__ == "__main__":
+    main()
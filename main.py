@@ -1,7 +1,38 @@
 from dotenv import load_dotenv
 from scraper import ScrapingBeeIndeedScraper
+from scraper.description_store import DescriptionStore, DEFAULT_STORE_DIR
+from scraper.compaction import (compact_data, compacted_path, find_snapshot_files, iter_snapshot_jobs,
+                                snapshot_scraped_at, DEFAULT_COMPACTED_DIR, SCRAPED_AT_FORMAT)
+from scraper.description_store import resolve_job_description
+from scraper.search_index import SearchIndex, DEFAULT_INDEX_PATH
+from scraper.metrics_server import start_metrics_server
+from scraper.logging_utils import flush_logs
+from scraper.event_log import EventLog, default_event_log_path
+from scraper.profiling import Profiler, DEFAULT_TOP_N
+from scraper.run_summary import build_summary, format_summary, write_run_summary
+from scraper.credits import fetch_remaining_credits, CreditBudget
+from scraper.metrics import MetricsRegistry
+from scraper.work_queue import WorkQueue, DEFAULT_QUEUE_PATH, DEFAULT_VISIBILITY_TIMEOUT
+from scraper.job_store import JobStore, DEFAULT_JOB_STORE_PATH, DEFAULT_MAX_ENRICH_ATTEMPTS
+from scraper.worker import enqueue_search, run_workers, DEFAULT_POLL_INTERVAL
+from scraper.sharding import scrape_sharded_jobs, DEFAULT_SHARD_CAP, DEFAULT_SHARD_WORKERS
+from scraper.scheduler import SearchDaemon, load_schedule
+from scraper.hedging import DEFAULT_HEDGE_FRACTION
+from scraper.local_extraction import extract_fields_batch
+from scraper.normalize import normalize_files, DEFAULT_NORMALIZED_PATH
+from scraper.near_duplicates import NearDuplicateIndex, DEFAULT_NEAR_DUPLICATES_PATH, DEFAULT_SIMILARITY_THRESHOLD
+from scraper.skill_tagger import SkillTagger, DEFAULT_VOCABULARY_PATH
+from scraper.stages import (list_searches, Enricher, DEFAULT_RELIST_HOURS, DEFAULT_ENRICH_BATCH,
+                            DEFAULT_ENRICH_CONCURRENCY)
+from scraper.circuit_breaker import DEFAULT_ERROR_THRESHOLD, DEFAULT_OPEN_SECONDS
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 import argparse
+import functools
 import logging
+import os
+import sys
+import time
 
 load_dotenv()
 
@@ -11,7 +42,7 @@ logger = logging.getLogger(__name__)
 # Country codes for reference
 COUNTRIES = {
     'uk': 'United Kingdom',
-    # 'us': 'United States',
+    'us': 'United States',
     # 'ca': 'Canada',
     # 'au': 'Australia',
     # 'de': 'Germany',
@@ -50,6 +81,8 @@ def parse_arguments():
                         help='Filter for jobs posted within X days')
     parser.add_argument('--country', type=str, default='uk',
                         help=f'Country code for Indeed (available: {", ".join(COUNTRIES.keys())})')
+    parser.add_argument('--countries', type=str, nargs='+', default=None, choices=list(COUNTRIES.keys()),
+                        help='Crawl several countries concurrently, one scraper each (overrides --country)')
     parser.add_argument('--delay-pages', type=int, default=2,
                         help='Delay in seconds between page requests (default: 2)')
     parser.add_argument('--delay-jobs', type=int, default=1,
@@ -62,6 +95,8 @@ def parse_arguments():
                         help='Use ScrapingBee AI extraction for structured data (default: True)')
     parser.add_argument('--no-ai', action='store_false', dest='ai',
                         help='Disable ScrapingBee AI extraction')
+    parser.add_argument('--local-extraction', action='store_true',
+                        help='Extract salary, skills, experience, education and a summary from the description text instead of with ScrapingBee AI extraction (implies --no-ai)')
     parser.add_argument('--pagination-test', action='store_true',
                         help='Test pagination only - skips job description fetching and processes minimal jobs per page')
     parser.add_argument('--max-jobs', type=int, default=None,
@@ -76,11 +111,699 @@ def parse_arguments():
                         help='Only search for junior positions from the default list')
     parser.add_argument('--graduate-only', action='store_true',
                         help='Only search for graduate positions from the default list')
+    parser.add_argument('--description-store', type=str, nargs='?', const=DEFAULT_STORE_DIR, default=None,
+                        help=f'Save descriptions once in a content-addressed store and keep only their hash in the output files (default directory: {DEFAULT_STORE_DIR})')
+    parser.add_argument('--dedupe-paragraphs', action='store_true',
+                        help='With --description-store, also store long paragraphs shared between descriptions only once')
+    parser.add_argument('--no-compress', action='store_false', dest='compress',
+                        help='With --description-store, do not compress stored descriptions')
+    parser.add_argument('--search-index', type=str, nargs='?', const=DEFAULT_INDEX_PATH, default=None,
+                        help=f'Add saved jobs to a local full-text search index (default path: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--near-duplicates', type=str, nargs='?', const=DEFAULT_NEAR_DUPLICATES_PATH, default=None,
+                        help=f'Tag each job with the cluster of near-identical postings it belongs to (default index: {DEFAULT_NEAR_DUPLICATES_PATH})')
+    parser.add_argument('--similarity-threshold', type=float, default=DEFAULT_SIMILARITY_THRESHOLD,
+                        help=f'With --near-duplicates, similarity at which two jobs are the same posting (default: {DEFAULT_SIMILARITY_THRESHOLD})')
+    parser.add_argument('--skill-tags', type=str, nargs='?', const=DEFAULT_VOCABULARY_PATH, default=None, metavar='VOCABULARY',
+                        help='Count the skills of a vocabulary file in each description and save them as skill_tags (default vocabulary: scraper/skills.txt)')
+    parser.add_argument('--event-log', type=str, nargs='?', const='', default=None,
+                        help='Write a structured JSON-lines event log (default path: logs/events_<timestamp>.jsonl)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on this local port while scraping (default: disabled)')
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Maximum ScrapingBee credits for the whole run (default: no limit)')
+    parser.add_argument('--search-budget', type=int, default=None,
+                        help='Maximum ScrapingBee credits per search (default: no limit)')
+    parser.add_argument('--country-budget', type=int, default=None,
+                        help='With --countries, maximum ScrapingBee credits per country (default: no limit)')
+    parser.add_argument('--hedge', action='store_true',
+                        help='Send a duplicate of a request that is slower than the p95 latency for its page type')
+    parser.add_argument('--hedge-fraction', type=float, default=DEFAULT_HEDGE_FRACTION,
+                        help=f'With --hedge, largest share of requests that may be duplicated (default: {DEFAULT_HEDGE_FRACTION})')
+    parser.add_argument('--circuit-threshold', type=float, default=DEFAULT_ERROR_THRESHOLD,
+                        help=f'Share of recent requests failing that opens the circuit breaker (default: {DEFAULT_ERROR_THRESHOLD})')
+    parser.add_argument('--circuit-open-seconds', type=float, default=DEFAULT_OPEN_SECONDS,
+                        help=f'Seconds the open circuit fails requests fast before probing (default: {DEFAULT_OPEN_SECONDS})')
+    parser.add_argument('--no-circuit-breaker', action='store_true',
+                        help='Keep sending requests while ScrapingBee is failing')
+    parser.add_argument('--sort-date', action='store_true',
+                        help='Sort search results newest first instead of by relevance')
+    parser.add_argument('--stop-after-known-pages', type=int, default=None, metavar='K',
+                        help='Stop a search after K consecutive pages whose jobs are all in the --search-index (default: page until the end)')
+    parser.add_argument('--shard', action='store_true',
+                        help='Split searches with more jobs than Indeed paginates to into narrower sub-queries crawled in parallel')
+    parser.add_argument('--shard-cap', type=int, default=DEFAULT_SHARD_CAP,
+                        help=f'With --shard, jobs a single query can reach before it is split (default: {DEFAULT_SHARD_CAP})')
+    parser.add_argument('--shard-workers', type=int, default=DEFAULT_SHARD_WORKERS,
+                        help=f'With --shard, shards crawled at the same time (default: {DEFAULT_SHARD_WORKERS})')
+    parser.add_argument('--sub-locations', type=str, nargs='+', default=None,
+                        help='With --shard, locations that together cover --location, used as the first split')
+    parser.add_argument('--plan', action='store_true',
+                        help='Dry run: fetch only the first page of each search and estimate the credits a full run would use')
+    parser.add_argument('--profile', action='store_true',
+                        help='Profile the run: stage timers, sampled stacks for flame graphs and memory snapshots per page (written to logs/profile_<timestamp>.*)')
+    parser.add_argument('--profile-top', type=int, default=DEFAULT_TOP_N,
+                        help=f'Number of entries in each section of the profile report (default: {DEFAULT_TOP_N})')
     
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.local_extraction:
+        args.ai = False
+    if args.stop_after_known_pages and not args.search_index:
+        parser.error('--stop-after-known-pages needs --search-index to know which jobs were saved before')
+    return args
+
+def compact_main(argv):
+    """Merge the timestamped files in data/ into one deduplicated dataset"""
+    parser = argparse.ArgumentParser(prog='main.py compact',
+                                     description='Merge timestamped output files into one deduplicated dataset')
+    parser.add_argument('--data-dir', type=str, default='data',
+                        help='Directory containing the scraper output (default: data)')
+    parser.add_argument('--output-dir', type=str, default=DEFAULT_COMPACTED_DIR,
+                        help=f'Directory for the consolidated dataset (default: {DEFAULT_COMPACTED_DIR})')
+    parser.add_argument('--no-csv', action='store_false', dest='csv',
+                        help='Only write the consolidated JSON file')
+    parser.add_argument('--prune', action='store_true',
+                        help='Delete the snapshot files once they have been compacted')
+    parser.add_argument('--quiet', action='store_true',
+                        help='Do not show the progress display')
+    args = parser.parse_args(argv)
+    
+    report = compact_data(
+        data_dir=args.data_dir,
+        output_dir=args.output_dir,
+        write_csv=args.csv,
+        prune=args.prune,
+        show_progress=not args.quiet
+    )
+    
+    print(f"\n{'='*80}")
+    print(f"Compacted {report['files']} files: {report['unique_jobs']:,} unique jobs "
+          f"from {report['records_read']:,} records ({report['duplicates_dropped']:,} duplicates dropped)")
+    print(f"Throughput: {report['records_per_second']:,.0f} records/s, {report['mb_per_second']:.2f} MB/s "
+          f"in {report['seconds']:.2f}s")
+    if report['files_failed']:
+        print(f"{report['files_failed']} file(s) could not be read completely - see the log")
+    if args.prune:
+        print(f"Pruned {report['files_pruned']} snapshot file(s)")
+    print(f"Consolidated dataset: {report['output']}")
+
+def index_main(argv):
+    """Build or update the full-text search index from the files in data/"""
+    parser = argparse.ArgumentParser(prog='main.py index',
+                                     description='Add saved jobs to the local full-text search index')
+    parser.add_argument('--data-dir', type=str, default='data',
+                        help='Directory containing the scraper output (default: data)')
+    parser.add_argument('--index', type=str, default=DEFAULT_INDEX_PATH,
+                        help=f'Search index file (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--description-store', type=str, default=None,
+                        help='Description store used when the files were saved, to index descriptions saved by hash')
+    parser.add_argument('--compacted-dir', type=str, default=DEFAULT_COMPACTED_DIR,
+                        help=f'Output directory of compact, whose dataset is indexed too (default: {DEFAULT_COMPACTED_DIR})')
+    args = parser.parse_args(argv)
+    
+    index = SearchIndex(args.index)
+    store = DescriptionStore(args.description_store) if args.description_store else None
+    
+    # Oldest first, so the newest saved version of a job is the one left in the index
+    paths = find_snapshot_files(args.data_dir)[::-1]
+    compacted_dataset = compacted_path(args.compacted_dir)
+    if os.path.exists(compacted_dataset):
+        paths.insert(0, compacted_dataset)
+    
+    indexed = 0
+    for path in paths:
+        scraped_at = datetime.strptime(snapshot_scraped_at(path), SCRAPED_AT_FORMAT)
+        batch = []
+        for job in iter_snapshot_jobs(path):
+            batch.append(resolve_job_description(job, store) if store else job)
+            if len(batch) >= 1000:
+                indexed += index.add_jobs(batch, scraped_at)
+                batch = []
+        indexed += index.add_jobs(batch, scraped_at)
+    index.optimize()
+    
+    print(f"Indexed {indexed:,} new or changed jobs from {len(paths)} files. Index now holds {len(index):,} jobs.")
+
+def search_main(argv):
+    """Query the full-text search index"""
+    parser = argparse.ArgumentParser(prog='main.py search',
+                                     description='Search scraped jobs. Supports AND / OR / NOT, "phrases" and prefix* terms.')
+    parser.add_argument('query', type=str,
+                        help='Search query, e.g. \'python AND (airflow OR dagster)\' or \'"machine learning"\'')
+    parser.add_argument('--location', type=str, default=None,
+                        help='Only jobs whose location contains this text')
+    parser.add_argument('--since', type=str, default=None,
+                        help='Only jobs posted on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--until', type=str, default=None,
+                        help='Only jobs posted on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--limit', type=int, default=20,
+                        help='Maximum number of results (default: 20)')
+    parser.add_argument('--index', type=str, default=DEFAULT_INDEX_PATH,
+                        help=f'Search index file (default: {DEFAULT_INDEX_PATH})')
+    args = parser.parse_args(argv)
+    
+    if not os.path.exists(args.index):
+        print(f"No search index found at {args.index}. Run 'python main.py index' first.")
+        return
+    
+    index = SearchIndex(args.index)
+    results, seconds = index.search(args.query, location=args.location, since=args.since,
+                                    until=args.until, limit=args.limit)
+    
+    for result in results:
+        print(f"\n{result['title']} - {result['company']} ({result['location']}, {result['date_posted']})")
+        print(f"  {result['url']}")
+        if result['snippet']:
+            print(f"  {result['snippet']}")
+    print(f"\n{len(results)} result(s) in {seconds * 1000:.1f} ms")
+
+def plan_main(scraper, job_titles, args):
+    """Print the estimated credit cost of each search, fetching only its first page"""
+    plans = []
+    for job_title in job_titles:
+        plan = scraper.plan_search(
+            job_title,
+            args.location,
+            date_posted=args.days,
+            fetch_descriptions=args.descriptions and not args.pagination_test,
+            use_ai_extraction=args.ai and not args.pagination_test,
+            max_jobs=args.max_jobs,
+            max_pages=args.max_pages
+        )
+        if plan:
+            plans.append(plan)
+    flush_logs()
+    
+    print(f"\n{'='*80}")
+    print(f"{'search':<40} {'jobs':>7} {'pages':>6} {'search cr':>10} {'job cr':>10} {'total cr':>10}")
+    for plan in plans:
+        search = f"{plan['job_position']} in {plan['job_location']}"
+        print(f"{search[:40]:<40} {plan['jobs']:>7,} {plan['pages']:>6} {plan['search_credits']:>10,} "
+              f"{plan['description_credits']:>10,} {plan['total_credits']:>10,}")
+    total_credits = sum(plan['total_credits'] for plan in plans)
+    print(f"Estimated total: {total_credits:,} credits "
+          f"({plans[0]['search_request_credits'] if plans else 0} per search page, "
+          f"{plans[0]['job_request_credits'] if plans else 0} per job)")
+    
+    remaining = fetch_remaining_credits(scraper.api_key, scraper.api_url.rstrip('/') + '/usage')
+    if remaining is not None:
+        print(f"ScrapingBee account: {remaining:,} credits remaining"
+              + (" - NOT ENOUGH for this plan" if remaining < total_credits else ""))
+    if args.budget is not None and total_credits > args.budget:
+        print(f"The plan exceeds --budget {args.budget:,}; the run would stop when the budget runs out")
+
+def print_queue_counts(queue):
+    """Print the number of tasks per kind and status"""
+    counts = queue.counts()
+    if not counts:
+        print(f"Queue {queue.path} is empty")
+    for kind, statuses in sorted(counts.items()):
+        print(f"  {kind:<12} " + "   ".join(f"{status}: {count:,}" for status, count in sorted(statuses.items())))
+
+def enqueue_main(argv):
+    """Add search tasks (job titles x locations) to the work queue"""
+    parser = argparse.ArgumentParser(prog='main.py enqueue',
+                                     description='Queue searches for the worker processes (job titles x locations)')
+    parser.add_argument('--jobs', type=str, nargs='+', default=None,
+                        help='Job titles to search for (default: the default job titles)')
+    parser.add_argument('--locations', type=str, nargs='+', default=['london'],
+                        help='Locations to search in (default: london)')
+    parser.add_argument('--days', type=str, default='',
+                        help='Filter for jobs posted within X days')
+    parser.add_argument('--max-jobs', type=int, default=None,
+                        help='Maximum number of jobs per search (default: no limit)')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='Maximum number of pages per search (default: no limit)')
+    parser.add_argument('--no-descriptions', action='store_false', dest='descriptions',
+                        help='Do not queue job description tasks')
+    parser.add_argument('--no-ai', action='store_false', dest='ai',
+                        help='Disable ScrapingBee AI extraction in description tasks')
+    parser.add_argument('--priority', type=int, default=0,
+                        help='Priority of the queued searches (higher runs first, default: 0)')
+    parser.add_argument('--queue', type=str, default=DEFAULT_QUEUE_PATH,
+                        help=f'Work queue file (default: {DEFAULT_QUEUE_PATH})')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    queue = WorkQueue(args.queue, wal=args.wal)
+    added = 0
+    for job_title in args.jobs or DEFAULT_JOB_TITLES:
+        for location in args.locations:
+            added += enqueue_search(
+                queue, job_title, location,
+                date_posted=args.days,
+                fetch_descriptions=args.descriptions,
+                use_ai_extraction=args.ai,
+                max_jobs=args.max_jobs,
+                max_pages=args.max_pages,
+                priority=args.priority
+            )
+    print(f"Queued {added} search task(s) in {args.queue}")
+    print_queue_counts(queue)
+
+def worker_main(argv):
+    """Run worker processes that lease tasks from the work queue"""
+    parser = argparse.ArgumentParser(prog='main.py worker',
+                                     description='Run worker processes for the queued searches and job descriptions')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Number of worker processes (default: number of CPUs)')
+    parser.add_argument('--queue', type=str, default=DEFAULT_QUEUE_PATH,
+                        help=f'Work queue file (default: {DEFAULT_QUEUE_PATH})')
+    parser.add_argument('--store', type=str, default=DEFAULT_JOB_STORE_PATH,
+                        help=f'Job store file the results are written to (default: {DEFAULT_JOB_STORE_PATH})')
+    parser.add_argument('--visibility-timeout', type=int, default=DEFAULT_VISIBILITY_TIMEOUT,
+                        help=f'Seconds before a task leased by a crashed or stalled worker is handed out again (default: {DEFAULT_VISIBILITY_TIMEOUT})')
+    parser.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help=f'Seconds an idle worker waits before polling again (default: {DEFAULT_POLL_INTERVAL})')
+    parser.add_argument('--exit-when-empty', action='store_true',
+                        help='Stop once no task is pending or leased')
+    parser.add_argument('--delay-pages', type=int, default=2,
+                        help='Delay in seconds between page requests (default: 2)')
+    parser.add_argument('--delay-jobs', type=int, default=1,
+                        help='Delay in seconds after each job description request (default: 1)')
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Maximum ScrapingBee credits per worker process (default: no limit)')
+    parser.add_argument('--requeue-failed', action='store_true',
+                        help='Give failed tasks fresh attempts before starting')
+    parser.add_argument('--status', action='store_true',
+                        help='Only print the queue status')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    queue = WorkQueue(args.queue, wal=args.wal)
+    if args.requeue_failed:
+        print(f"Re-queued {queue.requeue_failed()} failed task(s)")
+    print_queue_counts(queue)
+    if args.status:
+        return
+    queue.close()
+    
+    print(f"Starting {args.workers} worker process(es) on {args.queue}, writing to {args.store}")
+    exit_codes = run_workers(
+        args.workers,
+        queue_path=args.queue,
+        store_path=args.store,
+        wal=args.wal,
+        exit_when_empty=args.exit_when_empty,
+        poll_interval=args.poll_interval,
+        credit_budget=args.budget,
+        visibility_timeout=args.visibility_timeout,
+        delay_between_pages=args.delay_pages,
+        delay_between_jobs=args.delay_jobs
+    )
+    
+    print(f"\n{'='*80}")
+    print(f"Workers exited with codes {exit_codes}")
+    print_queue_counts(WorkQueue(args.queue, wal=args.wal))
+
+def daemon_main(argv):
+    """Run the scheduled searches incrementally"""
+    parser = argparse.ArgumentParser(prog='main.py daemon',
+                                     description='Run scheduled searches, fetching only jobs that are new since the last run')
+    parser.add_argument('--config', type=str, required=True,
+                        help='Schedule config file (JSON with "defaults" and "searches")')
+    parser.add_argument('--store', type=str, default=DEFAULT_JOB_STORE_PATH,
+                        help=f'Job store file (default: {DEFAULT_JOB_STORE_PATH})')
+    parser.add_argument('--country', type=str, default='uk', choices=list(COUNTRIES.keys()),
+                        help='Country code for Indeed (default: uk)')
+    parser.add_argument('--once', action='store_true',
+                        help='Run the searches that are due once and exit (e.g. from cron)')
+    parser.add_argument('--delay-pages', type=int, default=2,
+                        help='Delay in seconds between page requests (default: 2)')
+    parser.add_argument('--delay-jobs', type=int, default=1,
+                        help='Delay in seconds between job description requests (default: 1)')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='Serve Prometheus metrics on this port while the daemon runs (default: disabled)')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    searches = load_schedule(args.config)
+    store = JobStore(args.store, wal=args.wal)
+    scraper = ScrapingBeeIndeedScraper(country=args.country)
+    if args.metrics_port is not None:
+        metrics_server = start_metrics_server(scraper.metrics, args.metrics_port)
+        print(f"Prometheus metrics available at http://127.0.0.1:{metrics_server.port}/metrics")
+    
+    print(f"Running {len(searches)} scheduled search(es) from {args.config} into {args.store}")
+    daemon = SearchDaemon(scraper, store, searches,
+                          delay_between_pages=args.delay_pages, delay_between_jobs=args.delay_jobs)
+    try:
+        daemon.run(once=args.once)
+    except KeyboardInterrupt:
+        print("Daemon stopped")
+    finally:
+        store.close()
+        flush_logs()
+
+def list_main(argv):
+    """Crawl search results pages only and store the job cards"""
+    parser = argparse.ArgumentParser(prog='main.py list',
+                                     description='List jobs (search results pages only) into the job store')
+    parser.add_argument('--jobs', type=str, nargs='+', default=None,
+                        help='Job titles to search for (default: the default job titles)')
+    parser.add_argument('--locations', type=str, nargs='+', default=['london'],
+                        help='Locations to search in (default: london)')
+    parser.add_argument('--days', type=str, default='',
+                        help='Filter for jobs posted within X days')
+    parser.add_argument('--max-jobs', type=int, default=None,
+                        help='Maximum number of jobs per search (default: no limit)')
+    parser.add_argument('--max-pages', type=int, default=None,
+                        help='Maximum number of pages per search (default: no limit)')
+    parser.add_argument('--store', type=str, default=DEFAULT_JOB_STORE_PATH,
+                        help=f'Job store file (default: {DEFAULT_JOB_STORE_PATH})')
+    parser.add_argument('--country', type=str, default='uk', choices=list(COUNTRIES.keys()),
+                        help='Country code for Indeed (default: uk)')
+    parser.add_argument('--delay-pages', type=int, default=2,
+                        help='Delay in seconds between page requests (default: 2)')
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Maximum ScrapingBee credits for the run (default: no limit)')
+    parser.add_argument('--sort-date', action='store_true',
+                        help='Sort search results newest first instead of by relevance')
+    parser.add_argument('--stop-after-known-pages', type=int, default=None, metavar='K',
+                        help='Stop a search after K consecutive pages whose jobs are all stored (default: page until the end)')
+    parser.add_argument('--relist-hours', type=float, default=DEFAULT_RELIST_HOURS,
+                        help=f'Skip searches listed successfully within this many hours, 0 to list everything (default: {DEFAULT_RELIST_HOURS})')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    store = JobStore(args.store, wal=args.wal)
+    scraper = ScrapingBeeIndeedScraper(country=args.country, credit_budget=args.budget)
+    try:
+        stats = list_searches(
+            scraper, store, args.jobs or DEFAULT_JOB_TITLES, args.locations,
+            date_posted=args.days,
+            max_jobs=args.max_jobs,
+            max_pages=args.max_pages,
+            delay_between_pages=args.delay_pages,
+            relist_hours=args.relist_hours,
+            sort_by_date=args.sort_date,
+            stop_after_known_pages=args.stop_after_known_pages
+        )
+    finally:
+        flush_logs()
+    print(f"Listed {stats['jobs']:,} jobs from {stats['searches']} search(es) into {args.store} "
+          f"({stats['skipped']} skipped as recently listed, {stats['failed']} stopped early)")
+    print(f"Jobs waiting for a description: {store.count_undescribed()['pending']:,}")
+    store.close()
+
+def enrich_main(argv):
+    """Fetch missing descriptions for stored jobs"""
+    parser = argparse.ArgumentParser(prog='main.py enrich',
+                                     description='Fetch descriptions for stored jobs that lack one, in parallel batches')
+    parser.add_argument('--store', type=str, default=DEFAULT_JOB_STORE_PATH,
+                        help=f'Job store file (default: {DEFAULT_JOB_STORE_PATH})')
+    parser.add_argument('--title', type=str, default=None,
+                        help='Only jobs whose title contains this text')
+    parser.add_argument('--location', type=str, default=None,
+                        help='Only jobs whose location contains this text')
+    parser.add_argument('--company', type=str, default=None,
+                        help='Only jobs whose company contains this text')
+    parser.add_argument('--seen-within-days', type=float, default=None,
+                        help='Only jobs listed within this many days')
+    parser.add_argument('--prefer', type=str, nargs='+', default=None,
+                        help='Fetch jobs whose title contains one of these words first')
+    parser.add_argument('--order', type=str, default='newest', choices=['newest', 'oldest'],
+                        help='Fetch the most recently listed or the longest waiting jobs first (default: newest)')
+    parser.add_argument('--max-jobs', type=int, default=None,
+                        help='Maximum number of descriptions to fetch (default: no limit)')
+    parser.add_argument('--budget', type=int, default=None,
+                        help='Maximum ScrapingBee credits for the run (default: no limit)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_ENRICH_BATCH,
+                        help=f'Jobs claimed per batch (default: {DEFAULT_ENRICH_BATCH})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_ENRICH_CONCURRENCY,
+                        help=f'Description requests sent at the same time (default: {DEFAULT_ENRICH_CONCURRENCY})')
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ENRICH_ATTEMPTS,
+                        help=f'Failed fetches before a job is skipped (default: {DEFAULT_MAX_ENRICH_ATTEMPTS})')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Give jobs that ran out of attempts a fresh start')
+    parser.add_argument('--ai', action='store_true',
+                        help='Use ScrapingBee AI extraction (5 more credits per job)')
+    parser.add_argument('--local-extraction', action='store_true',
+                        help='Extract salary, skills, experience, education and a summary from the description text')
+    parser.add_argument('--skill-tags', type=str, nargs='?', const=DEFAULT_VOCABULARY_PATH, default=None, metavar='VOCABULARY',
+                        help='Count the skills of a vocabulary file in each description (default vocabulary: scraper/skills.txt)')
+    parser.add_argument('--near-duplicates', type=str, nargs='?', const=DEFAULT_NEAR_DUPLICATES_PATH, default=None,
+                        help=f'Tag each enriched job with its near-duplicate cluster (default index: {DEFAULT_NEAR_DUPLICATES_PATH})')
+    parser.add_argument('--similarity-threshold', type=float, default=DEFAULT_SIMILARITY_THRESHOLD,
+                        help=f'With --near-duplicates, similarity at which two jobs are the same posting (default: {DEFAULT_SIMILARITY_THRESHOLD})')
+    parser.add_argument('--country', type=str, default='uk', choices=list(COUNTRIES.keys()),
+                        help='Country code for Indeed (default: uk)')
+    parser.add_argument('--status', action='store_true',
+                        help='Only print how many jobs are waiting for a description')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    store = JobStore(args.store, wal=args.wal)
+    if args.retry_failed:
+        print(f"Reset the attempts of {store.reset_enrich_attempts():,} job(s)")
+    filters = {
+        'title': args.title,
+        'location': args.location,
+        'company': args.company,
+        'seen_within_days': args.seen_within_days,
+        'max_attempts': args.max_attempts,
+    }
+    counts = store.count_undescribed(**filters)
+    print(f"Jobs waiting for a description: {counts['pending']:,} "
+          f"(claimed by other processes: {counts['claimed']:,}, out of attempts: {counts['given_up']:,})")
+    if args.status:
+        store.close()
+        return
+    
+    near_duplicates = None
+    if args.near_duplicates:
+        near_duplicates = NearDuplicateIndex(args.near_duplicates, threshold=args.similarity_threshold)
+    scraper = ScrapingBeeIndeedScraper(country=args.country, credit_budget=args.budget,
+                                       local_extraction=args.local_extraction, near_duplicates=near_duplicates,
+                                       skill_tagger=SkillTagger.from_file(args.skill_tags) if args.skill_tags else None)
+    enricher = Enricher(scraper, store, use_ai_extraction=args.ai, batch_size=args.batch_size,
+                        concurrency=args.concurrency, prefer_titles=args.prefer, order=args.order, **filters)
+    try:
+        stats = enricher.run(max_jobs=args.max_jobs)
+    except KeyboardInterrupt:
+        print("Enrichment interrupted - unfinished claims expire and are picked up by the next run")
+        return
+    finally:
+        flush_logs()
+        
+    print(f"Stored {stats['enriched']:,} descriptions, {stats['failed']:,} failed (stopped: {stats['stopped']})")
+    print(f"Jobs still waiting for a description: {store.count_undescribed(**filters)['pending']:,}")
+    store.close()
+
+def extract_main(argv):
+    """Fill missing AI data of stored jobs from their description text"""
+    parser = argparse.ArgumentParser(prog='main.py extract',
+                                     description='Extract salary, skills, experience, education and a summary locally '
+                                                 'for stored jobs that have a description but no AI data')
+    parser.add_argument('--store', type=str, default=DEFAULT_JOB_STORE_PATH,
+                        help=f'Job store file (default: {DEFAULT_JOB_STORE_PATH})')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Descriptions extracted per batch (default: 1000)')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    store = JobStore(args.store, wal=args.wal)
+    start_time = time.perf_counter()
+    updated = 0
+    for batch in store.iter_without_ai_data(args.batch_size):
+        fields = extract_fields_batch((job.description for _, job in batch), (job for _, job in batch))
+        updated += store.set_ai_data(zip((job_key for job_key, _ in batch), fields))
+    store.close()
+    print(f"Extracted fields for {updated:,} jobs in {time.perf_counter() - start_time:.1f}s")
+
+def tag_main(argv):
+    """Count vocabulary skills in the descriptions of stored jobs"""
+    parser = argparse.ArgumentParser(prog='main.py tag',
+                                     description='Tag stored jobs with the skills of a vocabulary file found in their '
+                                                 'description, with mention counts')
+    parser.add_argument('--store', type=str, default=DEFAULT_JOB_STORE_PATH,
+                        help=f'Job store file (default: {DEFAULT_JOB_STORE_PATH})')
+    parser.add_argument('--vocabulary', type=str, default=DEFAULT_VOCABULARY_PATH,
+                        help='Vocabulary file, one skill or "alias = Skill" per line (default: scraper/skills.txt)')
+    parser.add_argument('--retag', action='store_true',
+                        help='Tag every described job again, e.g. after the vocabulary changed')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Descriptions tagged per batch (default: 1000)')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    tagger = SkillTagger.from_file(args.vocabulary)
+    store = JobStore(args.store, wal=args.wal)
+    start_time = time.perf_counter()
+    updated = 0
+    for batch in store.iter_descriptions(args.batch_size, untagged_only=not args.retag):
+        tags = tagger.tag_batch(description for _, description in batch)
+        updated += store.set_skill_tags(zip((job_key for job_key, _ in batch), tags))
+    store.close()
+    print(f"Tagged {updated:,} jobs with {len(tagger):,} vocabulary terms in {time.perf_counter() - start_time:.1f}s")
+
+def dedupe_main(argv):
+    """Assign near-duplicate clusters to stored jobs that have a description but no cluster"""
+    parser = argparse.ArgumentParser(prog='main.py dedupe',
+                                     description='Cluster stored jobs whose title, company and description are '
+                                                 'nearly identical, e.g. one role posted by several agencies')
+    parser.add_argument('--store', type=str, default=DEFAULT_JOB_STORE_PATH,
+                        help=f'Job store file (default: {DEFAULT_JOB_STORE_PATH})')
+    parser.add_argument('--index', type=str, default=DEFAULT_NEAR_DUPLICATES_PATH,
+                        help=f'Near-duplicate index file (default: {DEFAULT_NEAR_DUPLICATES_PATH})')
+    parser.add_argument('--similarity-threshold', type=float, default=DEFAULT_SIMILARITY_THRESHOLD,
+                        help=f'Similarity at which two jobs are the same posting (default: {DEFAULT_SIMILARITY_THRESHOLD})')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='Jobs read from the store per batch (default: 1000)')
+    parser.add_argument('--no-wal', action='store_false', dest='wal',
+                        help='Do not use SQLite write-ahead logging (required on network volumes)')
+    args = parser.parse_args(argv)
+    
+    store = JobStore(args.store, wal=args.wal)
+    index = NearDuplicateIndex(args.index, threshold=args.similarity_threshold)
+    start_time = time.perf_counter()
+    updated = 0
+    for batch in store.iter_without_duplicate_cluster(args.batch_size):
+        updated += store.set_duplicate_clusters((job_key, index.add(job)) for job_key, job in batch)
+    stats = index.stats()
+    store.close()
+    index.close()
+    print(f"Clustered {updated:,} jobs in {time.perf_counter() - start_time:.1f}s")
+    print(f"Near duplicates: {stats['duplicates']:,} of {stats['jobs']:,} indexed jobs "
+          f"in {stats['duplicate_clusters']:,} cluster(s)")
+
+def normalize_main(argv):
+    """Write the compacted dataset with normalised salary and posting-date columns"""
+    parser = argparse.ArgumentParser(prog='main.py normalize',
+                                     description='Add salary min/max, period and currency and absolute posting dates '
+                                                 'to the saved jobs')
+    parser.add_argument('--input', type=str, nargs='+', default=None,
+                        help='Output files to normalise (default: the compacted dataset, '
+                             'else the timestamped files in --data-dir)')
+    parser.add_argument('--data-dir', type=str, default='data',
+                        help='Directory containing the scraper output (default: data)')
+    parser.add_argument('--output', type=str, default=DEFAULT_NORMALIZED_PATH,
+                        help=f'CSV file for the normalised dataset (default: {DEFAULT_NORMALIZED_PATH})')
+    parser.add_argument('--currency', type=str, default=None,
+                        help='Currency of salaries written without a symbol, e.g. GBP')
+    parser.add_argument('--compacted-dir', type=str, default=DEFAULT_COMPACTED_DIR,
+                        help=f'Output directory of compact (default: {DEFAULT_COMPACTED_DIR})')
+    args = parser.parse_args(argv)
+    
+    paths = args.input
+    if not paths:
+        compacted_dataset = compacted_path(args.compacted_dir)
+        paths = [compacted_dataset] if os.path.exists(compacted_dataset) else find_snapshot_files(args.data_dir)
+    if not paths:
+        print(f"No output files found in {args.data_dir}")
+        return
+    
+    report = normalize_files(paths, args.output, default_currency=args.currency)
+    print(f"Normalised {report['jobs']:,} jobs in {report['seconds']:.2f}s: {report['salaries']:,} salaries "
+          f"and {report['dates']:,} posting dates resolved")
+    print(f"Normalised dataset: {report['output']}")
+
+def run_searches(scraper, job_titles, args):
+    """
+    Run the search for each job title with one scraper
+    
+    Returns:
+        int: Number of jobs found
+    """
+    total_jobs = 0
+    label = f" ({scraper.country})" if args.countries and len(args.countries) > 1 else ''
+    # Jobs saved by earlier runs, for stopping once a page holds only known jobs
+    seen_job_keys = scraper.search_index.known_keys if scraper.search_index is not None else None
+    for job_title in job_titles:
+        print(f"\n{'='*80}")
+        print(f"Searching for: '{job_title}'{label}")
+        
+        if args.shard:
+            # Split the search into sub-queries under the pagination cap and crawl them in parallel
+            jobs, shards = scrape_sharded_jobs(
+                scraper,
+                job_title,
+                args.location,
+                date_posted=args.days,
+                sub_locations=args.sub_locations,
+                cap=args.shard_cap,
+                workers=args.shard_workers,
+                max_jobs=args.max_jobs,
+                fetch_descriptions=args.descriptions,
+                use_ai_extraction=args.ai,
+                max_pages=args.max_pages,
+                delay_between_pages=args.delay_pages,
+                delay_between_jobs=args.delay_jobs,
+                pagination_test=args.pagination_test,
+                search_budget=args.search_budget,
+                sort_by_date=args.sort_date,
+                stop_after_known_pages=args.stop_after_known_pages,
+                seen_job_keys=seen_job_keys
+            )
+            flush_logs()
+            print(f"\nShards for '{job_title}' in {args.location}{label}:")
+            for shard in shards:
+                job_count = f"{shard.job_count:,}" if shard.job_count is not None else 'unknown'
+                print(f"  {shard.describe():<50} {job_count:>8} jobs{'' if shard.complete else '  (partial)'}")
+            print(f"{len(jobs)} unique jobs from {len(shards)} shard(s)\n")
+        else:
+            # Scrape jobs
+            jobs = scraper.scrape_indeed_jobs(
+                job_position=job_title,
+                job_location=args.location,
+                date_posted=args.days,
+                fetch_descriptions=args.descriptions,
+                use_ai_extraction=args.ai,
+                max_jobs=args.max_jobs,
+                max_pages=args.max_pages,
+                delay_between_pages=args.delay_pages,
+                delay_between_jobs=args.delay_jobs,
+                save_progress=True,  # Enable saving progress after each page
+                pagination_test=args.pagination_test,  # Pass the pagination test flag
+                search_budget=args.search_budget,
+                sort_by_date=args.sort_date,
+                stop_after_known_pages=args.stop_after_known_pages,
+                seen_job_keys=seen_job_keys
+            )
+            
+            flush_logs()
+            print(f"\n{format_summary(scraper.search_summaries[-1], f'Search summary: {job_title} in {args.location}{label}')}\n")
+        
+        # Save results
+        if jobs:
+            # Files are saved within the scrape_indeed_jobs method with job-specific filenames
+            filename_base = job_title.replace(' ', '_').lower() + '_' + args.location.replace(' ', '_').lower()
+            if scraper.file_country():
+                filename_base += f"_{scraper.file_country()}"
+            print(f"Successfully scraped {len(jobs)} jobs{label}")
+            print(f"Results saved to {filename_base}.json and {filename_base}.csv")
+            total_jobs += len(jobs)
+        else:
+            print(f"No jobs found for '{job_title}'{label}. Check the logs for details.")
+    return total_jobs
+
+# Subcommands - running main.py without one of these starts a scrape
+COMMANDS = {
+    'compact': compact_main,
+    'index': index_main,
+    'search': search_main,
+    'enqueue': enqueue_main,
+    'worker': worker_main,
+    'daemon': daemon_main,
+    'list': list_main,
+    'enrich': enrich_main,
+    'extract': extract_main,
+    'normalize': normalize_main,
+    'dedupe': dedupe_main,
+    'tag': tag_main,
+}
 
 def main():
     """Main function to run the ScrapingBee scraper"""
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        return COMMANDS[sys.argv[1]](sys.argv[2:])
+    
     args = parse_arguments()
     
     # Set debug logging if requested
@@ -115,50 +838,125 @@ def main():
         print(f"No job titles specified. Using default: '{job_titles[0]}'")
         print(f"To use all default job titles, use the --use-default-jobs flag")
     
-    # Initialize the scraper
-    scraper = ScrapingBeeIndeedScraper(country=args.country)
+    # Set up the description store if requested
+    description_store = None
+    if args.description_store:
+        description_store = DescriptionStore(
+            args.description_store,
+            compress=args.compress,
+            dedupe_paragraphs=args.dedupe_paragraphs
+        )
+        print(f"Storing descriptions in {args.description_store}")
+    
+    # Open the search index if requested
+    search_index = SearchIndex(args.search_index) if args.search_index else None
+    
+    # Open the near-duplicate index if requested
+    near_duplicates = None
+    if args.near_duplicates:
+        near_duplicates = NearDuplicateIndex(args.near_duplicates, threshold=args.similarity_threshold)
+        print(f"Clustering near-duplicate jobs in {args.near_duplicates}")
+    
+    # Compile the skill tagger if requested
+    skill_tagger = None
+    if args.skill_tags:
+        skill_tagger = SkillTagger.from_file(args.skill_tags)
+        print(f"Tagging descriptions with {len(skill_tagger):,} vocabulary terms from {args.skill_tags}")
+    
+    # Open the structured event log if requested
+    event_log = None
+    if args.event_log is not None:
+        event_log = EventLog(args.event_log or default_event_log_path())
+        print(f"Writing structured event log to {event_log.path} (run ID {event_log.run_id})")
+    
+    # Initialize one scraper per country - each has its own proxy country, pacing and credit budget
+    countries = list(dict.fromkeys(args.countries or [args.country]))
+    multi_country = len(countries) > 1
+    run_budget = CreditBudget(args.budget) if multi_country else None
+    run_metrics = MetricsRegistry() if multi_country else None
+    scrapers = [
+        ScrapingBeeIndeedScraper(
+            country=country,
+            description_store=description_store,
+            search_index=search_index,
+            event_log=event_log,
+            credit_budget=args.country_budget if multi_country else args.budget,
+            budget_parent=run_budget,
+            metrics_parent=run_metrics,
+            hedge_fraction=args.hedge_fraction if args.hedge else None,
+            circuit_threshold=None if args.no_circuit_breaker else args.circuit_threshold,
+            circuit_open_seconds=args.circuit_open_seconds,
+            local_extraction=args.local_extraction,
+            near_duplicates=near_duplicates,
+            skill_tagger=skill_tagger
+        )
+        for country in countries
+    ]
+    metrics = run_metrics if multi_country else scrapers[0].metrics
+    if multi_country:
+        # Budgets, caches, hedging and circuit breakers report through collectors, which a
+        # parent registry does not receive, so export each country's under a country label
+        for scraper in scrapers:
+            run_metrics.add_collector(functools.partial(scraper.metrics.collected, country=scraper.country))
+    
+    # Estimate the cost of the searches instead of running them
+    if args.plan:
+        for scraper in scrapers:
+            plan_main(scraper, job_titles, args)
+        return
+    
+    # Expose live metrics for dashboards if requested
+    if args.metrics_port is not None:
+        metrics_server = start_metrics_server(metrics, args.metrics_port)
+        print(f"Prometheus metrics available at http://127.0.0.1:{metrics_server.port}/metrics")
     
     # Print general information
-    print(f"Starting Indeed job scraper for {len(job_titles)} job title(s) in '{args.location}' ({COUNTRIES.get(args.country, args.country)})")
+    country_names = ', '.join(COUNTRIES.get(country, country) for country in countries)
+    print(f"Starting Indeed job scraper for {len(job_titles)} job title(s) in '{args.location}' ({country_names})")
     print(f"Job description fetching: {'Enabled' if args.descriptions else 'Disabled'}")
-    print(f"AI extraction: {'Enabled' if args.ai else 'Disabled'}")
+    print(f"AI extraction: {'Enabled' if args.ai else 'Local' if args.local_extraction else 'Disabled'}")
     if args.max_jobs:
         print(f"Testing mode: Limited to {args.max_jobs} jobs per search")
+    if multi_country:
+        print(f"Crawling {len(countries)} countries concurrently")
+    
+    # Profile the whole run if requested
+    profiler = Profiler(top_n=args.profile_top).start() if args.profile else None
     
-    # Run the scraper for each job title
+    # Run the scraper for each job title, one thread per country
     total_jobs = 0
-    for job_title in job_titles:
-        print(f"\n{'='*80}")
-        print(f"Searching for: '{job_title}'")
-        
-        # Scrape jobs
-        jobs = scraper.scrape_indeed_jobs(
-            job_position=job_title,
-            job_location=args.location,
-            date_posted=args.days,
-            fetch_descriptions=args.descriptions,
-            use_ai_extraction=args.ai,
-            max_jobs=args.max_jobs,
-            max_pages=args.max_pages,
-            delay_between_pages=args.delay_pages,
-            delay_between_jobs=args.delay_jobs,
-            save_progress=True,  # Enable saving progress after each page
-            pagination_test=args.pagination_test  # Pass the pagination test flag
-        )
-        
-        # Save results
-        if jobs:
-            # Files are saved within the scrape_indeed_jobs method with job-specific filenames
-            filename_base = job_title.replace(' ', '_').lower() + '_' + args.location.replace(' ', '_').lower()
-            print(f"Successfully scraped {len(jobs)} jobs")
-            print(f"Results saved to {filename_base}.json and {filename_base}.csv")
-            total_jobs += len(jobs)
+    run_start = time.perf_counter()
+    try:
+        if multi_country:
+            with ThreadPoolExecutor(max_workers=len(scrapers), thread_name_prefix='country') as pool:
+                futures = [pool.submit(run_searches, scraper, job_titles, args) for scraper in scrapers]
+            total_jobs = sum(future.result() for future in futures)
         else:
-            print(f"No jobs found for '{job_title}'. Check the logs for details.")
+            total_jobs = run_searches(scrapers[0], job_titles, args)
+    finally:
+        if profiler is not None:
+            profile = profiler.stop()
+            flush_logs()
+            print(f"\n{profile['text']}")
+            print(f"Profile report: {profile['report']}")
+            print(f"Flame graph stacks: {profile['folded']} (render with flamegraph.pl or speedscope)")
     
+    # Summarise the whole run from the scraper-wide (or run-wide) metrics
+    search_summaries = [summary for scraper in scrapers for summary in scraper.search_summaries]
+    run_summary = build_summary(metrics, time.perf_counter() - run_start, searches=len(search_summaries),
+                                countries=countries)
+    run_summary_path = write_run_summary(search_summaries, run_summary)
+    flush_logs()
+    
+    print(f"\n{'='*80}")
+    print(format_summary(run_summary, f"Run summary: {len(search_summaries)} search(es)"))
+    print(f"Run summary saved to {run_summary_path}")
+    if near_duplicates is not None:
+        stats = near_duplicates.stats()
+        print(f"Near duplicates: {stats['duplicates']:,} of {stats['jobs']:,} indexed jobs "
+              f"in {stats['duplicate_clusters']:,} cluster(s)")
     print(f"\n{'='*80}")
     print(f"Scraping complete. Total jobs found across all searches: {total_jobs}")
 
-
 if __name__ == "__main__":
     main()
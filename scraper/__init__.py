@@ -2,5 +2,6 @@
 Indeed Job Scraper package using ScrapingBee API
 """
 from scraper.core import ScrapingBeeIndeedScraper
+from scraper.job_record import JobRecord
 
-__all__ = ['ScrapingBeeIndeedScraper']
+__all__ = ['ScrapingBeeIndeedScraper', 'JobRecord']
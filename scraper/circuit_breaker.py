@@ -0,0 +1,147 @@
+"""
+Circuit breaker around the ScrapingBee endpoint
+"""
+import threading
+import time
+from collections import deque
+from scraper.logging_utils import logger, Category
+
+# Circuit states
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Share of recent requests that must fail for the circuit to open
+DEFAULT_ERROR_THRESHOLD = 0.5
+
+# Recent requests the error rate is computed over
+DEFAULT_WINDOW = 20
+
+# Requests in the window before the error rate is trusted
+DEFAULT_MIN_REQUESTS = 5
+
+# Seconds the circuit stays open before it is probed, doubled after each failed probe
+DEFAULT_OPEN_SECONDS = 30
+MAX_OPEN_SECONDS = 600
+
+# Successful probes needed to close the circuit again
+DEFAULT_PROBE_SUCCESSES = 2
+
+class CircuitBreaker:
+    """
+    Stops sending requests while the ScrapingBee endpoint is failing
+
+    The breaker keeps the outcome of the last `window` requests. Timeouts,
+    connection errors and 5xx responses count as failures. When the failure
+    share reaches error_threshold, the circuit opens and requests fail at once
+    without being sent. After open_seconds, the circuit is half-open: one probe
+    request is let through at a time. probe_successes successful probes close
+    the circuit. A failed probe opens it again for twice as long, up to
+    MAX_OPEN_SECONDS.
+    """
+
+    def __init__(self, error_threshold=DEFAULT_ERROR_THRESHOLD, window=DEFAULT_WINDOW,
+                 min_requests=DEFAULT_MIN_REQUESTS, open_seconds=DEFAULT_OPEN_SECONDS,
+                 probe_successes=DEFAULT_PROBE_SUCCESSES):
+        """
+        Initialize the breaker in the closed state
+
+        Args:
+            error_threshold (float): Failure share of the window that opens the circuit
+            window (int): Recent requests the failure share is computed over
+            min_requests (int): Requests needed in the window before the circuit can open
+            open_seconds (float): Seconds before the first probe
+            probe_successes (int): Successful probes that close the circuit
+        """
+        self.error_threshold = error_threshold
+        self.min_requests = min_requests
+        self.base_open_seconds = open_seconds
+        self.probe_successes = probe_successes
+        self.state = CLOSED
+        self.opens = 0
+        self.rejected = 0
+        self._outcomes = deque(maxlen=window)
+        self._open_seconds = open_seconds
+        self._opened_at = None
+        self._probe_in_flight = False
+        self._probe_wins = 0
+        self._lock = threading.Lock()
+
+    def _open(self, now):
+        self.state = OPEN
+        self.opens += 1
+        self._opened_at = now
+        self._probe_in_flight = False
+        logger.warning(f"ScrapingBee circuit open - failing requests fast for {self._open_seconds:.0f}s")
+
+    def allow(self):
+        """
+        Check whether a request may be sent, claiming the probe slot when half-open
+
+        Returns:
+            bool: False if the request should fail without being sent
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+                self.state = HALF_OPEN
+                self._probe_wins = 0
+                logger.info("ScrapingBee circuit half-open - sending a probe request", extra=Category.NAVIGATION)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record(self, success):
+        """
+        Record the outcome of a request let through by allow()
+
+        Args:
+            success (bool): False for a timeout, connection error or 5xx response
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._probe_in_flight = False
+                if not success:
+                    self._open_seconds = min(self._open_seconds * 2, MAX_OPEN_SECONDS)
+                    self._open(now)
+                    return
+                self._probe_wins += 1
+                if self._probe_wins >= self.probe_successes:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    self._open_seconds = self.base_open_seconds
+                    logger.info("ScrapingBee circuit closed - resuming full traffic", extra=Category.SUCCESS)
+                return
+            if self.state == OPEN:
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_requests and failures / len(self._outcomes) >= self.error_threshold:
+                self._open(now)
+
+    def is_open(self):
+        """True while requests are being failed fast (open, or half-open with a probe in flight)"""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() - self._opened_at < self._open_seconds
+            return self.state == HALF_OPEN and self._probe_in_flight
+
+    def retry_after(self):
+        """Seconds until the circuit will let a probe through (0 if it would now)"""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(self._open_seconds - (time.monotonic() - self._opened_at), 0.0)
+
+    def collect_metrics(self):
+        """Metrics collector reporting the circuit state, openings and rejected requests"""
+        with self._lock:
+            return [
+                ('circuit_open', 'gauge', {}, 0 if self.state == CLOSED else 1),
+                ('circuit_opens_total', 'counter', {}, self.opens),
+                ('circuit_rejected_total', 'counter', {}, self.rejected),
+            ]
@@ -0,0 +1,292 @@
+"""
+Compaction of timestamped output files into one deduplicated dataset
+"""
+import csv
+import glob
+import json
+import os
+import re
+import sys
+import time
+from scraper.logging_utils import logger, Category
+from scraper.job_record import extract_job_key
+
+# Default location of the consolidated dataset
+DEFAULT_COMPACTED_DIR = os.path.join('data', 'compacted')
+COMPACTED_BASENAME = 'jobs'
+
+# Matches the timestamp added by generate_filename, e.g. data_engineer_london_20240101_120000.json
+TIMESTAMP_PATTERN = re.compile(r'_(\d{8}_\d{6})\.(?:json|csv)$')
+
+# Column order for the consolidated CSV (description_hash, duplicate_cluster and skill_tags appear when
+# the description store, near-duplicate index and skill tagger were used)
+CSV_COLUMNS = ['job_key', 'title', 'company', 'location', 'date_posted', 'url',
+               'description', 'description_hash', 'ai_data', 'duplicate_cluster', 'skill_tags',
+               'scraped_at']
+
+# Format of the scraped_at value recorded on compacted jobs
+SCRAPED_AT_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Read size for the streaming JSON parser
+READ_CHUNK_SIZE = 1 << 16
+
+def iter_json_array(path, chunk_size=READ_CHUNK_SIZE, strict=False):
+    """
+    Stream the objects of a top-level JSON array without loading the whole file
+
+    Args:
+        path (str): Path to a JSON file containing a list of objects
+        chunk_size (int): Number of characters read at a time
+        strict (bool): Raise ValueError for a file that is not a JSON array or is truncated,
+            instead of logging it and stopping
+
+    Yields:
+        dict: Each element of the array
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            if strict:
+                raise ValueError(f"{path} is not a JSON array")
+            logger.warning(f"Skipping {path}: not a JSON array")
+            return
+        buffer = buffer[1:]
+        eof = False
+
+        while True:
+            buffer = buffer.lstrip().lstrip(',').lstrip()
+            if buffer.startswith(']'):
+                return
+            try:
+                item, end = decoder.raw_decode(buffer)
+            except json.JSONDecodeError:
+                if eof:
+                    if strict:
+                        raise ValueError(f"Truncated or invalid JSON in {path}")
+                    logger.error(f"Truncated or invalid JSON in {path}")
+                    return
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            yield item
+            buffer = buffer[end:]
+
+def iter_csv_rows(path):
+    """
+    Stream job dictionaries from a CSV file written by save_jobs_to_csv
+
+    Args:
+        path (str): Path to the CSV file
+
+    Yields:
+        dict: Each row, with empty cells dropped
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            yield {key: value for key, value in row.items() if key and value != ''}
+
+def compacted_path(output_dir=DEFAULT_COMPACTED_DIR):
+    """Path of the consolidated JSON dataset that compact_data writes to output_dir"""
+    return os.path.join(output_dir, f"{COMPACTED_BASENAME}.json")
+
+def snapshot_scraped_at(path):
+    """When the jobs in an output file were scraped, formatted with SCRAPED_AT_FORMAT"""
+    return time.strftime(SCRAPED_AT_FORMAT, time.strptime(snapshot_timestamp(path), '%Y%m%d_%H%M%S'))
+
+def snapshot_timestamp(path):
+    """Sort key for an output file: the generate_filename timestamp, else the modification time"""
+    match = TIMESTAMP_PATTERN.search(os.path.basename(path))
+    if match:
+        return match.group(1)
+    return time.strftime('%Y%m%d_%H%M%S', time.localtime(os.path.getmtime(path)))
+
+def find_snapshot_files(data_dir='data'):
+    """
+    List the timestamped output files in data_dir, newest first
+
+    CSV files are only included when there is no JSON file with the same name,
+    since the JSON copy of a snapshot is lossless.
+
+    Args:
+        data_dir (str): Directory containing the scraper output
+
+    Returns:
+        list: File paths, newest snapshot first
+    """
+    json_files = glob.glob(os.path.join(data_dir, '*.json'))
+    json_bases = {os.path.splitext(path)[0] for path in json_files}
+    csv_files = [path for path in glob.glob(os.path.join(data_dir, '*.csv'))
+                 if os.path.splitext(path)[0] not in json_bases]
+    return sorted(json_files + csv_files, key=snapshot_timestamp, reverse=True)
+
+def iter_snapshot_jobs(path, strict=False):
+    """Stream the jobs of a JSON or CSV snapshot (strict: raise on a truncated JSON file)"""
+    if path.endswith('.json'):
+        return iter_json_array(path, strict=strict)
+    return iter_csv_rows(path)
+
+def job_identity(job):
+    """Key used to decide whether two saved jobs are the same job"""
+    return extract_job_key(job.get('url')) or f"{job.get('title')}|{job.get('company')}|{job.get('location')}"
+
+class JsonArrayWriter:
+    """Write a JSON array one object at a time"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[')
+        self.count = 0
+
+    def write(self, item):
+        self.file.write(',\n  ' if self.count else '\n  ')
+        self.file.write(json.dumps(item, ensure_ascii=False))
+        self.count += 1
+
+    def close(self):
+        self.file.write('\n]\n' if self.count else ']\n')
+        self.file.close()
+
+class ProgressDisplay:
+    """Single-line progress display for long compactions"""
+
+    def __init__(self, total_files, enabled=True, interval=0.5):
+        self.total_files = total_files
+        self.enabled = enabled
+        self.interval = interval
+        self.start_time = time.time()
+        self._last_draw = 0
+
+    def update(self, files_done, records, unique, bytes_read, force=False):
+        if not self.enabled:
+            return
+        now = time.time()
+        if not force and now - self._last_draw < self.interval:
+            return
+        self._last_draw = now
+        elapsed = max(now - self.start_time, 1e-9)
+        sys.stdout.write(
+            f"\r[PROG] files {files_done}/{self.total_files} | records {records:,} | "
+            f"unique {unique:,} | {records / elapsed:,.0f} rec/s | {bytes_read / elapsed / 1024 / 1024:.1f} MB/s"
+        )
+        sys.stdout.flush()
+
+    def finish(self):
+        if self.enabled:
+            sys.stdout.write('\n')
+            sys.stdout.flush()
+
+def compact_data(data_dir='data', output_dir=DEFAULT_COMPACTED_DIR, write_csv=True, prune=False, show_progress=True):
+    """
+    Merge all timestamped snapshots in data_dir into one deduplicated dataset
+
+    Files are streamed newest first, so the first version seen of each job key
+    is the latest one; only the set of seen keys is kept in memory. A previous
+    consolidated dataset in output_dir is read last and rewritten.
+
+    Args:
+        data_dir (str): Directory containing the scraper output
+        output_dir (str): Directory for the consolidated jobs.json / jobs.csv
+        write_csv (bool): Whether to also write jobs.csv
+        prune (bool): Whether to delete the snapshot files once they are compacted
+        show_progress (bool): Whether to draw a progress line on stdout
+
+    Returns:
+        dict: Throughput report (files, records, unique jobs, bytes, seconds, rates)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = compacted_path(output_dir)
+    csv_path = os.path.join(output_dir, f"{COMPACTED_BASENAME}.csv")
+
+    run_started = time.time()
+    snapshots = find_snapshot_files(data_dir)
+    inputs = snapshots + ([json_path] if os.path.exists(json_path) else [])
+    logger.info(f"Compacting {len(snapshots)} snapshot files from {data_dir} into {output_dir}", extra=Category.SAVING)
+
+    tmp_json_path = json_path + '.tmp'
+    tmp_csv_path = csv_path + '.tmp'
+    json_writer = JsonArrayWriter(tmp_json_path)
+    csv_file = open(tmp_csv_path, 'w', encoding='utf-8', newline='') if write_csv else None
+    csv_writer = None
+    if csv_file:
+        csv_writer = csv.DictWriter(csv_file, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        csv_writer.writeheader()
+
+    seen = set()
+    # Files read to the end without an error - the only ones --prune may delete
+    fully_read = set()
+    records = 0
+    bytes_read = 0
+    start_time = time.time()
+    progress = ProgressDisplay(len(inputs), enabled=show_progress)
+
+    try:
+        for files_done, path in enumerate(inputs, 1):
+            try:
+                scraped_at = snapshot_scraped_at(path)
+                for job in iter_snapshot_jobs(path, strict=True):
+                    records += 1
+                    key = job_identity(job)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    job['job_key'] = key
+                    # Relative dates like "Posted 3 days ago" are only meaningful against the scrape time
+                    job.setdefault('scraped_at', scraped_at)
+                    json_writer.write(job)
+                    if csv_writer:
+                        row = dict(job)
+                        for field in ('ai_data', 'skill_tags'):
+                            if isinstance(row.get(field), dict):
+                                row[field] = json.dumps(row[field], ensure_ascii=False)
+                        csv_writer.writerow(row)
+                    progress.update(files_done - 1, records, len(seen), bytes_read)
+                fully_read.add(path)
+            except Exception as e:
+                logger.error(f"Error reading {path}: {str(e)}")
+            bytes_read += os.path.getsize(path)
+            progress.update(files_done, records, len(seen), bytes_read, force=True)
+    finally:
+        json_writer.close()
+        if csv_file:
+            csv_file.close()
+        progress.finish()
+
+    os.replace(tmp_json_path, json_path)
+    if write_csv:
+        os.replace(tmp_csv_path, csv_path)
+
+    pruned = 0
+    if prune:
+        for path in snapshots:
+            # Keep files that failed to parse and files a running scrape wrote to after compaction started
+            twin = os.path.splitext(path)[0] + '.csv'
+            twin = twin if path.endswith('.json') and os.path.exists(twin) else None
+            changed = any(os.path.getmtime(file) >= run_started for file in (path, twin) if file)
+            if path not in fully_read or changed:
+                logger.warning(f"Keeping {path} - it was not fully read or changed during compaction")
+                continue
+            os.remove(path)
+            # Remove the CSV twin that was skipped in favour of the JSON copy
+            if twin:
+                os.remove(twin)
+            pruned += 1
+        logger.info(f"Pruned {pruned} of {len(snapshots)} compacted snapshot files", extra=Category.SAVING)
+
+    elapsed = max(time.time() - start_time, 1e-9)
+    report = {
+        'files': len(inputs),
+        'files_failed': len(inputs) - len(fully_read),
+        'files_pruned': pruned,
+        'records_read': records,
+        'unique_jobs': len(seen),
+        'duplicates_dropped': records - len(seen),
+        'bytes_read': bytes_read,
+        'seconds': round(elapsed, 3),
+        'records_per_second': round(records / elapsed, 1),
+        'mb_per_second': round(bytes_read / elapsed / 1024 / 1024, 2),
+        'output': json_path
+    }
+    logger.info(f"Compaction complete: {len(seen)} unique jobs from {records} records [OK]", extra=Category.SUCCESS)
+    return report
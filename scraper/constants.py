@@ -10,9 +10,21 @@ load_dotenv()
 # ScrapingBee API key
 API_KEY = "SXE9F6ZZ8E8FGAFGE988REK5KABOUJJCZPSF7WHXMOK5ALSV2AJ9PXTVY23K6YMRZSOVJY3I0IFGEGDD"
 
+# ScrapingBee API endpoint - override with SCRAPINGBEE_API_URL to use a local stand-in
+SCRAPINGBEE_API_URL = os.getenv('SCRAPINGBEE_API_URL', 'https://app.scrapingbee.com/api/v1/')
+
+# Seconds to wait for a ScrapingBee response before the request counts as timed out
+REQUEST_TIMEOUT = 90
+
 # Indeed country URLs
 INDEED_URLS = {
     'uk': 'https://uk.indeed.com',
     'us': 'https://www.indeed.com',
     # Add other countries as needed
 }
+
+# ScrapingBee proxy country for each Indeed site, so pages are fetched from inside the country
+PROXY_COUNTRY_CODES = {
+    'uk': 'gb',
+    'us': 'us',
+}
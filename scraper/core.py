@@ -2,29 +2,91 @@
 Core functionality for the Indeed Job Scraper
 """
 import requests
+import functools
+from urllib.parse import urlencode
 import json
+import os
 import time
-from scraper.constants import API_KEY, INDEED_URLS
-from scraper.logging_utils import logger, print_box, configure_job_specific_logger
+from scraper.constants import API_KEY, INDEED_URLS, PROXY_COUNTRY_CODES, SCRAPINGBEE_API_URL, REQUEST_TIMEOUT
+from scraper.credits import (estimate_request_credits, credits_from_headers, plan_credits,
+                             CreditBudget, BILLED_STATUS_CODES)
+from scraper.metrics import MetricsRegistry
+from scraper.hedging import HedgedRequests
+from scraper.circuit_breaker import CircuitBreaker, DEFAULT_ERROR_THRESHOLD, DEFAULT_OPEN_SECONDS
+from scraper.local_extraction import extract_fields
+from scraper.job_record import as_job_dict, extract_job_key
+from scraper.run_summary import build_summary
+from scraper.event_log import NullEventLog
+from scraper.profiling import stage_timer, page_boundary
+from scraper.logging_utils import logger, Category, print_box, configure_job_specific_logger
 from scraper.file_utils import generate_filename, save_jobs_to_json, save_jobs_to_csv
-from scraper.html_parser import extract_description_from_html, extract_job_data
+from scraper.html_parser import extract_description_from_html, parse_search_results, enrich_job_data, parse_job_count
 
 class ScrapingBeeIndeedScraper:
-    def __init__(self, api_key=API_KEY, country='uk'):
+    def __init__(self, api_key=API_KEY, country='uk', description_store=None, search_index=None,
+                 event_log=None, api_url=SCRAPINGBEE_API_URL, credit_budget=None, budget_parent=None,
+                 metrics_parent=None, hedge_fraction=None, circuit_threshold=DEFAULT_ERROR_THRESHOLD,
+                 circuit_open_seconds=DEFAULT_OPEN_SECONDS, local_extraction=False, near_duplicates=None,
+                 skill_tagger=None):
         """
         Initialize the scraper with API key and country
         
         Args:
             api_key (str): ScrapingBee API key
             country (str): Country code for Indeed (default: 'uk')
+            description_store (DescriptionStore): Store descriptions by content hash instead of
+                inline in the saved files (default: None)
+            search_index (SearchIndex): Full-text index updated whenever progress is saved (default: None)
+            event_log (EventLog): Structured JSON-lines event log (default: None)
+            api_url (str): ScrapingBee endpoint (default: SCRAPINGBEE_API_URL)
+            credit_budget (int): Maximum credits this scraper may spend (default: None = unlimited)
+            budget_parent (CreditBudget): Run-wide budget shared with other scrapers, also charged
+                for every request (default: None)
+            metrics_parent (MetricsRegistry): Run-wide registry that also receives this scraper's
+                metrics (default: None)
+            hedge_fraction (float): Hedge requests slower than their page type's p95 latency,
+                duplicating at most this share of requests (default: None = no hedging)
+            circuit_threshold (float): Failure share of recent requests that opens the circuit
+                breaker (default: 0.5; None = no circuit breaker)
+            circuit_open_seconds (float): Seconds the open circuit waits before a probe request
+                (default: 30)
+            local_extraction (bool): Fill ai_data from the description text when ScrapingBee AI
+                extraction returned nothing or was not used (default: False)
+            near_duplicates (NearDuplicateIndex): Index assigning every fetched description a
+                near-duplicate cluster (default: None)
+            skill_tagger (SkillTagger): Tagger counting vocabulary skills in every fetched
+                description; also used for local extraction's required_skills (default: None)
         """
         self.api_key = api_key
+        self.api_url = api_url
+        self.request_timeout = REQUEST_TIMEOUT
         self.country = country
         self.base_url = INDEED_URLS.get(country, INDEED_URLS['uk'])
+        self.proxy_country_code = PROXY_COUNTRY_CODES[country if country in INDEED_URLS else 'uk']
+        self.description_store = description_store
+        self.search_index = search_index
+        self.event_log = event_log or NullEventLog()
+        self.metrics = MetricsRegistry(parent=metrics_parent)
+        self.search_summaries = []
+        self.budget = CreditBudget(credit_budget, parent=budget_parent)
+        self.metrics.add_collector(self.budget.collect_metrics)
+        if description_store is not None:
+            self.metrics.add_collector(description_store.cache_metrics)
+        self.hedging = None
+        if hedge_fraction:
+            self.hedging = HedgedRequests(self.metrics, hedge_fraction)
+            self.metrics.add_collector(self.hedging.collect_metrics)
+        self.local_extraction = local_extraction
+        self.near_duplicates = near_duplicates
+        self.skill_tagger = skill_tagger
+        self.circuit = None
+        if circuit_threshold is not None:
+            self.circuit = CircuitBreaker(circuit_threshold, open_seconds=circuit_open_seconds)
+            self.metrics.add_collector(self.circuit.collect_metrics)
         
-        logger.info(f"Initialized scraper for {self.base_url}")
+        logger.info(f"Initialized scraper for {self.base_url}", extra=Category.STARTING)
         
-    def construct_indeed_url(self, job_position, job_location, date_posted=''):
+    def construct_indeed_url(self, job_position, job_location, date_posted='', url_params=None):
         """
         Construct the Indeed search URL
         
@@ -32,6 +94,7 @@ class ScrapingBeeIndeedScraper:
             job_position (str): Job title to search for
             job_location (str): Location to search in
             date_posted (str): Filter for jobs posted within X days
+            url_params (dict): Additional Indeed filters, e.g. {'jt': 'contract', 'radius': '5'}
             
         Returns:
             str: Full Indeed URL
@@ -43,10 +106,17 @@ class ScrapingBeeIndeedScraper:
         
         if date_posted:
             full_url += f'&fromage={date_posted}'
+        
+        if url_params:
+            full_url += '&' + urlencode(url_params)
             
-        logger.info(f"Constructed URL: {full_url}")
+        logger.info(f"Constructed URL: {full_url}", extra=Category.NAVIGATION)
         return full_url
     
+    def file_country(self):
+        """Country tag for data and log file names - None for uk, whose files keep their original names"""
+        return None if self.country == 'uk' else self.country
+    
     def get_scrapingbee_params(self):
         """
         Get ScrapingBee parameters for Indeed scraping
@@ -58,31 +128,29 @@ class ScrapingBeeIndeedScraper:
         return {
             'render_js': 'true',
             'premium_proxy': 'true',
-            'country_code': 'gb',
+            'country_code': self.proxy_country_code,
             'stealth_proxy': 'true',
             'wait': '5000',  # Wait 5 seconds for JS to load
             'block_resources': 'false',  # Don't block any resources
             'return_page_source': 'true'
         }
     
-    def scrape_page(self, url, use_ai_extraction=False, max_retries=1):
+    def build_request_params(self, url, use_ai_extraction=False):
         """
-        Scrape a page using ScrapingBee API
+        Build the ScrapingBee parameters for one request
         
         Args:
             url (str): URL to scrape
-            use_ai_extraction (bool): Whether to use AI extraction
-            max_retries (int): Maximum number of retries for timeout errors
+            use_ai_extraction (bool): Whether to attach AI extraction rules
             
         Returns:
-            tuple: (success, response_text, ai_data)
+            dict: ScrapingBee parameters, including the target URL
         """
         params = self.get_scrapingbee_params()
         params['url'] = url
         
         # Add AI extraction rules if requested
         if use_ai_extraction:
-            logger.info("Using AI extraction for this request")
             # Create AI extraction rules as a JSON object
             ai_rules = {
                 "job_title": "the job title",
@@ -97,23 +165,122 @@ class ScrapingBeeIndeedScraper:
             # Add the stringified JSON to the parameters
             params['ai_extract_rules'] = json.dumps(ai_rules)
         
-        api_url = f"https://app.scrapingbee.com/api/v1/"
+        return params
+    
+    def request_credits(self, use_ai_extraction=False):
+        """Estimated credit cost of one request with the current scraping parameters"""
+        return estimate_request_credits(self.build_request_params(None, use_ai_extraction))
+    
+    @stage_timer('scrape_page')
+    def scrape_page(self, url, use_ai_extraction=False, max_retries=1, page_type=None, metrics=None, budget=None):
+        """
+        Scrape a page using ScrapingBee API
+        
+        Every call records its latency, response size, status, retry count and
+        estimated credits in the metrics registry, tagged by page type. The
+        estimated cost is reserved from the credit budget before the request is
+        sent; requests the budget cannot cover are not sent. While the circuit
+        breaker is open, requests fail at once without being sent.
+        
+        Args:
+            url (str): URL to scrape
+            use_ai_extraction (bool): Whether to use AI extraction
+            max_retries (int): Maximum number of retries for timeout errors
+            page_type (str): 'search', 'job' or 'ai' (default: 'ai' if use_ai_extraction else 'search')
+            metrics (MetricsRegistry): Registry to record into (default: the scraper's registry)
+            budget (CreditBudget): Budget to charge (default: the scraper's budget)
+            
+        Returns:
+            tuple: (success, response_text, ai_data)
+        """
+        page_type = page_type or ('ai' if use_ai_extraction else 'search')
+        metrics = metrics or self.metrics
+        budget = budget or self.budget
+        
+        params = self.build_request_params(url, use_ai_extraction)
+        estimated_credits = estimate_request_credits(params)
+        if not budget.reserve(estimated_credits):
+            metrics.inc('errors_total', type='budget')
+            logger.error(f"Credit budget exhausted: {estimated_credits} credits needed, "
+                         f"{budget.remaining()} remaining - request not sent")
+            return False, None, None
+        
+        # Checked after the reservation: a half-open circuit hands out its probe slot here,
+        # and only a request that is then sent releases it by recording its outcome
+        if self.circuit is not None and not self.circuit.allow():
+            budget.settle(estimated_credits, 0)
+            metrics.inc('errors_total', type='circuit_open')
+            logger.error(f"ScrapingBee circuit open - request not sent (next probe in "
+                         f"{self.circuit.retry_after():.0f}s)")
+            return False, None, None
+        
+        if use_ai_extraction:
+            logger.info("Using AI extraction for this request", extra=Category.AI)
+        
+        start_time = time.perf_counter()
+        outcome = {'status': 'error', 'bytes': 0, 'retries': 0, 'error': None, 'cost': None, 'remaining': None}
+        
+        api_url = self.api_url
         
+        metrics.add_gauge('requests_in_flight', 1)
+        try:
+            return self._send_scrapingbee_request(api_url, params, use_ai_extraction, max_retries, outcome,
+                                                  page_type=page_type, metrics=metrics, budget=budget,
+                                                  credits=estimated_credits)
+        finally:
+            metrics.add_gauge('requests_in_flight', -1)
+            metrics_labels = {'page_type': page_type}
+            if outcome['status'] != 200:
+                metrics.inc('errors_total', type=outcome['error'] or f"http_{outcome['status']}")
+            elapsed = time.perf_counter() - start_time
+            metrics.observe('request_latency_seconds', elapsed, **metrics_labels)
+            metrics.observe('response_bytes', outcome['bytes'], **metrics_labels)
+            metrics.inc('requests_total', status=str(outcome['status']), **metrics_labels)
+            metrics.inc('request_retries_total', outcome['retries'], **metrics_labels)
+            metrics.record_slowest('requests', round(elapsed, 3), url=url, status=str(outcome['status']),
+                                   **metrics_labels)
+            charged = 0
+            if outcome['status'] in BILLED_STATUS_CODES:
+                metrics.inc('credits_estimated_total', estimated_credits, **metrics_labels)
+                charged = estimated_credits if outcome['cost'] is None else outcome['cost']
+            elif outcome['cost'] is not None:
+                charged = outcome['cost']
+            if charged:
+                metrics.inc('credits_charged_total', charged, **metrics_labels)
+            budget.settle(estimated_credits, charged, outcome['remaining'])
+    
+    def _send_scrapingbee_request(self, api_url, params, use_ai_extraction, max_retries, outcome,
+                                  page_type='search', metrics=None, budget=None, credits=0):
+        """
+        Send a request to ScrapingBee, retrying on timeouts
+        
+        Args:
+            api_url (str): ScrapingBee endpoint
+            params (dict): ScrapingBee parameters, including the target URL
+            use_ai_extraction (bool): Whether AI extraction rules were attached
+            max_retries (int): Maximum number of retries for timeout errors
+            outcome (dict): Filled in with the final 'status', response 'bytes', 'retries',
+                'error' type and the 'cost' / 'remaining' credits reported in the headers
+            page_type (str): Page type, used to pick the hedge delay
+            metrics (MetricsRegistry): Registry recording hedges
+            budget (CreditBudget): Budget a hedge reserves its credits from
+            credits (int): Estimated credits of the request
+            
+        Returns:
+            tuple: (success, response_text, ai_data)
+        """
         retries = 0
         while retries <= max_retries:
             try:
-                logger.info(f"Sending request to ScrapingBee")
-                response = requests.get(
-                    api_url,
-                    params={
-                        'api_key': self.api_key,
-                        **params
-                    },
-                    timeout=90  # Increased timeout from 60 to 90 seconds
-                )
+                logger.info(f"Sending request to ScrapingBee", extra=Category.NAVIGATION)
+                response = self._send_request(api_url, params, page_type, metrics or self.metrics,
+                                              budget or self.budget, credits)
+                outcome['status'] = response.status_code
+                outcome['bytes'] = len(response.content)
+                outcome['cost'], outcome['remaining'] = credits_from_headers(response.headers)
             
                 if response.status_code == 200:
-                    logger.info(f"Successfully received response [OK]")
+                    logger.info(f"Successfully received response [OK]", extra=Category.SUCCESS)
                     
                     # Parse AI extraction data if it was requested
                     ai_data = None
@@ -123,7 +290,7 @@ class ScrapingBeeIndeedScraper:
                             ai_extraction_header = response.headers.get('X-ScrapingBee-AI-Extraction')
                             if ai_extraction_header:
                                 ai_data = json.loads(ai_extraction_header)
-                                logger.info(f"Successfully extracted AI data from headers: {list(ai_data.keys())} [OK]")
+                                logger.info(f"Successfully extracted AI data from headers: {list(ai_data.keys())} [OK]", extra=Category.AI)
                             else:
                                 # If not in headers, check if the response body is JSON
                                 try:
@@ -132,7 +299,7 @@ class ScrapingBeeIndeedScraper:
                                     # Check if it has the expected AI extraction fields
                                     if isinstance(json_data, dict) and 'job_title' in json_data:
                                         ai_data = json_data
-                                        logger.info(f"Successfully extracted AI data from response body: {list(ai_data.keys())} [OK]")
+                                        logger.info(f"Successfully extracted AI data from response body: {list(ai_data.keys())} [OK]", extra=Category.AI)
                                     else:
                                         logger.warning("AI extraction was requested but no results were found in response")
                                 except json.JSONDecodeError:
@@ -148,47 +315,123 @@ class ScrapingBeeIndeedScraper:
                     
             except requests.exceptions.Timeout:
                 retries += 1
-                if retries <= max_retries:
+                if retries <= max_retries and (self.circuit is None or self.circuit.allow()):
+                    outcome['retries'] = retries
                     logger.warning(f"Request timed out. Retrying ({retries}/{max_retries})...")
                     time.sleep(2)  # Wait 2 seconds before retrying
                 else:
-                    logger.error("Request timed out and max retries reached")
+                    outcome['status'] = 'timeout'
+                    outcome['error'] = 'timeout'
+                    logger.error("Request timed out and max retries reached" if retries > max_retries
+                                 else "Request timed out - not retrying while the circuit is open")
                     return False, None, None
             except Exception as e:
+                outcome['error'] = type(e).__name__
                 logger.error(f"Exception during scraping: {str(e)}")
                 return False, None, None
     
-    def fetch_job_description(self, job_url, use_ai_extraction=False):
+    def _send_request(self, api_url, params, page_type, metrics, budget, credits):
+        """
+        Send one HTTP request to ScrapingBee, hedged when hedging is enabled
+        
+        The outcome is recorded in the circuit breaker: timeouts, connection
+        errors and 5xx responses count as failures.
+        
+        Returns:
+            requests.Response: The response (the first successful one if hedged)
+        """
+        def send():
+            return requests.get(
+                api_url,
+                params={
+                    'api_key': self.api_key,
+                    **params
+                },
+                timeout=self.request_timeout
+            )
+        try:
+            if self.hedging is None:
+                response = send()
+            else:
+                response = self.hedging.send(send, page_type, metrics, budget, credits)
+        except Exception:
+            if self.circuit is not None:
+                self.circuit.record(False)
+            raise
+        if self.circuit is not None:
+            self.circuit.record(response.status_code < 500)
+        return response
+    
+    def _sleep(self, seconds, metrics, reason):
+        """
+        Wait between requests, recording the time slept
+        
+        Args:
+            seconds (float): Delay in seconds
+            metrics (MetricsRegistry): Registry to record into
+            reason (str): 'page' or 'job'
+        """
+        start_time = time.perf_counter()
+        time.sleep(seconds)
+        metrics.observe('sleep_duration_seconds', time.perf_counter() - start_time, reason=reason)
+    
+    def fetch_job_description(self, job_url, use_ai_extraction=False, metrics=None, budget=None, job=None):
         """
         Fetch and extract the job description from a job listing page
         
         Args:
             job_url (str): URL of the job listing
             use_ai_extraction (bool): Whether to use AI extraction
+            metrics (MetricsRegistry): Registry to record the request into (default: the scraper's registry)
+            budget (CreditBudget): Budget to charge (default: the scraper's budget)
+            job (Mapping): Job card, used for the title, company and location of locally
+                extracted fields (default: None)
             
         Returns:
             dict: {
                 'conventional': conventional_description,
-                'ai': ai_extracted_data  # Only if use_ai_extraction is True
+                'ai': ai_extracted_data,  # If use_ai_extraction or local extraction is on
+                'duplicate_cluster': cluster_id,  # If a near-duplicate index is used
+                'skill_tags': {skill: count}  # If a skill tagger is used
             }
         """
         result = {}
+        metrics = metrics or self.metrics
         
         try:
-            logger.info(f"Attempting to fetch job description")
-            success, html_content, ai_data = self.scrape_page(job_url, use_ai_extraction, max_retries=1)
+            logger.info(f"Attempting to fetch job description", extra=Category.DESCRIPTION)
+            success, html_content, ai_data = self.scrape_page(
+                job_url, use_ai_extraction, max_retries=1,
+                page_type='ai' if use_ai_extraction else 'job', metrics=metrics, budget=budget
+            )
             
             if success and html_content:
                 # Extract description using conventional method
+                parse_start = time.perf_counter()
                 description = extract_description_from_html(html_content)
+                metrics.observe('parse_duration_seconds', time.perf_counter() - parse_start, stage='description')
                 if description:
-                    logger.info(f"Successfully extracted job description ({len(description)} chars) [OK]")
+                    logger.info(f"Successfully extracted job description ({len(description)} chars) [OK]", extra=Category.DESCRIPTION)
                     result['conventional'] = description
                     
                     # If AI extraction was requested and successful
                     if use_ai_extraction and ai_data:
                         result['ai'] = ai_data
-                        logger.info(f"Successfully extracted AI data for job description [OK]")
+                        logger.info(f"Successfully extracted AI data for job description [OK]", extra=Category.AI)
+                    elif self.local_extraction:
+                        parse_start = time.perf_counter()
+                        result['ai'] = extract_fields(description, job, self.skill_tagger)
+                        metrics.observe('parse_duration_seconds', time.perf_counter() - parse_start,
+                                        stage='local_extraction')
+                    
+                    if self.skill_tagger is not None:
+                        parse_start = time.perf_counter()
+                        result['skill_tags'] = self.skill_tagger.tag(description)
+                        metrics.observe('parse_duration_seconds', time.perf_counter() - parse_start,
+                                        stage='skill_tags')
+                    
+                    if self.near_duplicates is not None:
+                        result['duplicate_cluster'] = self._duplicate_cluster(job_url, description, job, metrics)
                     
                     return result
                 else:
@@ -203,12 +446,28 @@ class ScrapingBeeIndeedScraper:
         result['conventional'] = None
         return result
     
-    def scrape_indeed_jobs(self, job_position, job_location, date_posted='', 
-                          fetch_descriptions=True, use_ai_extraction=True,
-                          max_jobs=None, max_pages=None, delay_between_pages=2, 
-                          delay_between_jobs=1, save_progress=True, pagination_test=False):
+    def _duplicate_cluster(self, job_url, description, job, metrics):
+        """Add a fetched description to the near-duplicate index and return the job's cluster"""
+        record = dict(as_job_dict(job)) if job is not None else {}
+        record.update(url=job_url, description=description)
+        dedupe_start = time.perf_counter()
+        cluster = self.near_duplicates.add(record)
+        metrics.observe('parse_duration_seconds', time.perf_counter() - dedupe_start, stage='near_duplicates')
+        if cluster is not None and cluster != extract_job_key(job_url):
+            metrics.inc('near_duplicates_total')
+        return cluster
+    
+    def iter_indeed_jobs(self, job_position, job_location, date_posted='', 
+                         fetch_descriptions=True, use_ai_extraction=True,
+                         max_jobs=None, max_pages=None, delay_between_pages=2, 
+                         delay_between_jobs=1, save_progress=False, pagination_test=False, search_budget=None,
+                         known_job_keys=None, url_params=None, sort_by_date=False, stop_after_known_pages=None,
+                         seen_job_keys=None):
         """
-        Scrape Indeed jobs
+        Scrape Indeed jobs, yielding each job as soon as it has been enriched
+        
+        Jobs are not accumulated unless save_progress is enabled, so memory stays
+        bounded on large crawls and callers see the first job after a single page.
         
         Args:
             job_position (str): Job title to search for
@@ -220,108 +479,397 @@ class ScrapingBeeIndeedScraper:
             max_pages (int): Maximum number of pages to scrape (default: None = no limit)
             delay_between_pages (int): Delay in seconds between page requests
             delay_between_jobs (int): Delay in seconds between job description requests
-            save_progress (bool): Whether to save progress after each page
+            save_progress (bool): Whether to save all jobs found so far after each page
+            pagination_test (bool): Only process one job per page, without descriptions
+            search_budget (int): Maximum credits this search may spend, within the scraper's
+                budget (default: None = only the scraper's budget applies)
+            known_job_keys (function): Called with the job keys of each page; returns those whose
+                description is already stored. These jobs are yielded as card refreshes, without
+                a description request (default: None = fetch every description)
+            url_params (dict): Additional Indeed filters added to the search URL (default: None)
+            sort_by_date (bool): Sort results newest first instead of by relevance
+            stop_after_known_pages (int): Stop after this many consecutive pages on which every job
+                is already known - with sort_by_date, later pages hold older, known jobs too
+                (default: None = page until the end)
+            seen_job_keys (function): Called with the job keys of each page; returns those already in
+                the persistent job index, for stop_after_known_pages (default: known_job_keys)
             
-        Returns:
-            list: List of job dictionaries
+        Yields:
+            JobRecord: Job details, including description and AI data when requested
         """
         # Print a nice box with search info
-        print_box(f"STARTING SEARCH: {job_position} in {job_location}", "INFO", "[SRCH]")
+        print_box(f"STARTING SEARCH: {job_position} in {job_location} ({self.country})", "INFO", "[SRCH]")
         
         # Configure job-specific logger
-        configure_job_specific_logger(job_position, job_location)
+        file_country = self.file_country()
+        configure_job_specific_logger(job_position, job_location, file_country)
         
-        all_jobs = []
-        indeed_url = self.construct_indeed_url(job_position, job_location, date_posted)
+        saved_jobs = []
+        jobs_yielded = 0
+        if sort_by_date:
+            url_params = dict(url_params or {}, sort='date')
+        indeed_url = self.construct_indeed_url(job_position, job_location, date_posted, url_params)
+        seen_job_keys = seen_job_keys or known_job_keys
+        known_pages = 0
         current_page = 1
         next_page_url = None
         total_job_count = "Unknown"
+        search_completed = False
         
         # Create filenames for progress saving - always include timestamp
-        json_filename = generate_filename(job_position, job_location, 'json')
+        json_filename = generate_filename(job_position, job_location, 'json', country=file_country)
         json_path = f'data/{json_filename}'
-        csv_filename = generate_filename(job_position, job_location, 'csv')
+        csv_filename = generate_filename(job_position, job_location, 'csv', country=file_country)
         csv_path = f'data/{csv_filename}'
+        metrics_path = os.path.join('logs', f"metrics_{generate_filename(job_position, job_location, 'json', country=file_country)}")
+        
+        # Per-search metrics, also forwarded to the scraper-wide registry
+        search_metrics = MetricsRegistry(parent=self.metrics)
+        budget = CreditBudget(search_budget, parent=self.budget)
+        fetch_job_description = functools.partial(self.fetch_job_description, metrics=search_metrics, budget=budget)
+        sleep_between_jobs = functools.partial(self._sleep, metrics=search_metrics, reason='job')
+        search_start = time.perf_counter()
+        events = self.event_log.search(job_position, job_location, country=self.country,
+                                       date_posted=date_posted, url=indeed_url)
         
-        logger.info(f"Starting job scraping for '{job_position}' in '{job_location}'")
+        # Credits per request, used to stop before the budget is overdrawn
+        search_credits = self.request_credits()
+        job_credits = self.request_credits(use_ai_extraction)
+        budget_exhausted = False
         
-        while True:
-            # Check if we've reached the maximum page limit
-            if max_pages is not None and current_page > max_pages:
-                logger.info(f"Reached maximum page limit of {max_pages}")
-                break
+        logger.info(f"Starting job scraping for '{job_position}' in '{job_location}'", extra=Category.STARTING)
+        
+        try:
+            while True:
+                # Check if we've reached the maximum page limit
+                if max_pages is not None and current_page > max_pages:
+                    logger.info(f"Reached maximum page limit of {max_pages}", extra=Category.NAVIGATION)
+                    search_completed = True
+                    break
+                
+                if not budget.can_afford(search_credits):
+                    logger.warning(f"Credit budget exhausted ({budget.remaining()} credits left) - stopping before page {current_page}")
+                    events.emit('budget_exhausted', page=current_page, remaining=budget.remaining())
+                    break
                 
-            logger.info(f"Scraping page {current_page}")
+                logger.info(f"Scraping page {current_page}", extra=Category.NAVIGATION)
             
-            try:
-                # Don't use AI extraction for the search results page, only for job descriptions
-                success, html_content, _ = self.scrape_page(indeed_url, use_ai_extraction=False, max_retries=1)
+                try:
+                    # Don't use AI extraction for the search results page, only for job descriptions
+                    with events.timed('page_fetch', page=current_page, url=indeed_url) as event:
+                        success, html_content, _ = self.scrape_page(
+                            indeed_url, use_ai_extraction=False, max_retries=1,
+                            page_type='search', metrics=search_metrics, budget=budget
+                        )
+                        event['success'] = bool(success and html_content)
                 
-                if success and html_content:
-                    # If pagination_test is enabled, override fetch_descriptions and max_jobs
-                    # to speed up the process and focus on pagination
-                    if pagination_test:
-                        logger.info("Pagination test mode enabled - skipping job descriptions")
-                        effective_fetch_descriptions = False
-                        effective_use_ai_extraction = False
-                        # Process just 1 job per page to quickly move to pagination
-                        effective_max_jobs = 1 if max_jobs is None else min(max_jobs - len(all_jobs), 1)
-                    else:
-                        effective_fetch_descriptions = fetch_descriptions
-                        effective_use_ai_extraction = use_ai_extraction
-                        effective_max_jobs = max_jobs - len(all_jobs) if max_jobs is not None else None
+                    if success and html_content:
+                        # If pagination_test is enabled, override fetch_descriptions and max_jobs
+                        # to speed up the process and focus on pagination
+                        if pagination_test:
+                            logger.info("Pagination test mode enabled - skipping job descriptions", extra=Category.NAVIGATION)
+                            effective_fetch_descriptions = False
+                            effective_use_ai_extraction = False
+                            # Process just 1 job per page to quickly move to pagination
+                            effective_max_jobs = 1 if max_jobs is None else min(max_jobs - jobs_yielded, 1)
+                        else:
+                            effective_fetch_descriptions = fetch_descriptions
+                            effective_use_ai_extraction = use_ai_extraction
+                            effective_max_jobs = max_jobs - jobs_yielded if max_jobs is not None else None
                     
-                    jobs, next_page_url, page_total_job_count = extract_job_data(
-                        html_content, 
-                        self.base_url,
-                        fetch_descriptions=effective_fetch_descriptions,
-                        use_ai_extraction=effective_use_ai_extraction,
-                        delay_between_jobs=delay_between_jobs,
-                        max_jobs=effective_max_jobs,
-                        fetch_job_description_func=self.fetch_job_description
-                    )
+                        parse_start = time.perf_counter()
+                        with events.timed('page_parse', page=current_page) as event:
+                            page_jobs, next_page_url, page_total_job_count = parse_search_results(html_content, self.base_url)
+                            event['jobs'] = len(page_jobs)
+                            event['has_next_page'] = bool(next_page_url)
+                        search_metrics.observe('parse_duration_seconds', time.perf_counter() - parse_start, stage='search')
+                        search_metrics.inc('pages_total')
                     
-                    # Update total job count if we got a valid count
-                    if page_total_job_count != "Unknown":
-                        total_job_count = page_total_job_count
+                        # Count consecutive pages holding only jobs the persistent index already has
+                        if stop_after_known_pages and seen_job_keys and page_jobs:
+                            page_keys = [job.job_key for job in page_jobs]
+                            if set(page_keys) <= set(seen_job_keys(page_keys)):
+                                known_pages += 1
+                            else:
+                                known_pages = 0
+                        
+                        # Update total job count if we got a valid count
+                        if page_total_job_count != "Unknown":
+                            total_job_count = page_total_job_count
+                        
+                        # Warn up front when the search will not fit in the remaining budget
+                        remaining_credits = budget.remaining()
+                        if current_page == 1 and remaining_credits is not None and page_jobs:
+                            plan = plan_credits(
+                                parse_job_count(page_total_job_count) or len(page_jobs), len(page_jobs),
+                                search_credits, job_credits if effective_fetch_descriptions or effective_use_ai_extraction else 0,
+                                max_jobs=max_jobs, max_pages=max_pages
+                            )
+                            credits_needed = plan['total_credits'] - search_credits
+                            if credits_needed > remaining_credits:
+                                logger.warning(f"Search needs about {credits_needed:,} more credits but only "
+                                               f"{remaining_credits:,} remain - it will stop when the budget runs out")
                     
-                    if jobs:
-                        logger.info(f"Successfully scraped {len(jobs)} jobs on page {current_page} [OK]")
-                        all_jobs.extend(jobs)
+                        if page_jobs:
+                            if effective_max_jobs is not None:
+                                page_jobs = page_jobs[:effective_max_jobs]
+                            
+                            # Jobs seen on an earlier run only get their card refreshed
+                            known_keys = set(known_job_keys([job.job_key for job in page_jobs])) if known_job_keys else set()
+                            if known_keys:
+                                logger.info(f"{len(known_keys)} of {len(page_jobs)} jobs already stored - refreshing their cards only",
+                                            extra=Category.LISTING)
+                        
+                            page_job_count = 0
+                            for job_data in page_jobs:
+                                refresh_only = job_data.job_key in known_keys
+                                fetches_description = ((effective_fetch_descriptions or effective_use_ai_extraction)
+                                                       and job_data.url != "Not available" and not refresh_only)
+                                if fetches_description and not budget.can_afford(job_credits):
+                                    logger.warning(f"Credit budget exhausted ({budget.remaining()} credits left) - stopping search")
+                                    events.emit('budget_exhausted', page=current_page, remaining=budget.remaining())
+                                    budget_exhausted = True
+                                    break
+                                try:
+                                    with events.timed('job_enrich', page=current_page, job_key=job_data.job_key) as event:
+                                        enrich_job_data(
+                                            job_data,
+                                            fetch_descriptions=effective_fetch_descriptions and not refresh_only,
+                                            use_ai_extraction=effective_use_ai_extraction and not refresh_only,
+                                            delay_between_jobs=delay_between_jobs,
+                                            fetch_job_description_func=fetch_job_description,
+                                            progress_label=f"({page_job_count+1}/{len(page_jobs)})",
+                                            sleep_func=sleep_between_jobs
+                                        )
+                                        if refresh_only and self.near_duplicates is not None:
+                                            job_data.duplicate_cluster = self.near_duplicates.cluster_of(job_data.job_key)
+                                        event['has_description'] = bool(job_data.description)
+                                        event['has_ai_data'] = bool(job_data.ai_data)
+                                except Exception as e:
+                                    search_metrics.inc('errors_total', type='enrich')
+                                    logger.error(f"Error extracting job details: {str(e)}")
+                                    continue
+                            
+                                page_job_count += 1
+                                jobs_yielded += 1
+                                search_metrics.inc('jobs_total')
+                                if refresh_only:
+                                    search_metrics.inc('jobs_refreshed_total')
+                                search_metrics.mark('jobs')
+                                if save_progress:
+                                    saved_jobs.append(job_data)
+                                yield job_data
+                        
+                            logger.info(f"Successfully scraped {page_job_count} jobs on page {current_page} [OK]", extra=Category.LISTING)
                         
-                        # Save progress after each page if enabled
-                        if save_progress and all_jobs:
-                            logger.info(f"Saving progress after page {current_page}...")
-                            save_jobs_to_json(all_jobs, job_position, job_location, json_path)
-                            save_jobs_to_csv(all_jobs, job_position, job_location, csv_path)
-                            logger.info(f"Progress saved to {json_path} and {csv_path} [OK]")
+                            # Save progress after each page if enabled
+                            if save_progress and saved_jobs:
+                                logger.info(f"Saving progress after page {current_page}...", extra=Category.SAVING)
+                                save_start = time.perf_counter()
+                                with events.timed('save', page=current_page, jobs=len(saved_jobs)):
+                                    save_jobs_to_json(saved_jobs, job_position, job_location, json_path,
+                                                      description_store=self.description_store,
+                                                      search_index=self.search_index)
+                                    save_jobs_to_csv(saved_jobs, job_position, job_location, csv_path,
+                                                     description_store=self.description_store)
+                                search_metrics.observe('save_duration_seconds', time.perf_counter() - save_start)
+                                logger.info(f"Progress saved to {json_path} and {csv_path} [OK]", extra=Category.SAVING)
+                        else:
+                            logger.warning(f"Returned HTML but no jobs were extracted")
                     else:
-                        logger.warning(f"Returned HTML but no jobs were extracted")
-                else:
-                    logger.error(f"Failed to retrieve content for page {current_page}")
+                        logger.error(f"Failed to retrieve content for page {current_page}")
+                        break
+                except Exception as e:
+                    events.emit('page_error', page=current_page, error=type(e).__name__, message=str(e))
+                    logger.error(f"Exception during scraping page {current_page}: {str(e)}")
                     break
-            except Exception as e:
-                logger.error(f"Exception during scraping page {current_page}: {str(e)}")
-                break
+                
+                page_boundary(f"{job_position} | {job_location} | page {current_page}")
             
-            # Check if we've reached the job limit
-            if max_jobs is not None and len(all_jobs) >= max_jobs:
-                logger.info(f"Reached job limit of {max_jobs} jobs")
-                break
+                if budget_exhausted:
+                    break
+                
+                if stop_after_known_pages and known_pages >= stop_after_known_pages:
+                    logger.info(f"{known_pages} consecutive page(s) of already known jobs - stopping early",
+                                extra=Category.NAVIGATION)
+                    events.emit('known_pages_stop', page=current_page, known_pages=known_pages)
+                    search_completed = True
+                    break
+                
+                # Check if we've reached the job limit
+                if max_jobs is not None and jobs_yielded >= max_jobs:
+                    logger.info(f"Reached job limit of {max_jobs} jobs", extra=Category.LISTING)
+                    search_completed = True
+                    break
             
-            # Move to next page if available
-            if next_page_url:
-                indeed_url = next_page_url
-                current_page += 1
-                logger.info(f"Moving to page {current_page}: {indeed_url}")
+                # Move to next page if available
+                if next_page_url:
+                    indeed_url = next_page_url
+                    current_page += 1
+                    logger.info(f"Moving to page {current_page}: {indeed_url}", extra=Category.NAVIGATION)
                 
-                # Add delay between page requests to avoid overloading the API
-                logger.info(f"Waiting {delay_between_pages} seconds before next request...")
-                time.sleep(delay_between_pages)
-            else:
-                # No more pages
-                logger.info("No more pages available - pagination complete")
-                break
+                    # Add delay between page requests to avoid overloading the API
+                    logger.info(f"Waiting {delay_between_pages} seconds before next request...", extra=Category.NAVIGATION)
+                    with events.timed('sleep', page=current_page):
+                        self._sleep(delay_between_pages, search_metrics, 'page')
+                else:
+                    # No more pages
+                    logger.info("No more pages available - pagination complete", extra=Category.NAVIGATION)
+                    search_completed = True
+                    break
+        
+            logger.info(f"Scraping complete. Total jobs found: {jobs_yielded} out of approximately {total_job_count}", extra=Category.SUCCESS)
+        finally:
+            events.emit('search_end', page=current_page, jobs=jobs_yielded, total_job_count=total_job_count)
+            summary = build_summary(
+                search_metrics,
+                time.perf_counter() - search_start,
+                job_position=job_position,
+                job_location=job_location,
+                country=self.country,
+                total_job_count=total_job_count,
+                credits_spent=budget.spent,
+                jobs_refreshed=search_metrics.counter_total('jobs_refreshed_total'),
+                completed=search_completed
+            )
+            self.search_summaries.append(summary)
+            search_metrics.write_json(
+                metrics_path,
+                job_position=job_position,
+                job_location=job_location,
+                pages=current_page,
+                jobs=jobs_yielded,
+                summary=summary
+            )
+    
+    def scrape_indeed_jobs(self, job_position, job_location, date_posted='', 
+                          fetch_descriptions=True, use_ai_extraction=True,
+                          max_jobs=None, max_pages=None, delay_between_pages=2, 
+                          delay_between_jobs=1, save_progress=True, pagination_test=False,
+                          search_budget=None, sort_by_date=False, stop_after_known_pages=None, seen_job_keys=None,
+                          known_job_keys=None, url_params=None):
+        """
+        Scrape Indeed jobs
+        
+        Collects the results of iter_indeed_jobs into a list.
+        
+        Args:
+            job_position (str): Job title to search for
+            job_location (str): Location to search in
+            date_posted (str): Filter for jobs posted within X days
+            fetch_descriptions (bool): Whether to fetch job descriptions
+            use_ai_extraction (bool): Whether to use AI extraction (default: True)
+            max_jobs (int): Maximum number of jobs to process (default: None = no limit)
+            max_pages (int): Maximum number of pages to scrape (default: None = no limit)
+            delay_between_pages (int): Delay in seconds between page requests
+            delay_between_jobs (int): Delay in seconds between job description requests
+            save_progress (bool): Whether to save progress after each page
+            search_budget (int): Maximum credits this search may spend (default: None)
+            sort_by_date (bool): Sort results newest first instead of by relevance
+            stop_after_known_pages (int): Stop after this many consecutive pages of already known jobs
+            seen_job_keys (function): Returns which of a page's job keys are already known
+            known_job_keys (function): Returns which of a page's job keys already have a stored
+                description; these jobs are refreshed without a description request (default: None)
+            url_params (dict): Additional Indeed filters added to the search URL (default: None)
+            
+        Returns:
+            list: List of JobRecord objects
+        """
+        return list(self.iter_indeed_jobs(
+            job_position,
+            job_location,
+            date_posted=date_posted,
+            fetch_descriptions=fetch_descriptions,
+            use_ai_extraction=use_ai_extraction,
+            max_jobs=max_jobs,
+            max_pages=max_pages,
+            delay_between_pages=delay_between_pages,
+            delay_between_jobs=delay_between_jobs,
+            save_progress=save_progress,
+            pagination_test=pagination_test,
+            search_budget=search_budget,
+            sort_by_date=sort_by_date,
+            stop_after_known_pages=stop_after_known_pages,
+            seen_job_keys=seen_job_keys,
+            known_job_keys=known_job_keys,
+            url_params=url_params
+        ))
+    
+    def fetch_first_page(self, job_position, job_location, date_posted='', url_params=None):
+        """
+        Fetch and parse only the first results page of a search (one search request)
+        
+        Args:
+            job_position (str): Job title to search for
+            job_location (str): Location to search in
+            date_posted (str): Filter for jobs posted within X days
+            url_params (dict): Additional Indeed filters (default: None)
+            
+        Returns:
+            tuple: (page_jobs, total_job_count text), or None if the page could not be retrieved
+        """
+        url = self.construct_indeed_url(job_position, job_location, date_posted, url_params)
+        success, html_content, _ = self.scrape_page(url, page_type='search')
+        if not (success and html_content):
+            logger.error(f"Could not retrieve the first page of '{job_position}' in '{job_location}'")
+            return None
+        page_jobs, _, total_job_count = parse_search_results(html_content, self.base_url)
+        return page_jobs, total_job_count
+    
+    def count_jobs(self, job_position, job_location, date_posted='', url_params=None):
+        """
+        Job count Indeed reports for a search, read from its first results page
+        
+        Returns:
+            int: Number of jobs, or None if the page or its count could not be read
+        """
+        first_page = self.fetch_first_page(job_position, job_location, date_posted, url_params)
+        if first_page is None:
+            return None
+        page_jobs, total_job_count = first_page
+        job_count = parse_job_count(total_job_count)
+        return job_count if job_count is not None else len(page_jobs)
+    
+    def plan_search(self, job_position, job_location, date_posted='', fetch_descriptions=True,
+                    use_ai_extraction=True, max_jobs=None, max_pages=None):
+        """
+        Estimate the credits a search would use without fetching any job descriptions
+        
+        Only the first results page is requested (one search request is charged);
+        the job count shown on it sizes the rest of the search.
+        
+        Args:
+            job_position (str): Job title to search for
+            job_location (str): Location to search in
+            date_posted (str): Filter for jobs posted within X days
+            fetch_descriptions (bool): Whether the search would fetch job descriptions
+            use_ai_extraction (bool): Whether the search would use AI extraction
+            max_jobs (int): Maximum number of jobs to process (default: None = no limit)
+            max_pages (int): Maximum number of pages to scrape (default: None = no limit)
+            
+        Returns:
+            dict: Plan from plan_credits plus the search terms, job_count and per-request
+                costs, or None if the first page could not be retrieved
+        """
+        first_page = self.fetch_first_page(job_position, job_location, date_posted)
+        if first_page is None:
+            return None
+        
+        page_jobs, total_job_count = first_page
+        job_count = parse_job_count(total_job_count) or len(page_jobs)
+        search_credits = self.request_credits()
+        job_credits = self.request_credits(use_ai_extraction) if fetch_descriptions or use_ai_extraction else 0
         
-        logger.info(f"Scraping complete. Total jobs found: {len(all_jobs)} out of approximately {total_job_count}")
-        return all_jobs
+        plan = plan_credits(job_count, len(page_jobs), search_credits, job_credits,
+                            max_jobs=max_jobs, max_pages=max_pages)
+        plan.update({
+            'job_position': job_position,
+            'job_location': job_location,
+            'job_count': job_count,
+            'jobs_per_page': len(page_jobs),
+            'search_request_credits': search_credits,
+            'job_request_credits': job_credits,
+        })
+        logger.info(f"Plan for '{job_position}' in '{job_location}': {plan['pages']} pages, {plan['jobs']} jobs, "
+                    f"about {plan['total_credits']:,} credits", extra=Category.LISTING)
+        return plan
@@ -0,0 +1,215 @@
+"""
+ScrapingBee credit estimation and budgeting for the Indeed Job Scraper
+"""
+import math
+import threading
+import requests
+from scraper.logging_utils import logger
+
+# ScrapingBee credit cost per request, from their pricing documentation
+CREDITS_BASIC = 1
+CREDITS_RENDER_JS = 5
+CREDITS_PREMIUM_PROXY = 10
+CREDITS_PREMIUM_PROXY_JS = 25
+CREDITS_STEALTH_PROXY = 75
+CREDITS_AI_EXTRACTION = 5
+
+# ScrapingBee only bills requests that come back with these status codes
+BILLED_STATUS_CODES = (200, 404)
+
+def _enabled(params, name):
+    return str(params.get(name, 'false')).lower() == 'true'
+
+def estimate_request_credits(params):
+    """
+    Estimate the credit cost of a ScrapingBee request from its parameters
+
+    Args:
+        params (dict): ScrapingBee request parameters
+
+    Returns:
+        int: Estimated credits charged for a successful request
+    """
+    render_js = _enabled(params, 'render_js')
+
+    if _enabled(params, 'stealth_proxy'):
+        credits = CREDITS_STEALTH_PROXY
+    elif _enabled(params, 'premium_proxy'):
+        credits = CREDITS_PREMIUM_PROXY_JS if render_js else CREDITS_PREMIUM_PROXY
+    else:
+        credits = CREDITS_RENDER_JS if render_js else CREDITS_BASIC
+
+    if params.get('ai_extract_rules') or params.get('ai_query'):
+        credits += CREDITS_AI_EXTRACTION
+
+    return credits
+
+# Response header with the credits ScrapingBee actually charged for the request
+COST_HEADER = 'Spb-cost'
+
+# Response header with the account's remaining credits, when the API sends it
+REMAINING_CREDITS_HEADER = 'Spb-remaining-credits'
+
+# Account usage endpoint (max_api_credit / used_api_credit)
+SCRAPINGBEE_USAGE_URL = 'https://app.scrapingbee.com/api/v1/usage'
+
+def _header_int(headers, name):
+    try:
+        return int(float(headers[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+def credits_from_headers(headers):
+    """
+    Read the charged cost and remaining account credits from ScrapingBee response headers
+
+    Args:
+        headers (Mapping): Response headers
+
+    Returns:
+        tuple: (cost, remaining) - each None when the header is absent
+    """
+    return _header_int(headers, COST_HEADER), _header_int(headers, REMAINING_CREDITS_HEADER)
+
+def fetch_remaining_credits(api_key, usage_url=SCRAPINGBEE_USAGE_URL):
+    """
+    Ask the ScrapingBee usage endpoint how many credits the account has left
+
+    Args:
+        api_key (str): ScrapingBee API key
+        usage_url (str): Usage endpoint
+
+    Returns:
+        int: Remaining credits, or None if they could not be retrieved
+    """
+    try:
+        response = requests.get(usage_url, params={'api_key': api_key}, timeout=30)
+        response.raise_for_status()
+        usage = response.json()
+        return int(usage['max_api_credit']) - int(usage['used_api_credit'])
+    except Exception as e:
+        logger.warning(f"Could not retrieve ScrapingBee credit usage: {str(e)}")
+        return None
+
+class CreditBudget:
+    """
+    Thread-safe credit allowance for a run or a search
+
+    Requests reserve their estimated cost before being sent and settle the
+    actual cost afterwards, so concurrent requests cannot overshoot the limit.
+    A budget created with a parent also reserves and settles against it, so a
+    per-search budget draws from the run budget at the same time.
+    """
+
+    def __init__(self, limit=None, parent=None):
+        """
+        Initialize the budget
+
+        Args:
+            limit (int, optional): Maximum credits to spend (default: None = unlimited)
+            parent (CreditBudget, optional): Budget that is also charged for every request
+        """
+        self.limit = limit
+        self.parent = parent
+        self.spent = 0
+        self.reserved = 0
+        self.account_remaining = None
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        """Credits that can still be reserved, or None if nothing limits them"""
+        with self._lock:
+            limits = []
+            if self.limit is not None:
+                limits.append(self.limit - self.spent - self.reserved)
+            if self.account_remaining is not None:
+                limits.append(self.account_remaining - self.reserved)
+        if self.parent is not None:
+            parent_remaining = self.parent.remaining()
+            if parent_remaining is not None:
+                limits.append(parent_remaining)
+        return max(min(limits), 0) if limits else None
+
+    def can_afford(self, credits):
+        remaining = self.remaining()
+        return remaining is None or credits <= remaining
+
+    def reserve(self, credits):
+        """
+        Reserve credits for a request about to be sent
+
+        Args:
+            credits (int): Estimated cost of the request
+
+        Returns:
+            bool: False if the request would exceed this budget or a parent budget
+        """
+        with self._lock:
+            if self.limit is not None and self.spent + self.reserved + credits > self.limit:
+                return False
+            if self.account_remaining is not None and self.reserved + credits > self.account_remaining:
+                return False
+            self.reserved += credits
+        if self.parent is not None and not self.parent.reserve(credits):
+            with self._lock:
+                self.reserved -= credits
+            return False
+        return True
+
+    def settle(self, reserved, charged, account_remaining=None):
+        """
+        Replace a reservation with the credits actually charged
+
+        Args:
+            reserved (int): Credits reserved for the request
+            charged (int): Credits charged (0 for unbilled responses)
+            account_remaining (int, optional): Remaining account credits reported by the API
+        """
+        with self._lock:
+            self.reserved -= reserved
+            self.spent += charged
+            if account_remaining is not None:
+                self.account_remaining = account_remaining
+        if self.parent is not None:
+            self.parent.settle(reserved, charged, account_remaining)
+
+    def set_account_remaining(self, credits):
+        """Cap the budget at the credits left on the ScrapingBee account"""
+        with self._lock:
+            self.account_remaining = credits
+
+    def collect_metrics(self):
+        """Metrics collector reporting spent and remaining credits"""
+        result = [('credits_spent_total', 'counter', {}, self.spent)]
+        remaining = self.remaining()
+        if remaining is not None:
+            result.append(('credits_remaining', 'gauge', {}, remaining))
+        return result
+
+def plan_credits(total_jobs, jobs_per_page, search_cost, job_cost, max_jobs=None, max_pages=None):
+    """
+    Estimate the requests and credits a search will use
+
+    Args:
+        total_jobs (int): Job count reported on the first results page
+        jobs_per_page (int): Jobs found on the first results page
+        search_cost (int): Credits per search results page
+        job_cost (int): Credits per job page (0 when descriptions are not fetched)
+        max_jobs (int, optional): Job limit of the search
+        max_pages (int, optional): Page limit of the search
+
+    Returns:
+        dict: pages, jobs, search_credits, description_credits and total_credits
+    """
+    jobs = total_jobs if max_jobs is None else min(total_jobs, max_jobs)
+    pages = max(math.ceil(jobs / jobs_per_page), 1) if jobs_per_page else 1
+    if max_pages is not None:
+        pages = min(pages, max_pages)
+        jobs = min(jobs, pages * jobs_per_page)
+    return {
+        'pages': pages,
+        'jobs': jobs,
+        'search_credits': pages * search_cost,
+        'description_credits': jobs * job_cost,
+        'total_credits': pages * search_cost + jobs * job_cost,
+    }
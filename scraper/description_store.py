@@ -0,0 +1,237 @@
+"""
+Content-addressed storage for job descriptions
+"""
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from scraper.logging_utils import logger
+from scraper.job_record import extract_job_key
+
+# Default location of the blob store, next to the scraped data files
+DEFAULT_STORE_DIR = os.path.join('data', 'descriptions')
+
+# Lines shorter than this are kept inline in paragraph manifests rather than stored as blobs
+MIN_SHARED_PARAGRAPH_LENGTH = 200
+
+# File suffixes for the different blob kinds; compressed blobs get COMPRESSED_SUFFIX appended
+TEXT_SUFFIX = '.txt'
+MANIFEST_SUFFIX = '.manifest'
+COMPRESSED_SUFFIX = '.z'
+TEXT_SUFFIXES = (TEXT_SUFFIX + COMPRESSED_SUFFIX, TEXT_SUFFIX)
+BLOB_SUFFIXES = (MANIFEST_SUFFIX + COMPRESSED_SUFFIX, MANIFEST_SUFFIX) + TEXT_SUFFIXES
+
+# Recent (job key, hash) puts remembered to tell a re-save from a new hit; a re-save follows
+# within a page or two, so a window of a few thousand jobs keeps memory flat on long runs
+RECENT_PUTS = 10000
+
+def description_hash(text):
+    """
+    Compute the content address of a description
+
+    Args:
+        text (str): Description text
+
+    Returns:
+        str: SHA-256 hex digest of the UTF-8 encoded text
+    """
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class DescriptionStore:
+    """
+    Store each distinct description once, addressed by its SHA-256 hash
+
+    Blobs live under root/<first two hex chars>/<hash><suffix>. With
+    dedupe_paragraphs enabled, a description is stored as a manifest that
+    references shared paragraph blobs, so agency and employer boilerplate
+    repeated across many jobs is only written once.
+    """
+
+    def __init__(self, root=DEFAULT_STORE_DIR, compress=True, dedupe_paragraphs=False):
+        """
+        Initialize the store
+
+        Args:
+            root (str): Directory holding the blobs
+            compress (bool): Whether to zlib-compress blobs
+            dedupe_paragraphs (bool): Whether to store long paragraphs as shared blobs
+        """
+        self.root = root
+        self.compress = compress
+        self.dedupe_paragraphs = dedupe_paragraphs
+        self._known = set()
+        self._known_text = set()
+        # Recent (job key, digest) pairs put, least recent first, so re-saving a job is not counted as a hit
+        self._put_keys = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _blob_path(self, digest, suffix):
+        return os.path.join(self.root, digest[:2], digest + suffix)
+
+    def _find_blob(self, digest, suffixes=BLOB_SUFFIXES):
+        """Return the path of an existing blob for digest, or None"""
+        for suffix in suffixes:
+            path = self._blob_path(digest, suffix)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def _write_blob(self, digest, data, suffix):
+        """Atomically write a blob, compressing it if enabled"""
+        if self.compress:
+            data = zlib.compress(data, 6)
+            suffix += COMPRESSED_SUFFIX
+        path = self._blob_path(digest, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _read_blob(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith(COMPRESSED_SUFFIX):
+            return zlib.decompress(data)
+        return data
+
+    def _put_text(self, text):
+        """
+        Store a paragraph text blob and return its digest
+
+        Only text blobs are checked: a one-line description's manifest has the
+        same digest as its paragraph, and must not stand in for it.
+        """
+        digest = description_hash(text)
+        if digest not in self._known_text and not self._find_blob(digest, TEXT_SUFFIXES):
+            self._write_blob(digest, text.encode('utf-8'), TEXT_SUFFIX)
+        self._known_text.add(digest)
+        return digest
+
+    def put(self, text, key=None):
+        """
+        Store a description if it is not already present
+
+        Args:
+            text (str): Description text
+            key (str, optional): Job the description belongs to; putting the same job's
+                description again (e.g. when a page's progress is re-saved) is not a cache hit
+
+        Returns:
+            str: Content hash to keep in the job record
+        """
+        digest = description_hash(text)
+        with self._lock:
+            repeated = key is not None and (key, digest) in self._put_keys
+            if key is not None:
+                self._put_keys[(key, digest)] = None
+                self._put_keys.move_to_end((key, digest))
+                if len(self._put_keys) > RECENT_PUTS:
+                    self._put_keys.popitem(last=False)
+            if digest in self._known or self._find_blob(digest):
+                self._known.add(digest)
+                if not repeated:
+                    self.hits += 1
+                return digest
+            self.misses += 1
+
+            if self.dedupe_paragraphs:
+                manifest = []
+                for line in text.split('\n'):
+                    if len(line) >= MIN_SHARED_PARAGRAPH_LENGTH:
+                        manifest.append({'ref': self._put_text(line)})
+                    else:
+                        manifest.append(line)
+                self._write_blob(digest, json.dumps(manifest, ensure_ascii=False).encode('utf-8'), MANIFEST_SUFFIX)
+            else:
+                self._write_blob(digest, text.encode('utf-8'), TEXT_SUFFIX)
+
+            self._known.add(digest)
+        return digest
+
+    def get(self, digest):
+        """
+        Load a description by its content hash
+
+        Args:
+            digest (str): Hash returned by put()
+
+        Returns:
+            str: Description text or None if the blob does not exist
+        """
+        path = self._find_blob(digest)
+        if not path:
+            logger.warning(f"Description blob {digest} not found in {self.root}")
+            return None
+
+        data = self._read_blob(path).decode('utf-8')
+        if MANIFEST_SUFFIX not in os.path.basename(path):
+            return data
+
+        lines = []
+        for entry in json.loads(data):
+            if isinstance(entry, dict):
+                # Paragraph refs only resolve to text blobs, never to a manifest
+                ref_path = self._find_blob(entry['ref'], TEXT_SUFFIXES)
+                if ref_path:
+                    lines.append(self._read_blob(ref_path).decode('utf-8'))
+                else:
+                    logger.warning(f"Paragraph blob {entry['ref']} not found in {self.root}")
+                    lines.append("")
+            else:
+                lines.append(entry)
+        return '\n'.join(lines)
+
+    def cache_metrics(self):
+        """
+        Report how often put() found the description already stored
+
+        Returns:
+            list: (name, type, labels, value) tuples for MetricsRegistry.add_collector
+        """
+        labels = {'cache': 'description_store'}
+        lookups = self.hits + self.misses
+        return [
+            ('cache_hits_total', 'counter', labels, self.hits),
+            ('cache_misses_total', 'counter', labels, self.misses),
+            ('cache_hit_ratio', 'gauge', labels, self.hits / lookups if lookups else 0.0),
+        ]
+
+    def __contains__(self, digest):
+        return digest in self._known or self._find_blob(digest) is not None
+
+def store_job_description(job, store):
+    """
+    Replace a job's description with its content hash
+
+    Args:
+        job (dict): Job dictionary (a copy - it is modified)
+        store (DescriptionStore): Store to write the description to
+
+    Returns:
+        dict: Job dictionary with 'description_hash' instead of 'description'
+    """
+    description = job.pop('description', None)
+    job['description_hash'] = store.put(description, extract_job_key(job.get('url'))) if description else None
+    return job
+
+def resolve_job_description(job, store):
+    """
+    Replace a job's description hash with the description text
+
+    Args:
+        job (dict): Job dictionary as saved with a description store
+        store (DescriptionStore): Store the description was written to
+
+    Returns:
+        dict: Job dictionary with 'description' filled in
+    """
+    if 'description_hash' in job:
+        digest = job.pop('description_hash')
+        job['description'] = store.get(digest) if digest else ""
+    return job
@@ -0,0 +1,144 @@
+"""
+Structured JSON-lines event log for the Indeed Job Scraper
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+def default_event_log_path():
+    """Path for a new event log: logs/events_<timestamp>.jsonl"""
+    return os.path.join('logs', f"events_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+def new_id():
+    """Short random identifier for runs and searches"""
+    return uuid.uuid4().hex[:12]
+
+class EventLog:
+    """
+    Append-only JSON-lines log of scraper events
+
+    Every line is one event with a timestamp, the run ID and the event name.
+    Events emitted through a SearchEvents context also carry the search ID,
+    page number, job key and, for timed operations, duration_ms and status,
+    so stage timings and failure rates can be computed in one streaming pass.
+    """
+
+    def __init__(self, path=None, run_id=None):
+        """
+        Open the event log for appending
+
+        Args:
+            path (str, optional): Output file (default: logs/events_<timestamp>.jsonl)
+            run_id (str, optional): Identifier shared by every event of this run
+        """
+        self.path = path or default_event_log_path()
+        self.run_id = run_id or new_id()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a', encoding='utf-8', buffering=1)
+
+    def emit(self, event, **fields):
+        """
+        Write one event
+
+        Args:
+            event (str): Event name, e.g. 'page_fetch'
+            **fields: Additional JSON-serialisable fields
+        """
+        record = {'ts': round(time.time(), 3), 'run_id': self.run_id, 'event': event}
+        record.update(fields)
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+
+    def search(self, job_position, job_location, **fields):
+        """
+        Start a search context whose events share a search ID
+
+        Args:
+            job_position (str): Job title being searched
+            job_location (str): Location being searched
+            **fields: Extra fields recorded on the search_start event
+
+        Returns:
+            SearchEvents: Emitter for the search's events
+        """
+        return SearchEvents(self, new_id(), job_position, job_location, fields)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+class SearchEvents:
+    """Event emitter bound to one search"""
+
+    def __init__(self, event_log, search_id, job_position, job_location, fields):
+        self.event_log = event_log
+        self.search_id = search_id
+        self.emit('search_start', job_position=job_position, job_location=job_location, **fields)
+
+    def emit(self, event, page=None, job_key=None, **fields):
+        """
+        Write an event tagged with this search's ID
+
+        Args:
+            event (str): Event name
+            page (int, optional): Search results page number
+            job_key (str, optional): Indeed job key
+            **fields: Additional fields
+        """
+        self.event_log.emit(event, search_id=self.search_id, page=page, job_key=job_key, **fields)
+
+    @contextmanager
+    def timed(self, event, page=None, job_key=None, **fields):
+        """
+        Time an operation and emit it as one event when it finishes
+
+        The yielded dict can be updated inside the block to add result fields
+        (e.g. success=False). An exception marks the event status as 'error'.
+
+        Args:
+            event (str): Event name
+            page (int, optional): Search results page number
+            job_key (str, optional): Indeed job key
+            **fields: Additional fields
+        """
+        start_time = time.perf_counter()
+        fields['status'] = 'ok'
+        try:
+            yield fields
+        except BaseException as e:
+            fields['status'] = 'error'
+            fields['error'] = type(e).__name__
+            raise
+        finally:
+            fields['duration_ms'] = round((time.perf_counter() - start_time) * 1000, 1)
+            self.emit(event, page=page, job_key=job_key, **fields)
+
+class NullEventLog:
+    """Event log that discards everything - used when no event log is configured"""
+    run_id = None
+
+    def emit(self, event, **fields):
+        pass
+
+    def search(self, job_position, job_location, **fields):
+        return NullSearchEvents()
+
+    def close(self):
+        pass
+
+class NullSearchEvents:
+    search_id = None
+
+    def emit(self, event, page=None, job_key=None, **fields):
+        pass
+
+    @contextmanager
+    def timed(self, event, page=None, job_key=None, **fields):
+        yield fields
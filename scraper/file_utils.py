@@ -5,9 +5,12 @@ import os
 import json
 import pandas as pd
 from datetime import datetime
-from scraper.logging_utils import logger
+from scraper.logging_utils import logger, Category
+from scraper.job_record import as_job_dict
+from scraper.description_store import store_job_description
+from scraper.profiling import stage_timer
 
-def generate_filename(job_position, job_location, extension, include_timestamp=True):
+def generate_filename(job_position, job_location, extension, include_timestamp=True, country=None):
     """
     Generate a filename based on job position and location
     
@@ -16,6 +19,7 @@ def generate_filename(job_position, job_location, extension, include_timestamp=T
         job_location (str): Location used in the search
         extension (str): File extension (e.g., 'json', 'csv')
         include_timestamp (bool): Whether to include a timestamp
+        country (str): Country code added after the location (default: None)
         
     Returns:
         str: Generated filename
@@ -23,20 +27,41 @@ def generate_filename(job_position, job_location, extension, include_timestamp=T
     # Clean the job position and location for filename
     clean_job = job_position.replace(' ', '_').lower()
     clean_location = job_location.replace(' ', '_').lower()
+    if country:
+        clean_location += f"_{country.lower()}"
     
     # Always include timestamp to avoid duplicate files
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
     return f"{clean_job}_{clean_location}_{timestamp}.{extension}"
 
-def save_jobs_to_json(jobs, job_position=None, job_location=None, filename=None):
+def job_rows(jobs, description_store=None):
+    """
+    Convert jobs to plain dictionaries for writing
+    
+    Args:
+        jobs (list): List of JobRecord objects or job dictionaries
+        description_store (DescriptionStore, optional): Store descriptions here and keep only their hash
+        
+    Returns:
+        list: List of job dictionaries
+    """
+    if description_store is None:
+        return [as_job_dict(job) for job in jobs]
+    return [store_job_description(dict(as_job_dict(job)), description_store) for job in jobs]
+
+@stage_timer('save_jobs_to_json')
+def save_jobs_to_json(jobs, job_position=None, job_location=None, filename=None, description_store=None,
+                      search_index=None):
     """
     Save jobs to a JSON file
     
     Args:
-        jobs (list): List of job dictionaries
+        jobs (list): List of JobRecord objects or job dictionaries
         job_position (str, optional): Job position used in the search
         job_location (str, optional): Location used in the search
         filename (str, optional): Output filename (overrides automatic naming)
+        description_store (DescriptionStore, optional): Write descriptions to this store instead of the file
+        search_index (SearchIndex, optional): Also add new or changed jobs to this full-text index
     """
     if not jobs:
         logger.warning("No jobs to save")
@@ -50,19 +75,25 @@ def save_jobs_to_json(jobs, job_position=None, job_location=None, filename=None)
             filename = os.path.join('data', "indeed_jobs.json")  # Fallback to default
         
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(jobs, f, indent=2, ensure_ascii=False)
+        json.dump(job_rows(jobs, description_store), f, indent=2, ensure_ascii=False)
         
-    logger.info(f"Saved {len(jobs)} jobs to {filename} [OK]")
+    logger.info(f"Saved {len(jobs)} jobs to {filename} [OK]", extra=Category.SAVING)
+    
+    if search_index is not None:
+        indexed = search_index.add_jobs(jobs)
+        logger.info(f"Updated search index with {indexed} new or changed jobs", extra=Category.SAVING)
 
-def save_jobs_to_csv(jobs, job_position=None, job_location=None, filename=None):
+@stage_timer('save_jobs_to_csv')
+def save_jobs_to_csv(jobs, job_position=None, job_location=None, filename=None, description_store=None):
     """
     Save jobs to a CSV file
     
     Args:
-        jobs (list): List of job dictionaries
+        jobs (list): List of JobRecord objects or job dictionaries
         job_position (str, optional): Job position used in the search
         job_location (str, optional): Location used in the search
         filename (str, optional): Output filename (overrides automatic naming)
+        description_store (DescriptionStore, optional): Write descriptions to this store instead of the file
     """
     if not jobs:
         logger.warning("No jobs to save")
@@ -75,7 +106,7 @@ def save_jobs_to_csv(jobs, job_position=None, job_location=None, filename=None):
         else:
             filename = os.path.join('data', "indeed_jobs.csv")  # Fallback to default
     
-    df = pd.DataFrame(jobs)
+    df = pd.DataFrame(job_rows(jobs, description_store))
     df.to_csv(filename, index=False)
     
-    logger.info(f"Saved {len(jobs)} jobs to {filename} [OK]")
+    logger.info(f"Saved {len(jobs)} jobs to {filename} [OK]", extra=Category.SAVING)
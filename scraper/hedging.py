@@ -0,0 +1,156 @@
+"""
+Hedged ScrapingBee requests to cut tail latency
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, TimeoutError as FutureTimeout
+from scraper.credits import credits_from_headers, BILLED_STATUS_CODES
+from scraper.logging_utils import logger, Category
+
+# Largest share of requests that may get a hedge, bounding the extra credit spend
+DEFAULT_HEDGE_FRACTION = 0.05
+
+# Latency percentile after which a duplicate request is sent
+HEDGE_PERCENTILE = 95
+
+# Latency samples needed for a page type before its requests are hedged
+MIN_LATENCY_SAMPLES = 20
+
+# Never hedge sooner than this, however fast the page type usually is
+MIN_HEDGE_DELAY_SECONDS = 2.0
+
+# Requests between recomputations of a page type's hedge delay
+DELAY_REFRESH_REQUESTS = 20
+
+class HedgedRequests:
+    """
+    Sends a duplicate of a request that is slower than the usual p95 for its page type
+
+    The first successful response is used. The other request is cancelled if
+    it has not started. A request already in flight cannot be interrupted, so
+    its response is discarded when it arrives, and its credits are settled
+    against the budget at that point. Hedges are limited to max_fraction of
+    all requests. Each hedge also reserves its credits from the budget first.
+    """
+
+    def __init__(self, metrics, max_fraction=DEFAULT_HEDGE_FRACTION, min_samples=MIN_LATENCY_SAMPLES,
+                 min_delay=MIN_HEDGE_DELAY_SECONDS, max_workers=8):
+        """
+        Initialize the hedging policy
+
+        Args:
+            metrics (MetricsRegistry): Registry holding request_latency_seconds by page type
+            max_fraction (float): Largest share of requests that may be hedged
+            min_samples (int): Latency samples needed before a page type is hedged
+            min_delay (float): Smallest hedge delay in seconds
+            max_workers (int): Threads sending requests (two per hedged request)
+        """
+        self.metrics = metrics
+        self.max_fraction = max_fraction
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.requests = 0
+        self.hedges = 0
+        self._delays = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hedge')
+
+    def hedge_delay(self, page_type):
+        """
+        Seconds to wait before hedging a request of page_type
+
+        Returns:
+            float: The page type's p95 latency (at least min_delay), or None while too few
+                requests have been observed
+        """
+        with self._lock:
+            cached = self._delays.get(page_type)
+            if cached is not None and self.requests - cached[1] < DELAY_REFRESH_REQUESTS:
+                return cached[0]
+        histogram = self.metrics.histogram('request_latency_seconds', page_type=page_type)
+        delay = None
+        if histogram is not None and histogram.count >= self.min_samples:
+            delay = max(histogram.percentile(HEDGE_PERCENTILE), self.min_delay)
+        with self._lock:
+            self._delays[page_type] = (delay, self.requests)
+        return delay
+
+    def _take_hedge(self):
+        with self._lock:
+            if self.hedges + 1 > self.max_fraction * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def send(self, request, page_type, metrics, budget, credits):
+        """
+        Run request(), hedging it if it outlasts the page type's p95 latency
+
+        Args:
+            request (function): Sends the HTTP request and returns the response
+            page_type (str): 'search', 'job' or 'ai'
+            metrics (MetricsRegistry): Registry recording hedges and their credits
+            budget (CreditBudget): Budget the hedge reserves its credits from
+            credits (int): Estimated credits of one request
+
+        Returns:
+            requests.Response: The first successful response, or the primary's outcome
+        """
+        with self._lock:
+            self.requests += 1
+        delay = self.hedge_delay(page_type)
+        if delay is None:
+            return request()
+
+        primary = self._executor.submit(request)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeout:
+            pass
+        if not self._take_hedge():
+            return primary.result()
+        if not budget.reserve(credits):
+            with self._lock:
+                self.hedges -= 1
+            return primary.result()
+
+        logger.info(f"Request slower than {delay:.1f}s (p{HEDGE_PERCENTILE} for {page_type} pages) - sending a hedge",
+                    extra=Category.NAVIGATION)
+        metrics.inc('hedges_total', page_type=page_type)
+        hedge = self._executor.submit(request)
+        pending = {primary, hedge}
+        winner = None
+        while pending and winner is None:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            winner = next((future for future in (primary, hedge) if future in done and _succeeded(future)), None)
+        if winner is None:
+            winner = primary
+        loser = hedge if winner is primary else primary
+        if winner is hedge:
+            metrics.inc('hedge_wins_total', page_type=page_type)
+
+        # The loser's credits are settled against the hedge's reservation once it finishes
+        loser.cancel()
+        loser.add_done_callback(lambda future: self._settle(future, metrics, budget, credits, page_type))
+        return winner.result()
+
+    def _settle(self, future, metrics, budget, credits, page_type):
+        charged = 0
+        if not future.cancelled() and future.exception() is None:
+            response = future.result()
+            cost, remaining = credits_from_headers(response.headers)
+            charged = cost if cost is not None else (credits if response.status_code in BILLED_STATUS_CODES else 0)
+            budget.settle(credits, charged, remaining)
+        else:
+            budget.settle(credits, 0)
+        if charged:
+            metrics.inc('credits_charged_total', charged, page_type=page_type)
+            metrics.inc('hedge_credits_total', charged, page_type=page_type)
+
+    def collect_metrics(self):
+        """Metrics collector reporting the share of requests that were hedged"""
+        with self._lock:
+            requests, hedges = self.requests, self.hedges
+        return [('hedge_fraction', 'gauge', {}, hedges / requests if requests else 0.0)]
+
+def _succeeded(future):
+    return future.exception() is None and future.result().status_code == 200
@@ -3,10 +3,33 @@ HTML parsing utilities for the Indeed Job Scraper
 """
 import json
 import os
+import re
+import time
 from datetime import datetime
 from bs4 import BeautifulSoup
-from scraper.logging_utils import logger
+from scraper.logging_utils import logger, Category
+from scraper.job_record import JobRecord
+from scraper.profiling import stage_timer
 
+@stage_timer('debug_write')
+def write_debug_file(prefix, content):
+    """
+    Save page HTML to logs/ for debugging
+    
+    Args:
+        prefix (str): File name prefix, e.g. 'debug_indeed'
+        content (str): HTML to save
+        
+    Returns:
+        str: Path of the written file
+    """
+    debug_filename = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
+    debug_path = os.path.join('logs', debug_filename)
+    with open(debug_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    return debug_path
+
+@stage_timer('extract_description_from_html')
 def extract_description_from_html(html_content):
     """
     Extract job description from HTML content
@@ -31,10 +54,7 @@ def extract_description_from_html(html_content):
         soup = BeautifulSoup(html_content, 'html.parser')
         
         # Save HTML for debugging
-        debug_filename = f"debug_job_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        debug_path = os.path.join('logs', debug_filename)
-        with open(debug_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        debug_path = write_debug_file('debug_job', html_content)
         logger.debug(f"Saved job page HTML to {debug_path}")
         
         # Try different possible selectors for job description
@@ -63,6 +83,7 @@ def extract_description_from_html(html_content):
         logger.error(f"Error parsing job description HTML: {str(e)}")
         return None
 
+@stage_timer('extract_job_details')
 def extract_job_details(job_card, base_url):
     """
     Extract details from a job card
@@ -72,7 +93,7 @@ def extract_job_details(job_card, base_url):
         base_url: Base URL for Indeed
         
     Returns:
-        dict: Job details or None if extraction failed
+        JobRecord: Job details or None if extraction failed
     """
     try:
         # Extract job title
@@ -107,34 +128,48 @@ def extract_job_details(job_card, base_url):
             
         job_url = base_url + url_element['href'] if url_element and 'href' in url_element.attrs else "Not available"
         
-        return {
-            'title': job_title,
-            'company': company_name,
-            'location': location,
-            'date_posted': posting_date,
-            'url': job_url
-        }
+        return JobRecord(
+            title=job_title,
+            company=company_name,
+            location=location,
+            date_posted=posting_date,
+            url=job_url
+        )
         
     except Exception as e:
         logger.error(f"Error extracting job details: {str(e)}")
         return None
 
-def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_extraction=True, 
-                    delay_between_jobs=1, max_jobs=None, fetch_job_description_func=None):
+# Number before "job(s)" in Indeed's job count text, e.g. "1,234 jobs" or "Page 1 of 1,234 jobs"
+JOB_COUNT_PATTERN = re.compile(r'([\d][\d,.\s]*)\s*jobs?\b', re.IGNORECASE)
+
+def parse_job_count(job_count_text):
     """
-    Extract job data from HTML content
+    Convert Indeed's job count text into a number
+    
+    Args:
+        job_count_text (str): Text from the job count element, or "Unknown"
+        
+    Returns:
+        int: Number of jobs, or None if the text has no count
+    """
+    if not job_count_text:
+        return None
+    match = JOB_COUNT_PATTERN.search(job_count_text)
+    digits = re.sub(r'\D', '', match.group(1) if match else job_count_text)
+    return int(digits) if digits else None
+
+@stage_timer('parse_search_results')
+def parse_search_results(html_content, base_url):
+    """
+    Parse an Indeed search results page without fetching any job descriptions
     
     Args:
         html_content (str): HTML content from Indeed
         base_url (str): Base URL for Indeed
-        fetch_descriptions (bool): Whether to fetch job descriptions
-        use_ai_extraction (bool): Whether to use AI extraction
-        delay_between_jobs (int): Delay in seconds between job description requests
-        max_jobs (int): Maximum number of jobs to process
-        fetch_job_description_func (function): Function to fetch job descriptions
         
     Returns:
-        tuple: (jobs_list, next_page_url, total_job_count)
+        tuple: (job_cards_list, next_page_url, total_job_count)
     """
     if not html_content:
         logger.error("No HTML content to parse")
@@ -143,10 +178,7 @@ def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_ext
     soup = BeautifulSoup(html_content, 'html.parser')
     
     # Save HTML for debugging
-    debug_filename = f"debug_indeed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-    debug_path = os.path.join('logs', debug_filename)
-    with open(debug_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    debug_path = write_debug_file('debug_indeed', html_content)
     logger.debug(f"Saved HTML content to {debug_path}")
         
     # Extract total job count
@@ -154,7 +186,7 @@ def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_ext
     job_count_element = soup.select_one('div[class*="jobsearch-JobCountAndSortPane-jobCount"]')
     if job_count_element:
         job_count = job_count_element.get_text(strip=True)
-        logger.info(f"Found job count: {job_count} [OK]")
+        logger.info(f"Found job count: {job_count} [OK]", extra=Category.LISTING)
         total_job_count = job_count
     else:
         logger.warning("Could not find job count element")
@@ -170,66 +202,90 @@ def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_ext
             logger.error("Failed to find job cards with alternative selectors")
             return [], None, total_job_count
         else:
-            logger.info(f"Found {len(job_cards)} job cards using alternative selector [OK]")
+            logger.info(f"Found {len(job_cards)} job cards using alternative selector [OK]", extra=Category.LISTING)
     else:
-        logger.info(f"Found {len(job_cards)} job cards [OK]")
+        logger.info(f"Found {len(job_cards)} job cards [OK]", extra=Category.LISTING)
     
     jobs = []
-    job_count = 0
     
     for job_card in job_cards:
-        # Check if we've reached the maximum number of jobs to process
-        if max_jobs is not None and job_count >= max_jobs:
-            logger.info(f"Reached maximum job limit of {max_jobs} while processing page")
-            break
-            
         try:
             job_data = extract_job_details(job_card, base_url)
             
             if job_data:
-                # Initialize description fields
-                job_data['description'] = ""
-                job_data['ai_data'] = {}
-                
-                # If enabled, immediately fetch the job description
-                if (fetch_descriptions or use_ai_extraction) and job_data['url'] != "Not available" and fetch_job_description_func:
-                    logger.info(f"Fetching description for: {job_data['title']} ({job_count+1}/{min(len(job_cards), max_jobs or len(job_cards))})")
-                    
-                    # Add a small delay to avoid overloading the API
-                    import time
-                    time.sleep(delay_between_jobs)
-                    
-                    # Fetch and add the description
-                    description_data = fetch_job_description_func(job_data['url'], use_ai_extraction)
-                    
-                    # Add conventional description if requested
-                    if fetch_descriptions:
-                        job_data['description'] = description_data.get('conventional', "")
-                    
-                    # Add AI data if requested and available
-                    if use_ai_extraction:
-                        ai_data = description_data.get('ai', {})
-                        if ai_data:
-                            # Store the full AI data object only, don't duplicate as individual fields
-                            job_data['ai_data'] = ai_data
-                
                 jobs.append(job_data)
-                job_count += 1
                 
         except Exception as e:
             logger.error(f"Error extracting job details: {str(e)}")
             continue
     
+    next_page_url = extract_next_page_url(soup, base_url, len(jobs))
+            
+    return jobs, next_page_url, total_job_count
+
+@stage_timer('enrich_job_data')
+def enrich_job_data(job_data, fetch_descriptions=True, use_ai_extraction=True, delay_between_jobs=1,
+                    fetch_job_description_func=None, progress_label="", sleep_func=time.sleep):
+    """
+    Fetch the description and AI data for a single job parsed from a search page
+    
+    Args:
+        job_data (JobRecord): Job details from parse_search_results
+        fetch_descriptions (bool): Whether to fetch job descriptions
+        use_ai_extraction (bool): Whether to use AI extraction
+        delay_between_jobs (int): Delay in seconds before the job description request
+        fetch_job_description_func (function): Function to fetch job descriptions
+        progress_label (str): Progress text shown in the log line, e.g. "(3/15)"
+        sleep_func (function): Function used for the delay (default: time.sleep)
+        
+    Returns:
+        JobRecord: The same job record, enriched in place
+    """
+    if (fetch_descriptions or use_ai_extraction) and job_data['url'] != "Not available" and fetch_job_description_func:
+        logger.info(f"Fetching description for: {job_data['title']} {progress_label}".rstrip(), extra=Category.DESCRIPTION)
+        
+        # Add a small delay to avoid overloading the API
+        sleep_func(delay_between_jobs)
+        
+        # Fetch and add the description
+        description_data = fetch_job_description_func(job_data['url'], use_ai_extraction, job=job_data)
+        
+        # Add conventional description if requested
+        if fetch_descriptions:
+            job_data['description'] = description_data.get('conventional', "")
+        
+        # Add AI data if available - from ScrapingBee or from local extraction
+        ai_data = description_data.get('ai', {})
+        if ai_data:
+            # Store the full AI data object only, don't duplicate as individual fields
+            job_data['ai_data'] = ai_data
+        
+        if description_data.get('duplicate_cluster'):
+            job_data['duplicate_cluster'] = description_data['duplicate_cluster']
+        if description_data.get('skill_tags') is not None:
+            job_data['skill_tags'] = description_data['skill_tags']
+    
+    return job_data
+
+def extract_next_page_url(soup, base_url, jobs_on_page):
+    """
+    Find the URL of the next search results page
+    
+    Args:
+        soup (BeautifulSoup): Parsed search results page
+        base_url (str): Base URL for Indeed
+        jobs_on_page (int): Number of jobs found on the page (used for URL-based pagination)
+        
+    Returns:
+        str: Next page URL or None if this is the last page
+    """
     # Extract next page URL with multiple fallback methods
     next_page_url = None
     
     # Save pagination section for debugging
     pagination_section = soup.find('nav', {'role': 'navigation'})
     if pagination_section:
-        debug_pagination_filename = f"debug_pagination_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
-        debug_pagination_path = os.path.join('logs', debug_pagination_filename)
-        with open(debug_pagination_path, "w", encoding="utf-8") as f:
-            f.write(str(pagination_section))
+        debug_pagination_path = write_debug_file('debug_pagination', str(pagination_section))
         logger.debug(f"Saved pagination HTML to {debug_pagination_path}")
     else:
         logger.warning("Could not find pagination section for debugging")
@@ -239,7 +295,7 @@ def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_ext
         next_page_element = soup.find('a', {'aria-label': 'Next Page'})
         if next_page_element and 'href' in next_page_element.attrs:
             next_page_url = base_url + next_page_element['href']
-            logger.info(f"Found next page URL (method 1 - aria-label): {next_page_url} [OK]")
+            logger.info(f"Found next page URL (method 1 - aria-label): {next_page_url} [OK]", extra=Category.NAVIGATION)
     except Exception as e:
         logger.error(f"Error in pagination method 1: {str(e)}")
     
@@ -249,7 +305,7 @@ def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_ext
             next_page_element = soup.find('a', {'data-testid': 'pagination-page-next'})
             if next_page_element and 'href' in next_page_element.attrs:
                 next_page_url = base_url + next_page_element['href']
-                logger.info(f"Found next page URL (method 2 - data-testid): {next_page_url} [OK]")
+                logger.info(f"Found next page URL (method 2 - data-testid): {next_page_url} [OK]", extra=Category.NAVIGATION)
         except Exception as e:
             logger.error(f"Error in pagination method 2: {str(e)}")
     
@@ -267,13 +323,13 @@ def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_ext
             
             if potential_next_links and 'href' in potential_next_links[0].attrs:
                 next_page_url = base_url + potential_next_links[0]['href']
-                logger.info(f"Found next page URL (method 3 - text/class): {next_page_url} [OK]")
+                logger.info(f"Found next page URL (method 3 - text/class): {next_page_url} [OK]", extra=Category.NAVIGATION)
         except Exception as e:
             logger.error(f"Error in pagination method 3: {str(e)}")
     
     # Method 4: URL-based pagination fallback
     # If we found jobs but no next page link, try to construct the URL
-    if not next_page_url and jobs:
+    if not next_page_url and jobs_on_page:
         try:
             # Check if the current URL has a start parameter
             current_url = soup.find('link', {'rel': 'canonical'})
@@ -287,21 +343,21 @@ def extract_job_data(html_content, base_url, fetch_descriptions=True, use_ai_ext
                 if start_match:
                     # If there's a start parameter, increment it by the number of jobs per page (typically 10-15)
                     current_start = int(start_match.group(1))
-                    next_start = current_start + len(jobs)
+                    next_start = current_start + jobs_on_page
                     next_page_url = re.sub(r'start=\d+', f'start={next_start}', current_url_str)
-                    logger.info(f"Constructed next page URL (method 4 - URL pattern): {next_page_url} [OK]")
+                    logger.info(f"Constructed next page URL (method 4 - URL pattern): {next_page_url} [OK]", extra=Category.NAVIGATION)
                 else:
                     # If there's no start parameter yet, add it
                     if '?' in current_url_str:
-                        next_page_url = f"{current_url_str}&start={len(jobs)}"
+                        next_page_url = f"{current_url_str}&start={jobs_on_page}"
                     else:
-                        next_page_url = f"{current_url_str}?start={len(jobs)}"
-                    logger.info(f"Constructed first pagination URL (method 4 - URL pattern): {next_page_url} [OK]")
+                        next_page_url = f"{current_url_str}?start={jobs_on_page}"
+                    logger.info(f"Constructed first pagination URL (method 4 - URL pattern): {next_page_url} [OK]", extra=Category.NAVIGATION)
         except Exception as e:
             logger.error(f"Error in pagination method 4: {str(e)}")
     
     # Final check - if we still don't have a next page URL
     if not next_page_url:
-        logger.info("No next page URL found - this appears to be the last page")
+        logger.info("No next page URL found - this appears to be the last page", extra=Category.NAVIGATION)
             
-    return jobs, next_page_url, total_job_count
+    return next_page_url
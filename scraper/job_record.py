@@ -0,0 +1,174 @@
+"""
+Compact job record type for the Indeed Job Scraper
+"""
+import json
+import sys
+from collections.abc import Mapping
+from urllib.parse import urlparse, parse_qs
+
+# Placeholder used for missing card fields - interned so every record shares one copy
+NOT_SPECIFIED = sys.intern("Not specified")
+NOT_AVAILABLE = sys.intern("Not available")
+
+# Fields whose values repeat across thousands of jobs (same employers, cities, dates)
+INTERNED_FIELDS = frozenset(['company', 'location', 'date_posted'])
+
+# AI data values longer than this are free text (summaries) and are not worth interning
+MAX_INTERNED_LENGTH = 64
+
+def _intern_value(value):
+    """Intern short strings, leave everything else untouched"""
+    if isinstance(value, str) and len(value) <= MAX_INTERNED_LENGTH:
+        return sys.intern(value)
+    return value
+
+def _compact_ai_data(ai_data):
+    """
+    Intern the keys and short values of an AI extraction result
+
+    Args:
+        ai_data (dict): AI extraction result (may be empty or None)
+
+    Returns:
+        dict: Compacted copy, or None if there is no AI data
+    """
+    if not ai_data:
+        return None
+    compact = {}
+    for key, value in ai_data.items():
+        if isinstance(value, list):
+            value = [_intern_value(item) for item in value]
+        compact[sys.intern(str(key))] = _intern_value(value)
+    return compact
+
+def extract_job_key(url):
+    """
+    Extract Indeed's job key (the jk parameter) from a job URL
+
+    Args:
+        url (str): Job URL, e.g. https://uk.indeed.com/rc/clk?jk=abc123&fccid=...
+
+    Returns:
+        str: Job key, the URL itself if it has no jk parameter, or None for missing URLs
+    """
+    if not url or url == NOT_AVAILABLE:
+        return None
+    job_keys = parse_qs(urlparse(url).query).get('jk')
+    return job_keys[0] if job_keys else url
+
+class JobRecord(Mapping):
+    """
+    A single scraped job
+
+    Values live in __slots__ instead of a per-job dict, and low-cardinality
+    strings (company, location, posting date, "Not specified") are interned so
+    repeated values share one object. The record still reads like the job
+    dictionaries it replaces (job['title'], job.get('ai_data'), dict(job)),
+    and dict/JSON views are only built when to_dict() or to_json() is called.
+    """
+    FIELDS = ('title', 'company', 'location', 'date_posted', 'url', 'description', 'ai_data')
+    # Fields that only appear in the output once they are set
+    OPTIONAL_FIELDS = ('duplicate_cluster', 'skill_tags')
+    __slots__ = FIELDS + OPTIONAL_FIELDS
+
+    def __init__(self, title, company=NOT_SPECIFIED, location=NOT_SPECIFIED,
+                 date_posted=NOT_SPECIFIED, url=NOT_AVAILABLE, description="", ai_data=None):
+        self.title = title
+        self.company = company
+        self.location = location
+        self.date_posted = date_posted
+        self.url = url
+        self.description = description
+        self.ai_data = ai_data
+        self.duplicate_cluster = None
+        self.skill_tags = None
+
+    def __setattr__(self, name, value):
+        if name in INTERNED_FIELDS:
+            value = _intern_value(value)
+        elif name == 'ai_data':
+            value = _compact_ai_data(value)
+        object.__setattr__(self, name, value)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from a job dictionary, ignoring unknown keys
+
+        Args:
+            data (dict): Job dictionary as saved by the file writers
+
+        Returns:
+            JobRecord: New record
+        """
+        record = cls(**{field: data[field] for field in cls.FIELDS if field in data})
+        record.duplicate_cluster = data.get('duplicate_cluster')
+        record.skill_tags = data.get('skill_tags')
+        return record
+
+    def _fields(self):
+        if self.duplicate_cluster is None and self.skill_tags is None:
+            return self.FIELDS
+        return self.FIELDS + tuple(field for field in self.OPTIONAL_FIELDS if getattr(self, field) is not None)
+
+    def __getitem__(self, key):
+        if key not in self._fields():
+            raise KeyError(key)
+        value = getattr(self, key)
+        if key == 'ai_data' and value is None:
+            return {}
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS + self.OPTIONAL_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return iter(self._fields())
+
+    def __len__(self):
+        return len(self._fields())
+
+    @property
+    def job_key(self):
+        """Indeed job key used to identify the same job across searches and runs"""
+        return extract_job_key(self.url)
+
+    def __repr__(self):
+        return f"JobRecord(title={self.title!r}, company={self.company!r}, url={self.url!r})"
+
+    def to_dict(self):
+        """
+        Materialise the record as a plain dictionary
+
+        Returns:
+            dict: Job dictionary with the same keys and order as before
+        """
+        return {field: self[field] for field in self._fields()}
+
+    def to_json(self, **kwargs):
+        """
+        Serialise the record as a JSON string
+
+        Args:
+            **kwargs: Passed through to json.dumps
+
+        Returns:
+            str: JSON object
+        """
+        return json.dumps(self.to_dict(), **kwargs)
+
+def as_job_dict(job):
+    """
+    Return a plain dictionary view of a job record or job dictionary
+
+    Args:
+        job (JobRecord or dict): Job to convert
+
+    Returns:
+        dict: Job dictionary
+    """
+    if isinstance(job, JobRecord):
+        return job.to_dict()
+    return job
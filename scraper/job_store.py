@@ -0,0 +1,480 @@
+"""
+Durable store of scraped jobs keyed by Indeed job key
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from scraper.job_record import JobRecord, as_job_dict, extract_job_key
+
+# Default location of the job store
+DEFAULT_JOB_STORE_PATH = os.path.join('data', 'jobs.db')
+
+# Job card fields refreshed on every sighting of a job
+CARD_FIELDS = ('title', 'company', 'location', 'date_posted', 'url')
+
+# Columns added after the first release, created on stores that predate them
+ADDED_COLUMNS = (
+    ('enrich_owner', 'TEXT'),
+    ('enrich_claimed_until', 'REAL'),
+    ('enrich_attempts', 'INTEGER NOT NULL DEFAULT 0'),
+    ('duplicate_cluster', 'TEXT'),
+    ('skill_tags', 'TEXT'),
+)
+
+# Seconds a job claimed for description fetching stays invisible to other enrich processes
+DEFAULT_CLAIM_SECONDS = 600
+
+# Failed description fetches before a job is no longer picked for enrichment
+DEFAULT_MAX_ENRICH_ATTEMPTS = 3
+
+# Condition matching jobs without a description
+UNDESCRIBED = "(description IS NULL OR description = '')"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_key TEXT PRIMARY KEY,
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    date_posted TEXT,
+    url TEXT,
+    description TEXT,
+    ai_data TEXT,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL,
+    description_fetched_at REAL,
+    enrich_owner TEXT,
+    enrich_claimed_until REAL,
+    enrich_attempts INTEGER NOT NULL DEFAULT 0,
+    duplicate_cluster TEXT,
+    skill_tags TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs (last_seen);
+CREATE TABLE IF NOT EXISTS search_runs (
+    search_key TEXT PRIMARY KEY,
+    last_attempt REAL,
+    last_success REAL,
+    last_jobs INTEGER,
+    last_new_jobs INTEGER
+);
+"""
+
+class JobStore:
+    """
+    SQLite table of jobs, one row per job key
+
+    Writes are idempotent upserts: storing the same card or description twice
+    leaves the same row, which is what at-least-once task delivery needs. A
+    card upsert never clears a description that was fetched earlier.
+    """
+
+    def __init__(self, path=DEFAULT_JOB_STORE_PATH, wal=True):
+        """
+        Open (or create) the store
+
+        Args:
+            path (str): Path of the SQLite file
+            wal (bool): Use write-ahead logging; disable it on network volumes
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(jobs)')}
+        with self._conn:
+            for name, definition in ADDED_COLUMNS:
+                if name not in columns:
+                    self._conn.execute(f'ALTER TABLE jobs ADD COLUMN {name} {definition}')
+
+    def upsert_jobs(self, jobs):
+        """
+        Insert or refresh job cards
+
+        Card fields and last_seen are updated; a non-empty description, AI data,
+        duplicate cluster or skill tags on the job replace the stored ones, empty
+        ones keep them.
+
+        Args:
+            jobs (list): JobRecord objects or job dictionaries
+
+        Returns:
+            int: Number of jobs written
+        """
+        now = time.time()
+        rows = []
+        for job in jobs:
+            job = as_job_dict(job)
+            job_key = extract_job_key(job.get('url'))
+            if not job_key:
+                continue
+            ai_data = job.get('ai_data')
+            skill_tags = job.get('skill_tags')
+            rows.append(tuple(job.get(field) for field in CARD_FIELDS) + (
+                job.get('description') or None,
+                json.dumps(ai_data, ensure_ascii=False) if ai_data else None,
+                now, now, now if job.get('description') else None, job.get('duplicate_cluster'),
+                json.dumps(skill_tags, ensure_ascii=False) if skill_tags is not None else None, job_key
+            ))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO jobs (title, company, location, date_posted, url, description, ai_data, '
+                'first_seen, last_seen, description_fetched_at, duplicate_cluster, skill_tags, job_key) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (job_key) DO UPDATE SET title = excluded.title, company = excluded.company, '
+                'location = excluded.location, date_posted = excluded.date_posted, url = excluded.url, '
+                'description = COALESCE(excluded.description, jobs.description), '
+                'ai_data = COALESCE(excluded.ai_data, jobs.ai_data), last_seen = excluded.last_seen, '
+                'description_fetched_at = COALESCE(excluded.description_fetched_at, jobs.description_fetched_at), '
+                'duplicate_cluster = COALESCE(excluded.duplicate_cluster, jobs.duplicate_cluster), '
+                'skill_tags = COALESCE(excluded.skill_tags, jobs.skill_tags)',
+                rows
+            )
+        return len(rows)
+
+    def set_description(self, job_key, description, ai_data=None, duplicate_cluster=None, skill_tags=None):
+        """
+        Store the fetched description (and AI data) of a job
+
+        Args:
+            job_key (str): Indeed job key
+            description (str): Description text
+            ai_data (dict, optional): AI-extracted fields
+            duplicate_cluster (str, optional): Near-duplicate cluster of the job
+            skill_tags (dict, optional): Skill -> mention count in the description
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE jobs SET description = ?, ai_data = COALESCE(?, ai_data), description_fetched_at = ?, '
+                'duplicate_cluster = COALESCE(?, duplicate_cluster), skill_tags = COALESCE(?, skill_tags), '
+                'enrich_owner = NULL, enrich_claimed_until = NULL WHERE job_key = ?',
+                (description, json.dumps(ai_data, ensure_ascii=False) if ai_data else None, time.time(),
+                 duplicate_cluster, json.dumps(skill_tags, ensure_ascii=False) if skill_tags is not None else None,
+                 job_key)
+            )
+
+    def has_description(self, job_key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT description IS NOT NULL AND description != '' FROM jobs WHERE job_key = ?", (job_key,)
+            ).fetchone()
+        return bool(row and row[0])
+
+    def known_keys(self, job_keys, with_description=False):
+        """
+        Return which of job_keys are already stored
+
+        Args:
+            job_keys (iterable): Indeed job keys
+            with_description (bool): Only count jobs whose description has been fetched
+
+        Returns:
+            set: The subset that is in the store
+        """
+        job_keys = [key for key in job_keys if key]
+        if not job_keys:
+            return set()
+        description_filter = " AND description IS NOT NULL AND description != ''" if with_description else ''
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_key FROM jobs WHERE job_key IN ({','.join('?' * len(job_keys))})" + description_filter,
+                job_keys
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def described_keys(self, job_keys):
+        """Return which of job_keys are stored with a description"""
+        return self.known_keys(job_keys, with_description=True)
+
+    def _enrich_filter(self, title=None, location=None, company=None, seen_within_days=None,
+                       max_attempts=DEFAULT_MAX_ENRICH_ATTEMPTS):
+        """SQL condition and parameters selecting undescribed jobs that match the enrich filters"""
+        conditions = [UNDESCRIBED, 'url IS NOT NULL', 'enrich_attempts < ?']
+        params = [max_attempts]
+        for column, value in (('title', title), ('location', location), ('company', company)):
+            if value:
+                conditions.append(f"{column} LIKE ?")
+                params.append(f"%{value}%")
+        if seen_within_days is not None:
+            conditions.append('last_seen >= ?')
+            params.append(time.time() - seen_within_days * 86400)
+        return ' AND '.join(conditions), params
+
+    def count_undescribed(self, **filters):
+        """
+        Count jobs waiting for a description
+
+        Args:
+            **filters: title, location, company (substrings), seen_within_days, max_attempts
+
+        Returns:
+            dict: 'pending' (not claimed), 'claimed' (claimed by a running enrich process) and
+                'given_up' (out of attempts) job counts
+        """
+        condition, params = self._enrich_filter(**filters)
+        max_attempts = params[0]
+        now = time.time()
+        with self._lock:
+            claimed = self._conn.execute(
+                f'SELECT COUNT(*) FROM jobs WHERE {condition} AND enrich_claimed_until >= ?', params + [now]
+            ).fetchone()[0]
+            matching = self._conn.execute(f'SELECT COUNT(*) FROM jobs WHERE {condition}', params).fetchone()[0]
+            given_up = self._conn.execute(
+                f'SELECT COUNT(*) FROM jobs WHERE {UNDESCRIBED} AND enrich_attempts >= ?', (max_attempts,)
+            ).fetchone()[0]
+        return {'pending': matching - claimed, 'claimed': claimed, 'given_up': given_up}
+
+    def claim_undescribed(self, owner, limit, claim_seconds=DEFAULT_CLAIM_SECONDS, prefer_titles=None,
+                          order='newest', **filters):
+        """
+        Claim up to limit jobs without a description for fetching
+
+        A claimed job is skipped by other enrich processes until the claim
+        expires, so several processes can enrich the same store. A process that
+        dies leaves its claims to expire. The claim is one UPDATE statement, so
+        two processes cannot claim the same job.
+
+        Args:
+            owner (str): Identifier of the claiming process
+            limit (int): Maximum number of jobs to claim
+            claim_seconds (float): Seconds before an unfinished claim expires
+            prefer_titles (list, optional): Jobs whose title contains one of these words come first
+            order (str): 'newest' (most recently seen first) or 'oldest' (first seen first)
+            **filters: title, location, company (substrings), seen_within_days, max_attempts
+
+        Returns:
+            list: (job_key, url) pairs of the claimed jobs
+        """
+        condition, params = self._enrich_filter(**filters)
+        ordering = []
+        order_params = []
+        for word in prefer_titles or ():
+            ordering.append('title LIKE ? DESC')
+            order_params.append(f"%{word}%")
+        ordering += ['enrich_attempts', 'last_seen DESC' if order == 'newest' else 'first_seen']
+        now = time.time()
+        claimed_until = now + claim_seconds
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE jobs SET enrich_owner = ?, enrich_claimed_until = ? WHERE job_key IN ('
+                f'SELECT job_key FROM jobs WHERE {condition} '
+                'AND (enrich_claimed_until IS NULL OR enrich_claimed_until < ?) '
+                f'ORDER BY {", ".join(ordering)} LIMIT ?)',
+                [owner, claimed_until] + params + [now] + order_params + [limit]
+            )
+            rows = self._conn.execute(
+                'SELECT job_key, url FROM jobs WHERE enrich_owner = ? AND enrich_claimed_until = ?',
+                (owner, claimed_until)
+            ).fetchall()
+        return rows
+
+    def release_claim(self, job_key, owner, failed=False):
+        """
+        Give up a claim made by claim_undescribed
+
+        Args:
+            job_key (str): Indeed job key
+            owner (str): Identifier the job was claimed with
+            failed (bool): Count a failed fetch attempt against the job
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'UPDATE jobs SET enrich_owner = NULL, enrich_claimed_until = NULL, '
+                'enrich_attempts = enrich_attempts + ? WHERE job_key = ? AND enrich_owner = ?',
+                (1 if failed else 0, job_key, owner)
+            )
+
+    def reset_enrich_attempts(self):
+        """Give jobs that ran out of description attempts a fresh start"""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                f'UPDATE jobs SET enrich_attempts = 0 WHERE {UNDESCRIBED} AND enrich_attempts > 0'
+            ).rowcount
+
+    def last_search_run(self, search_key):
+        """
+        Bookkeeping of a recurring search
+
+        Returns:
+            dict: last_attempt, last_success (epoch seconds or None), last_jobs and last_new_jobs
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT last_attempt, last_success, last_jobs, last_new_jobs FROM search_runs WHERE search_key = ?',
+                (search_key,)
+            ).fetchone()
+        keys = ('last_attempt', 'last_success', 'last_jobs', 'last_new_jobs')
+        return dict(zip(keys, row)) if row else dict.fromkeys(keys)
+
+    def record_search_run(self, search_key, started_at, success, jobs=0, new_jobs=0):
+        """
+        Record a run of a recurring search
+
+        Args:
+            search_key (str): Identity of the search
+            started_at (float): Start of the run (epoch seconds); stored as last_success so
+                jobs posted while the run was going are covered by the next one
+            success (bool): Whether every page was retrieved
+            jobs (int): Jobs seen
+            new_jobs (int): Jobs whose description was fetched
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO search_runs (search_key, last_attempt, last_success, last_jobs, last_new_jobs) '
+                'VALUES (?, ?, ?, ?, ?) ON CONFLICT (search_key) DO UPDATE SET last_attempt = excluded.last_attempt, '
+                'last_success = COALESCE(excluded.last_success, search_runs.last_success), '
+                'last_jobs = excluded.last_jobs, last_new_jobs = excluded.last_new_jobs',
+                (search_key, started_at, started_at if success else None, jobs, new_jobs)
+            )
+
+    def _record(self, row):
+        title, company, location, date_posted, url, description, ai_data = row
+        return JobRecord(title=title, company=company, location=location, date_posted=date_posted,
+                         url=url, description=description or "", ai_data=json.loads(ai_data) if ai_data else None)
+
+    def get(self, job_key):
+        """JobRecord for job_key, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT title, company, location, date_posted, url, description, ai_data FROM jobs WHERE job_key = ?',
+                (job_key,)
+            ).fetchone()
+        return self._record(row) if row else None
+
+    def iter_without_ai_data(self, batch_size=1000):
+        """
+        Yield batches of described jobs that have no AI data
+
+        Yields:
+            list: (job_key, JobRecord) pairs
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT rowid, job_key, title, company, location, date_posted, url, description, ai_data '
+                    f'FROM jobs WHERE rowid > ? AND ai_data IS NULL AND NOT {UNDESCRIBED} ORDER BY rowid LIMIT ?',
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield [(row[1], self._record(row[2:])) for row in rows]
+            last_rowid = rows[-1][0]
+
+    def set_ai_data(self, items):
+        """
+        Store AI data for jobs that have none
+
+        Args:
+            items (iterable): (job_key, ai_data dict) pairs
+
+        Returns:
+            int: Number of jobs updated
+        """
+        rows = [(json.dumps(ai_data, ensure_ascii=False), job_key) for job_key, ai_data in items]
+        with self._lock, self._conn:
+            return self._conn.executemany(
+                'UPDATE jobs SET ai_data = ? WHERE job_key = ? AND ai_data IS NULL', rows
+            ).rowcount
+
+    def iter_without_duplicate_cluster(self, batch_size=1000):
+        """
+        Yield batches of described jobs that have no near-duplicate cluster, oldest first
+
+        Yields:
+            list: (job_key, JobRecord) pairs
+        """
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT rowid, job_key, title, company, location, date_posted, url, description, ai_data '
+                    f'FROM jobs WHERE rowid > ? AND duplicate_cluster IS NULL AND NOT {UNDESCRIBED} '
+                    'ORDER BY rowid LIMIT ?',
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield [(row[1], self._record(row[2:])) for row in rows]
+            last_rowid = rows[-1][0]
+
+    def set_duplicate_clusters(self, items):
+        """
+        Store the near-duplicate cluster of jobs
+
+        Args:
+            items (iterable): (job_key, cluster) pairs
+
+        Returns:
+            int: Number of jobs updated
+        """
+        rows = [(cluster, job_key) for job_key, cluster in items if cluster]
+        with self._lock, self._conn:
+            return self._conn.executemany('UPDATE jobs SET duplicate_cluster = ? WHERE job_key = ?', rows).rowcount
+
+    def iter_descriptions(self, batch_size=1000, untagged_only=True):
+        """
+        Yield batches of stored descriptions for skill tagging, oldest first
+
+        Args:
+            batch_size (int): Jobs per batch
+            untagged_only (bool): Skip jobs that already have skill tags
+
+        Yields:
+            list: (job_key, description) pairs
+        """
+        untagged = ' AND skill_tags IS NULL' if untagged_only else ''
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f'SELECT rowid, job_key, description FROM jobs WHERE rowid > ? AND NOT {UNDESCRIBED}{untagged} '
+                    'ORDER BY rowid LIMIT ?',
+                    (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield [(row[1], row[2]) for row in rows]
+            last_rowid = rows[-1][0]
+
+    def set_skill_tags(self, items):
+        """
+        Store the skill tags of jobs
+
+        Args:
+            items (iterable): (job_key, skill -> count dict) pairs
+
+        Returns:
+            int: Number of jobs updated
+        """
+        rows = [(json.dumps(tags, ensure_ascii=False), job_key) for job_key, tags in items]
+        with self._lock, self._conn:
+            return self._conn.executemany('UPDATE jobs SET skill_tags = ? WHERE job_key = ?', rows).rowcount
+
+    def iter_jobs(self, batch_size=1000):
+        """Yield every stored job as a JobRecord, oldest first"""
+        last_rowid = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    'SELECT rowid, title, company, location, date_posted, url, description, ai_data FROM jobs '
+                    'WHERE rowid > ? ORDER BY rowid LIMIT ?', (last_rowid, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._record(row[1:])
+            last_rowid = rows[-1][0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,161 @@
+"""
+Local extraction of structured job fields from description text
+"""
+import re
+from scraper.job_record import NOT_SPECIFIED
+from scraper.skill_tagger import default_tagger
+
+# Keys of the ScrapingBee AI extraction result, filled in the same shape locally
+AI_DATA_KEYS = ('job_title', 'company', 'location', 'salary', 'required_skills',
+                'experience_level', 'education', 'job_summary')
+
+_AMOUNT = r'\d{1,3}(?:,\d{3})+(?:\.\d{2})?|\d+(?:\.\d+)?\s?[kK]\b|\d+(?:\.\d{2})?'
+_CURRENCY = r'[£$€]|GBP\s?|USD\s?|EUR\s?'
+_PERIOD = (r'per\s+(?:annum|year|month|week|day|hour)|an?\s+(?:year|month|week|day|hour)|p\.?a\.?(?!\w)'
+           r'|p/?h\b|/\s?(?:year|yr|annum|month|week|day|hour|hr)\b')
+
+SALARY_RE = re.compile(
+    rf'(?:{_CURRENCY})\s?(?:{_AMOUNT})'
+    rf'(?:\s*(?:-|–|—|to)\s*(?:{_CURRENCY})?\s?(?:{_AMOUNT}))?'
+    rf'(?:\s*(?:{_PERIOD}))?',
+    re.IGNORECASE
+)
+
+EXPERIENCE_RE = re.compile(
+    r'(?P<low>\d{1,2})\s*(?P<plus>\+|plus)?\s*(?:(?:-|–|to)\s*(?P<high>\d{1,2})\s*)?(?:years?|yrs?)\b\'?'
+    r'(?:\s+of)?(?:\s+[\w/-]+){0,4}?\s+experience'
+    r'|experience\s+of\s+(?:at\s+least\s+)?(?P<low2>\d{1,2})\s*(?P<plus2>\+)?\s*(?:years?|yrs?)\b',
+    re.IGNORECASE
+)
+
+# Seniority words used when no number of years is given, most specific first
+SENIORITY_RE = re.compile(
+    r'\b(?P<level>graduate|entry[- ]level|junior|mid[- ]level|intermediate|senior|lead|principal|staff|head of)\b',
+    re.IGNORECASE
+)
+SENIORITY_LEVELS = {
+    'graduate': 'Entry level', 'entry level': 'Entry level', 'entry-level': 'Entry level', 'junior': 'Junior',
+    'mid level': 'Mid level', 'mid-level': 'Mid level', 'intermediate': 'Mid level', 'senior': 'Senior',
+    'lead': 'Lead', 'principal': 'Principal', 'staff': 'Principal', 'head of': 'Head',
+}
+
+EDUCATION_RE = re.compile(
+    r"(?:\b(?:a|an|relevant|good|strong|first|upper|second|class|honours|university|\d:\d)\s+){0,3}"
+    r"\b(?:bachelor'?s|master'?s|ph\.?\s?d|doctorate|b\.?\s?sc|m\.?\s?sc|b\.?\s?eng|m\.?\s?eng|degree"
+    r"|a[- ]levels?|gcses?|hnd|diploma)\b[^.;\n]{0,100}",
+    re.IGNORECASE
+)
+
+SENTENCE_END_RE = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+# Longest job summary, in characters
+MAX_SUMMARY_LENGTH = 300
+
+def extract_skills(text, tagger=None):
+    """
+    Find vocabulary skills in text
+
+    Args:
+        text (str): Description text
+        tagger (SkillTagger, optional): Tagger to use (default: the shipped vocabulary in scraper/skills.txt)
+
+    Returns:
+        list: Canonical skill names in order of first mention
+    """
+    return list((tagger or default_tagger()).tag(text))
+
+def extract_salary(text):
+    """
+    Find the advertised salary in text
+
+    A range or an amount with a pay period is preferred over a bare amount.
+
+    Returns:
+        str: Salary as written, e.g. "£45,000 - £55,000 per annum", or None
+    """
+    first = None
+    for match in SALARY_RE.finditer(text or ''):
+        salary = ' '.join(match.group(0).split()).rstrip('.')
+        if re.search(rf'(?:-|–|—|to)|{_PERIOD}', salary[1:], re.IGNORECASE):
+            return salary
+        first = first or salary
+    return first
+
+def extract_experience(text, title=None):
+    """
+    Find the experience required, as years or a seniority level
+
+    Returns:
+        str: e.g. "3-5 years", "2+ years", "Senior", or None
+    """
+    match = EXPERIENCE_RE.search(text or '')
+    if match:
+        if match.group('low2'):
+            return f"{match.group('low2')}{'+' if match.group('plus2') else ''} years"
+        if match.group('high'):
+            return f"{match.group('low')}-{match.group('high')} years"
+        return f"{match.group('low')}{'+' if match.group('plus') else ''} years"
+    for source in (title, text):
+        level = SENIORITY_RE.search(source or '')
+        if level:
+            return SENIORITY_LEVELS[' '.join(level.group('level').lower().split())]
+    return None
+
+def extract_education(text):
+    """Find the first education requirement, e.g. "a degree in Computer Science", or None"""
+    match = EDUCATION_RE.search(text or '')
+    return ' '.join(match.group(0).split()).rstrip(' ,') if match else None
+
+def summarize(text, max_length=MAX_SUMMARY_LENGTH):
+    """First two sentences of text, shortened to max_length characters"""
+    if not text:
+        return None
+    sentences = SENTENCE_END_RE.split(' '.join(text.split()), maxsplit=2)
+    summary = ' '.join(sentences[:2])
+    if len(summary) > max_length:
+        summary = summary[:max_length].rsplit(' ', 1)[0] + '...'
+    return summary
+
+def extract_fields(description, job=None, tagger=None):
+    """
+    Extract the AI extraction fields from a job description
+
+    Args:
+        description (str): Description text
+        job (Mapping, optional): Job card supplying job_title, company and location
+        tagger (SkillTagger, optional): Tagger finding the required skills
+
+    Returns:
+        dict: The AI_DATA_KEYS, with NOT_SPECIFIED (or an empty skills list) where nothing was found
+    """
+    job = job or {}
+    title = job.get('title')
+    fields = {
+        'job_title': title,
+        'company': job.get('company'),
+        'location': job.get('location'),
+        'salary': extract_salary(description),
+        'required_skills': extract_skills(description, tagger),
+        'experience_level': extract_experience(description, title),
+        'education': extract_education(description),
+        'job_summary': summarize(description),
+    }
+    return {key: value if value or key == 'required_skills' else NOT_SPECIFIED for key, value in fields.items()}
+
+def extract_fields_batch(descriptions, jobs=None, tagger=None):
+    """
+    Extract the AI extraction fields from many descriptions
+
+    Args:
+        descriptions (iterable): Description texts
+        jobs (iterable, optional): Job cards matching the descriptions one to one
+        tagger (SkillTagger, optional): Tagger finding the required skills
+
+    Returns:
+        list: One field dictionary per description (see extract_fields)
+    """
+    descriptions = list(descriptions)
+    jobs = list(jobs) if jobs is not None else [None] * len(descriptions)
+    if len(jobs) != len(descriptions):
+        raise ValueError(f"{len(descriptions)} descriptions but {len(jobs)} jobs")
+    return [extract_fields(description, job, tagger) for description, job in zip(descriptions, jobs)]
@@ -1,9 +1,13 @@
 """
 Logging utilities for the Indeed Job Scraper
 """
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
+import threading
 import colorama
 from datetime import datetime
 
@@ -46,55 +50,62 @@ class Emoji:
     SEARCH = "[SRCH]"
     PAGE = "[PAGE]"
 
+# Explicit log categories - pass one as extra=Category.X on each log call
+class Category:
+    NAVIGATION = {'category': 'navigation'}
+    LISTING = {'category': 'listing'}
+    AI = {'category': 'ai'}
+    DESCRIPTION = {'category': 'description'}
+    SAVING = {'category': 'saving'}
+    ERROR = {'category': 'error'}
+    WARNING = {'category': 'warning'}
+    SUCCESS = {'category': 'success'}
+    STARTING = {'category': 'starting'}
+
+# Console prefix for each category: (symbol, color, label)
+CATEGORY_STYLES = {
+    'navigation': (Emoji.NAVIGATION, Colors.NAVIGATION, "PAGE NAVIGATION"),
+    'listing': (Emoji.LISTING, Colors.LISTING, "JOB LISTINGS"),
+    'ai': (Emoji.AI, Colors.AI, "AI EXTRACTION"),
+    'description': (Emoji.DESCRIPTION, Colors.DESCRIPTION, "DESCRIPTION"),
+    'saving': (Emoji.SAVING, Colors.SAVING, "SAVING DATA"),
+    'error': (Emoji.ERROR, Colors.ERROR, "ERROR"),
+    'warning': (Emoji.WARNING, Colors.WARNING, "WARNING"),
+    'success': (Emoji.SUCCESS, Colors.SUCCESS, "SUCCESS"),
+    'starting': (Emoji.SEARCH, Colors.INFO, "STARTING"),
+}
+
+# Pre-rendered prefixes so formatting a record is a dict lookup
+CATEGORY_PREFIXES = {
+    category: f"{emoji} {Colors.BOLD}{color}{label}:{Colors.RESET} "
+    for category, (emoji, color, label) in CATEGORY_STYLES.items()
+}
+
 # Custom formatter for console output
 class ColoredFormatter(logging.Formatter):
+    """
+    Prefix console messages with the category passed in extra=
+
+    Records without a category fall back to their level (errors and warnings),
+    otherwise they are printed plain. The record itself is never modified, so
+    file handlers still get the undecorated message, and the coloured output is
+    cached on the record in case more than one console handler formats it.
+    """
     def format(self, record):
-        # Default formatting
-        emoji = Emoji.INFO
-        color = Colors.INFO
-        
-        # Categorize and color based on message content
-        msg = record.getMessage()
+        cached = record.__dict__.get('_colored_output')
+        if cached is not None:
+            return cached
         
-        if "page" in msg.lower() or "url" in msg.lower() or "request" in msg.lower():
-            emoji = Emoji.NAVIGATION
-            color = Colors.NAVIGATION
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.NAVIGATION}PAGE NAVIGATION:{Colors.RESET} {record.msg}"
-        elif "job card" in msg.lower() or "found job" in msg.lower() or "extract" in msg.lower() and "detail" in msg.lower():
-            emoji = Emoji.LISTING
-            color = Colors.LISTING
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.LISTING}JOB LISTINGS:{Colors.RESET} {record.msg}"
-        elif "ai" in msg.lower() or "ai extraction" in msg.lower():
-            emoji = Emoji.AI
-            color = Colors.AI
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.AI}AI EXTRACTION:{Colors.RESET} {record.msg}"
-        elif "description" in msg.lower() and not "ai" in msg.lower():
-            emoji = Emoji.DESCRIPTION
-            color = Colors.DESCRIPTION
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.DESCRIPTION}DESCRIPTION:{Colors.RESET} {record.msg}"
-        elif "save" in msg.lower() or "saved" in msg.lower() or "saving" in msg.lower():
-            emoji = Emoji.SAVING
-            color = Colors.SAVING
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.SAVING}SAVING DATA:{Colors.RESET} {record.msg}"
-        elif "error" in msg.lower() or "fail" in msg.lower() or "exception" in msg.lower():
-            emoji = Emoji.ERROR
-            color = Colors.ERROR
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.ERROR}ERROR:{Colors.RESET} {record.msg}"
-        elif "warning" in msg.lower() or "could not" in msg.lower():
-            emoji = Emoji.WARNING
-            color = Colors.WARNING
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.WARNING}WARNING:{Colors.RESET} {record.msg}"
-        elif "success" in msg.lower() or "complete" in msg.lower():
-            emoji = Emoji.SUCCESS
-            color = Colors.SUCCESS
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.SUCCESS}SUCCESS:{Colors.RESET} {record.msg}"
-        elif "start" in msg.lower() or "beginning" in msg.lower() or "initializ" in msg.lower():
-            emoji = Emoji.SEARCH
-            color = Colors.INFO
-            record.msg = f"{emoji} {Colors.BOLD}{Colors.INFO}STARTING:{Colors.RESET} {record.msg}"
+        category = getattr(record, 'category', None)
+        if category is None:
+            if record.levelno >= logging.ERROR:
+                category = 'error'
+            elif record.levelno >= logging.WARNING:
+                category = 'warning'
         
-        # Apply standard formatting
-        return super().format(record)
+        output = CATEGORY_PREFIXES.get(category, '') + super().format(record)
+        record._colored_output = output
+        return output
 
 # Create a base logger
 logger = logging.getLogger('scraper')
@@ -103,13 +114,91 @@ logger.setLevel(logging.INFO)
 # Create a formatter for console output
 console_formatter = ColoredFormatter('%(message)s')
 
-# Add a console handler with the colored formatter
+# Console handler with the colored formatter - driven by the queue listener below
 console_handler = logging.StreamHandler(sys.stdout)
 console_handler.setFormatter(console_formatter)
-logger.addHandler(console_handler)
+
+# Log calls only enqueue the record; a background listener thread does the console and file I/O
+log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(log_queue))
+_output_handlers = [console_handler]
+_listener = None
+
+# Serialises handler changes when searches run in several threads
+_handlers_lock = threading.RLock()
+
+class _FlushMarker:
+    """Queued by flush_logs(); set once every record queued before it has been written"""
+    def __init__(self):
+        self.written = threading.Event()
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """Queue listener that signals flush markers instead of handling them as records"""
+    def handle(self, record):
+        if isinstance(record, _FlushMarker):
+            record.written.set()
+            return
+        super().handle(record)
+
+def _start_listener():
+    """Start a queue listener writing to the current output handlers"""
+    global _listener
+    _listener = _FlushingQueueListener(log_queue, *_output_handlers, respect_handler_level=True)
+    _listener.start()
+
+def _stop_listener():
+    """Stop the queue listener after it has written every queued record"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def _restart_listener_after_fork():
+    # The listener thread does not survive fork(), so worker processes need their own
+    global _listener, log_queue, _handlers_lock
+    _listener = None
+    _handlers_lock = threading.RLock()
+    log_queue = queue.SimpleQueue()
+    for handler in logger.handlers:
+        if isinstance(handler, logging.handlers.QueueHandler):
+            handler.queue = log_queue
+    _start_listener()
+
+def set_output_handlers(handlers):
+    """
+    Replace the handlers that receive records from the queue
+
+    Records queued before the call are written to the old handlers first.
+
+    Args:
+        handlers (list): Handlers for console/file output
+    """
+    global _output_handlers
+    with _handlers_lock:
+        _stop_listener()
+        _output_handlers = list(handlers)
+        _start_listener()
+
+def flush_logs():
+    """Block until every queued record has been written"""
+    with _handlers_lock:
+        listener = _listener
+        if listener is None or threading.current_thread() is listener._thread:
+            return
+        # Queued under the lock, so a listener stopped after this still handles the marker first
+        marker = _FlushMarker()
+        log_queue.put(marker)
+    marker.written.wait()
+
+_start_listener()
+atexit.register(_stop_listener)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listener_after_fork)
 
 # Helper function to print a box around text
 def print_box(text, color=Colors.INFO, emoji=""):
+    # Let queued log lines print first so the box appears in order
+    flush_logs()
     width = len(text) + 10
     box_top = f"{color}╔{'═' * width}╗{Colors.RESET}"
     box_bottom = f"{color}╚{'═' * width}╝{Colors.RESET}"
@@ -119,28 +208,46 @@ def print_box(text, color=Colors.INFO, emoji=""):
     print(box_content)
     print(box_bottom + "\n")
 
-def configure_job_specific_logger(job_position, job_location):
+class ThreadFilter(logging.Filter):
+    """Only pass records logged by one thread, so concurrent searches keep separate log files"""
+    def __init__(self, thread_ident):
+        super().__init__()
+        self.thread_ident = thread_ident
+    
+    def filter(self, record):
+        return record.thread == self.thread_ident
+
+def configure_job_specific_logger(job_position, job_location, country=None):
     """
-    Configure a job-specific logger
+    Configure a job-specific logger for the calling thread
     
     Args:
         job_position (str): Job position used in the search
         job_location (str): Location used in the search
+        country (str): Country code added to the file name (default: None)
     """
-    # Remove any existing file handlers
-    for handler in logger.handlers[:]:
-        if isinstance(handler, logging.FileHandler):
-            logger.removeHandler(handler)
-    
     # Create a new log filename based on job position and location
-    log_filename = f"{job_position.replace(' ', '_').lower()}_{job_location.replace(' ', '_').lower()}.log"
+    clean_location = job_location.replace(' ', '_').lower() + (f"_{country.lower()}" if country else '')
+    log_filename = f"{job_position.replace(' ', '_').lower()}_{clean_location}.log"
     log_path = os.path.join('logs', log_filename)
     
     # Create a new file handler with standard formatting (no colors or emojis)
     file_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     file_handler = logging.FileHandler(log_path)
     file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
+    thread_filter = ThreadFilter(threading.get_ident())
+    file_handler.addFilter(thread_filter)
+    
+    # Replace this thread's file handler - queued records still go to the previous file
+    with _handlers_lock:
+        previous_file_handlers = [
+            handler for handler in _output_handlers
+            if isinstance(handler, logging.FileHandler)
+            and any(isinstance(f, ThreadFilter) and f.thread_ident == thread_filter.thread_ident for f in handler.filters)
+        ]
+        set_output_handlers([handler for handler in _output_handlers if handler not in previous_file_handlers] + [file_handler])
+    for handler in previous_file_handlers:
+        handler.close()
     
-    logger.info(f"Configured job-specific logger for '{job_position}' in '{job_location}'")
-    logger.info(f"Log file: {log_path}")
+    logger.info(f"Configured job-specific logger for '{job_position}' in '{job_location}'", extra=Category.STARTING)
+    logger.info(f"Log file: {log_path}", extra=Category.SAVING)
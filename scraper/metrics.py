@@ -0,0 +1,326 @@
+"""
+In-process metrics for the Indeed Job Scraper
+"""
+import bisect
+import heapq
+import itertools
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from scraper.logging_utils import logger, Category
+
+# Keep at most this many samples per histogram for percentiles (reservoir sampling beyond that)
+MAX_SAMPLES = 10000
+
+# Histogram bucket upper bounds, used for the Prometheus exposition
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 90, 120)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 524288, 1048576, 2097152, 4194304)
+
+# Window used by rate meters (e.g. jobs per minute)
+RATE_WINDOW_SECONDS = 60
+
+# Number of entries kept by record_slowest (e.g. the slowest requests of a search)
+SLOWEST_LIMIT = 10
+
+def buckets_for(name):
+    """Pick histogram buckets from the metric name's unit suffix"""
+    return BYTES_BUCKETS if name.endswith('_bytes') else SECONDS_BUCKETS
+
+class Histogram:
+    """
+    Distribution of observed values with count, sum, min/max and percentiles
+
+    Percentiles are computed from up to MAX_SAMPLES samples; once that many
+    values have been seen, reservoir sampling keeps a uniform sample of all of them.
+    """
+
+    def __init__(self, buckets=SECONDS_BUCKETS, max_samples=MAX_SAMPLES):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+        self.max_samples = max_samples
+        self._samples = []
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.bucket_counts[bisect.bisect_left(self.buckets, value)] += 1
+        if len(self._samples) < self.max_samples:
+            self._samples.append(value)
+        else:
+            slot = random.randrange(self.count)
+            if slot < self.max_samples:
+                self._samples[slot] = value
+
+    def percentile(self, q):
+        """
+        Return the q-th percentile (0-100) of the observed values
+
+        Args:
+            q (float): Percentile to compute
+
+        Returns:
+            float: Value, or None if nothing has been observed
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = max(0, math.ceil(q / 100 * len(ordered)) - 1)
+        return ordered[rank]
+
+    def summary(self):
+        """Return count, sum, mean, min, max and p50/p95/p99 as a dictionary"""
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'mean': round(self.total / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+    def cumulative_buckets(self):
+        """Return [(upper_bound, cumulative_count)], ending with ('+Inf', count)"""
+        result = []
+        running = 0
+        for bound, bucket_count in zip(self.buckets + ('+Inf',), self.bucket_counts):
+            running += bucket_count
+            result.append((bound, running))
+        return result
+
+class RateMeter:
+    """Count of events in a sliding time window"""
+
+    def __init__(self, window=RATE_WINDOW_SECONDS):
+        self.window = window
+        self._events = deque()
+
+    def _expire(self, now):
+        while self._events and self._events[0] < now - self.window:
+            self._events.popleft()
+
+    def mark(self, count=1):
+        now = time.monotonic()
+        self._events.extend([now] * count)
+        self._expire(now)
+
+    def rate(self):
+        """Events in the last window"""
+        self._expire(time.monotonic())
+        return len(self._events)
+
+def _series_key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def _sort_key(name, labels):
+    """Order of series in exports; label values are compared as text, since they may mix ints and strings"""
+    return name, sorted((label, str(value)) for label, value in dict(labels).items())
+
+def _series_name(key):
+    name, labels = key
+    if not labels:
+        return name
+    return name + '{' + ','.join(f'{label}={value}' for label, value in labels) + '}'
+
+class MetricsRegistry:
+    """
+    Thread-safe set of labelled counters, gauges, rate meters and histograms
+
+    A registry created with a parent forwards every update to it, so a
+    per-search registry can feed the scraper-wide totals at the same time.
+    """
+
+    def __init__(self, parent=None):
+        """
+        Initialize an empty registry
+
+        Args:
+            parent (MetricsRegistry, optional): Registry that also receives every update
+        """
+        self.parent = parent
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._rates = {}
+        self._slowest = {}
+        self._collectors = []
+        self._sequence = itertools.count()
+
+    def inc(self, name, amount=1, **labels):
+        """Add amount to the counter name{labels}"""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+        if self.parent is not None:
+            self.parent.inc(name, amount, **labels)
+
+    def observe(self, name, value, **labels):
+        """Record value in the histogram name{labels}"""
+        key = _series_key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets_for(name))
+            histogram.observe(value)
+        if self.parent is not None:
+            self.parent.observe(name, value, **labels)
+
+    def add_gauge(self, name, delta, **labels):
+        """Add delta (positive or negative) to the gauge name{labels}"""
+        key = _series_key(name, labels)
+        with self._lock:
+            self._gauges[key] = self._gauges.get(key, 0) + delta
+        if self.parent is not None:
+            self.parent.add_gauge(name, delta, **labels)
+
+    def mark(self, name, count=1):
+        """Record count events for the sliding-window rate meter name"""
+        with self._lock:
+            meter = self._rates.get(name)
+            if meter is None:
+                meter = self._rates[name] = RateMeter()
+            meter.mark(count)
+        if self.parent is not None:
+            self.parent.mark(name, count)
+
+    def record_slowest(self, name, value, **details):
+        """
+        Keep value with its details if it is among the SLOWEST_LIMIT largest seen for name
+
+        Args:
+            name (str): List name, e.g. 'requests'
+            value (float): Value to rank by, e.g. latency in seconds
+            **details: JSON-serialisable context stored with the value (e.g. url, status)
+        """
+        entry = (value, next(self._sequence), details)
+        with self._lock:
+            heap = self._slowest.setdefault(name, [])
+            if len(heap) < SLOWEST_LIMIT:
+                heapq.heappush(heap, entry)
+            elif value > heap[0][0]:
+                heapq.heapreplace(heap, entry)
+        if self.parent is not None:
+            self.parent.record_slowest(name, value, **details)
+
+    def slowest(self, name):
+        """Entries kept by record_slowest for name, slowest first, as dicts with a 'value' key"""
+        with self._lock:
+            entries = sorted(self._slowest.get(name, []), reverse=True)
+        return [dict(details, value=value) for value, _, details in entries]
+
+    def add_collector(self, collector):
+        """
+        Register a callable polled at export time for values owned by other objects
+
+        Args:
+            collector (callable): Returns a list of (name, type, labels, value) tuples,
+                where type is 'counter' or 'gauge'
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def collected(self, **labels):
+        """
+        Series of this registry's collectors, with labels added to each
+
+        Passed to another registry's add_collector, this exports values owned by
+        a child registry's objects through the parent, e.g. one scraper's budget
+        and circuit breaker labelled with its country.
+
+        Returns:
+            list: (name, type, labels, value) tuples
+        """
+        with self._lock:
+            collectors = list(self._collectors)
+        result = []
+        for collector in collectors:
+            try:
+                result += [(name, kind, dict(series_labels, **labels), value)
+                           for name, kind, series_labels, value in collector()]
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {str(e)}")
+        return result
+
+    def series(self):
+        """
+        Return every series for exporters
+
+        Returns:
+            list: (name, type, labels, value) tuples; value is a Histogram for histograms
+        """
+        with self._lock:
+            result = [(name, 'counter', dict(labels), value) for (name, labels), value in self._counters.items()]
+            result += [(name, 'gauge', dict(labels), value) for (name, labels), value in self._gauges.items()]
+            result += [(name, 'histogram', dict(labels), histogram)
+                       for (name, labels), histogram in self._histograms.items()]
+            result += [(f"{name}_per_minute", 'gauge', {}, meter.rate() * 60 / meter.window)
+                       for name, meter in self._rates.items()]
+            collectors = list(self._collectors)
+        for collector in collectors:
+            try:
+                result += collector()
+            except Exception as e:
+                logger.error(f"Error collecting metrics: {str(e)}")
+        return sorted(result, key=lambda item: _sort_key(item[0], item[2]))
+
+    def counter(self, name, **labels):
+        """Current value of a counter (0 if it was never incremented)"""
+        with self._lock:
+            return self._counters.get(_series_key(name, labels), 0)
+
+    def counter_total(self, name):
+        """Sum of a counter across all label values"""
+        with self._lock:
+            return sum(value for (series, _), value in self._counters.items() if series == name)
+
+    def histogram(self, name, **labels):
+        """Histogram for name{labels}, or None if nothing was observed"""
+        with self._lock:
+            return self._histograms.get(_series_key(name, labels))
+
+    def snapshot(self):
+        """
+        Return every counter, gauge, histogram summary and slowest list as plain data
+
+        Returns:
+            dict: {'counters': {series: value}, 'gauges': {series: value}, 'histograms': {series: summary},
+                'slowest': {name: [entry, ...]}}
+        """
+        with self._lock:
+            snapshot = {
+                'counters': {_series_name(key): value
+                             for key, value in sorted(self._counters.items(), key=lambda item: _sort_key(*item[0]))},
+                'gauges': {_series_name(key): value
+                           for key, value in sorted(self._gauges.items(), key=lambda item: _sort_key(*item[0]))},
+                'histograms': {_series_name(key): histogram.summary()
+                               for key, histogram in sorted(self._histograms.items(),
+                                                            key=lambda item: _sort_key(*item[0]))},
+            }
+            names = sorted(self._slowest)
+        snapshot['slowest'] = {name: self.slowest(name) for name in names}
+        return snapshot
+
+    def write_json(self, path, **extra):
+        """
+        Write a snapshot of the registry to a JSON file
+
+        Args:
+            path (str): Output file
+            **extra: Additional top-level fields (e.g. search terms, timestamps)
+        """
+        data = dict(extra)
+        data.update(self.snapshot())
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        logger.info(f"Saved request metrics to {path} [OK]", extra=Category.SAVING)
@@ -0,0 +1,113 @@
+"""
+Prometheus-compatible metrics endpoint for long-running scrapes
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scraper.logging_utils import logger, Category
+
+# Prefix added to every exported metric name
+METRIC_PREFIX = 'indeed_scraper_'
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) + list((extra or {}).items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in items) + '}'
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def render_prometheus(registry):
+    """
+    Render a MetricsRegistry in the Prometheus text exposition format
+
+    Args:
+        registry (MetricsRegistry): Registry to export
+
+    Returns:
+        str: Exposition text
+    """
+    lines = []
+    declared = set()
+
+    for name, metric_type, labels, value in registry.series():
+        full_name = METRIC_PREFIX + name
+        if full_name not in declared:
+            lines.append(f"# TYPE {full_name} {metric_type}")
+            declared.add(full_name)
+
+        if metric_type == 'histogram':
+            for bound, cumulative in value.cumulative_buckets():
+                le = bound if bound == '+Inf' else _format_value(float(bound))
+                lines.append(f"{full_name}_bucket{_format_labels(labels, {'le': le})} {cumulative}")
+            lines.append(f"{full_name}_sum{_format_labels(labels)} {_format_value(float(value.total))}")
+            lines.append(f"{full_name}_count{_format_labels(labels)} {value.count}")
+        else:
+            lines.append(f"{full_name}{_format_labels(labels)} {_format_value(value)}")
+
+    return '\n'.join(lines) + '\n'
+
+class MetricsServer:
+    """HTTP server exposing a registry on /metrics from a background thread"""
+
+    def __init__(self, registry, port, host='127.0.0.1'):
+        """
+        Initialize the server (call start() to begin serving)
+
+        Args:
+            registry (MetricsRegistry): Registry to export
+            port (int): Port to listen on (0 picks a free port)
+            host (str): Interface to bind (default: localhost only)
+        """
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split('?')[0] not in ('/metrics', '/'):
+                    handler.send_error(404)
+                    return
+                body = render_prometheus(registry).encode('utf-8')
+                handler.send_response(200)
+                handler.send_header('Content-Type', CONTENT_TYPE)
+                handler.send_header('Content-Length', str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, format, *args):
+                # Keep scrape requests out of the console log
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name='metrics-server', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logger.info(f"Serving Prometheus metrics on http://{self.httpd.server_address[0]}:{self.port}/metrics", extra=Category.STARTING)
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+def start_metrics_server(registry, port, host='127.0.0.1'):
+    """
+    Start serving a registry in Prometheus format on a background thread
+
+    Args:
+        registry (MetricsRegistry): Registry to export
+        port (int): Port to listen on
+        host (str): Interface to bind (default: localhost only)
+
+    Returns:
+        MetricsServer: The running server
+    """
+    return MetricsServer(registry, port, host).start()
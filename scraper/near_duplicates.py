@@ -0,0 +1,249 @@
+"""
+Near-duplicate job detection with MinHash signatures and LSH buckets
+"""
+import os
+import re
+import sqlite3
+import threading
+import zlib
+import numpy as np
+from scraper.logging_utils import logger, Category
+from scraper.job_record import as_job_dict, extract_job_key
+
+# Default location of the on-disk index
+DEFAULT_NEAR_DUPLICATES_PATH = os.path.join('data', 'near_duplicates.db')
+
+# Estimated Jaccard similarity at which two jobs are the same role
+DEFAULT_SIMILARITY_THRESHOLD = 0.8
+
+# Hash functions per signature - more is more accurate and slower
+DEFAULT_NUM_PERM = 128
+
+# Words per shingle
+SHINGLE_SIZE = 3
+
+# Mersenne prime modulus of the (a * x + b) mod p hash family, and the kept signature bits
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+# Fixed seed so signatures written by earlier runs stay comparable
+HASH_SEED = 1
+
+WORD_PATTERN = re.compile(r'\w+')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    job_key TEXT PRIMARY KEY,
+    cluster TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_cluster ON signatures (cluster);
+CREATE TABLE IF NOT EXISTS buckets (
+    band INTEGER NOT NULL,
+    bucket BLOB NOT NULL,
+    job_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_band_bucket ON buckets (band, bucket);
+CREATE TABLE IF NOT EXISTS settings (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Overlapping word n-grams of text, lower-cased
+
+    Returns:
+        set: Shingles; the whole text as one shingle when it has fewer than size words
+    """
+    words = WORD_PATTERN.findall((text or '').lower())
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+def job_text(job):
+    """Text a job is compared on: title, company and description"""
+    job = as_job_dict(job)
+    return ' '.join(str(job.get(field) or '') for field in ('title', 'company', 'description'))
+
+def lsh_params(threshold, num_perm=DEFAULT_NUM_PERM):
+    """
+    Choose the LSH bands and rows per band for a similarity threshold
+
+    Two signatures share a bucket with probability 1 - (1 - s^rows)^bands at
+    similarity s. The split minimising the false positive area below the
+    threshold plus the false negative area above it is used.
+
+    Returns:
+        tuple: (bands, rows)
+    """
+    similarity = np.linspace(0, 1, 201)
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        collide = 1 - (1 - similarity ** rows) ** bands
+        error = (np.trapz(collide[similarity < threshold], similarity[similarity < threshold])
+                 + np.trapz(1 - collide[similarity >= threshold], similarity[similarity >= threshold]))
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+class MinHasher:
+    """MinHash signatures over shingle sets with a fixed family of hash functions"""
+
+    def __init__(self, num_perm=DEFAULT_NUM_PERM, seed=HASH_SEED):
+        generator = np.random.RandomState(seed)
+        # a and b below 2^31 keep a * x + b inside uint64 for 32-bit shingle hashes
+        self.a = generator.randint(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.b = generator.randint(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    def signature(self, shingle_set):
+        """
+        MinHash signature of a shingle set
+
+        Returns:
+            np.ndarray: num_perm uint32 values (all MAX_HASH for an empty set)
+        """
+        if not shingle_set:
+            return np.full(self.num_perm, MAX_HASH, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingle_set),
+                             dtype=np.uint64, count=len(shingle_set))
+        permuted = (np.outer(self.a, hashes) + self.b[:, None]) % np.uint64(MERSENNE_PRIME)
+        return (permuted & np.uint64(MAX_HASH)).min(axis=1).astype(np.uint32)
+
+class NearDuplicateIndex:
+    """
+    Assigns each job to a cluster of near-identical postings
+
+    The same role posted by several agencies, or reposted under a new job key,
+    has a different key but nearly the same title, company and description.
+    Each job's MinHash signature is split into bands, and each band is stored
+    in a bucket table. A new job is only compared with the jobs that share a
+    bucket with it, so the cost of adding a job does not grow with the index.
+    It joins the cluster of its most similar candidate when their estimated
+    similarity reaches the threshold, and starts its own cluster otherwise.
+    A cluster is named after the job key of its first member.
+    """
+
+    def __init__(self, path=DEFAULT_NEAR_DUPLICATES_PATH, threshold=DEFAULT_SIMILARITY_THRESHOLD,
+                 num_perm=DEFAULT_NUM_PERM):
+        """
+        Open (or create) the index
+
+        Args:
+            path (str): Path of the SQLite index file
+            threshold (float): Estimated Jaccard similarity at which jobs are clustered together
+            num_perm (int): Hash functions per signature
+        """
+        self.path = path
+        self.threshold = threshold
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+        settings = dict(self._conn.execute('SELECT name, value FROM settings'))
+        if settings.get('num_perm', num_perm) != num_perm:
+            raise ValueError(f"{path} holds {settings['num_perm']}-value signatures, not {num_perm}")
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = lsh_params(threshold, num_perm)
+        if (settings.get('bands'), settings.get('rows')) != (self.bands, self.rows):
+            self._rebucket(settings)
+
+    def _rebucket(self, settings):
+        """Store the banding for this threshold, re-bucketing signatures written with another one"""
+        with self._lock, self._conn:
+            if settings:
+                logger.info(f"Re-bucketing near-duplicate signatures for threshold {self.threshold}",
+                            extra=Category.SAVING)
+                self._conn.execute('DELETE FROM buckets')
+                for job_key, signature in self._conn.execute('SELECT job_key, signature FROM signatures').fetchall():
+                    self._insert_buckets(job_key, np.frombuffer(signature, dtype=np.uint32))
+            self._conn.executemany('INSERT OR REPLACE INTO settings (name, value) VALUES (?, ?)',
+                                   [('num_perm', self.hasher.num_perm), ('bands', self.bands), ('rows', self.rows)])
+
+    def _band_keys(self, signature):
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def _insert_buckets(self, job_key, signature):
+        self._conn.executemany('INSERT INTO buckets (band, bucket, job_key) VALUES (?, ?, ?)',
+                               [(band, bucket, job_key) for band, bucket in self._band_keys(signature)])
+
+    def cluster_of(self, job_key):
+        """Cluster of a job already in the index, or None"""
+        with self._lock:
+            row = self._conn.execute('SELECT cluster FROM signatures WHERE job_key = ?', (job_key,)).fetchone()
+        return row[0] if row else None
+
+    def add(self, job):
+        """
+        Add a job and return its cluster
+
+        A job already in the index keeps its cluster. A job without a
+        description is not added, since its title and company alone would
+        cluster unrelated postings.
+
+        Args:
+            job (JobRecord or dict): Job with url, title, company and description
+
+        Returns:
+            str: Cluster ID (the job key of the cluster's first job), or None if the job
+                has no job key, or no description and is not in the index yet
+        """
+        job = as_job_dict(job)
+        job_key = extract_job_key(job.get('url'))
+        if not job_key:
+            return None
+        cluster = self.cluster_of(job_key)
+        if cluster is not None or not job.get('description'):
+            return cluster
+
+        signature = self.hasher.signature(shingles(job_text(job)))
+        band_keys = self._band_keys(signature)
+        with self._lock, self._conn:
+            candidates = set()
+            for band, bucket in band_keys:
+                candidates.update(row[0] for row in self._conn.execute(
+                    'SELECT job_key FROM buckets WHERE band = ? AND bucket = ?', (band, bucket)
+                ))
+            candidates.discard(job_key)
+            cluster, best = job_key, self.threshold
+            for candidate in candidates:
+                candidate_cluster, candidate_signature = self._conn.execute(
+                    'SELECT cluster, signature FROM signatures WHERE job_key = ?', (candidate,)
+                ).fetchone()
+                similarity = np.count_nonzero(np.frombuffer(candidate_signature, dtype=np.uint32) == signature)
+                similarity /= len(signature)
+                if similarity >= best:
+                    cluster, best = candidate_cluster, similarity
+            self._conn.execute('INSERT OR IGNORE INTO signatures (job_key, cluster, signature) VALUES (?, ?, ?)',
+                               (job_key, cluster, signature.tobytes()))
+            self._insert_buckets(job_key, signature)
+        if cluster != job_key:
+            logger.info(f"Job {job_key} is a near duplicate of cluster {cluster} ({best:.0%} similar)",
+                        extra=Category.DESCRIPTION)
+        return cluster
+
+    def stats(self):
+        """
+        Summary of the index
+
+        Returns:
+            dict: 'jobs' indexed, 'clusters', 'duplicate_clusters' (with more than one job)
+                and 'duplicates' (jobs beyond the first of their cluster)
+        """
+        with self._lock:
+            jobs, clusters = self._conn.execute('SELECT COUNT(*), COUNT(DISTINCT cluster) FROM signatures').fetchone()
+            duplicate_clusters = self._conn.execute(
+                'SELECT COUNT(*) FROM (SELECT cluster FROM signatures GROUP BY cluster HAVING COUNT(*) > 1)'
+            ).fetchone()[0]
+        return {'jobs': jobs, 'clusters': clusters, 'duplicate_clusters': duplicate_clusters,
+                'duplicates': jobs - clusters}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
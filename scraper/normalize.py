@@ -0,0 +1,236 @@
+"""
+Vectorised salary and posting-date normalisation over whole job datasets
+"""
+import json
+import os
+import time
+import numpy as np
+import pandas as pd
+from scraper.logging_utils import logger, Category
+from scraper.compaction import iter_snapshot_jobs, snapshot_scraped_at, SCRAPED_AT_FORMAT
+
+# Salary text: an amount, an optional second amount after a range separator, and an optional pay
+# period directly after them ("per annum", "an hour", "/day", "pa"), so words later in the text
+# such as "2 days in office" are not read as the period
+SALARY_PATTERN = (
+    r'(?P<currency>[£$€]|GBP|USD|EUR)?\s?(?P<low>\d[\d,]*(?:\.\d+)?)\s?(?P<low_k>[kK])?'
+    r'(?:\s*(?:-|–|—|to)\s*(?:[£$€]|GBP|USD|EUR)?\s?(?P<high>\d[\d,]*(?:\.\d+)?)\s?(?P<high_k>[kK])?)?'
+    r'(?:\s*(?:(?:per|an?)\s+|/\s*)?(?P<period>\bannum\b|\byear\b|\byr\b|\bp\.?a\b|\bmonth\b|\bweek\b'
+    r'|\bday\b|\bhour\b|\bhr\b|\bp/?h\b))?'
+)
+
+CURRENCY_CODES = {'£': 'GBP', '$': 'USD', '€': 'EUR', 'GBP': 'GBP', 'USD': 'USD', 'EUR': 'EUR'}
+
+PERIODS = {
+    'annum': 'year', 'year': 'year', 'yr': 'year', 'pa': 'year', 'p.a': 'year',
+    'month': 'month', 'week': 'week', 'day': 'day', 'hour': 'hour', 'hr': 'hour', 'ph': 'hour', 'p/h': 'hour',
+}
+
+# Multipliers from a pay period to a year (5-day weeks, 7.5-hour days)
+ANNUAL_FACTORS = {'year': 1, 'month': 12, 'week': 52, 'day': 260, 'hour': 1950}
+
+# Amounts with no stated period: at least this much is taken as yearly, at most HOURLY_MAX as hourly
+YEARLY_MIN = 5000
+HOURLY_MAX = 200
+
+# Annualised salaries outside this range are misparsed text, not pay, and are left empty
+MIN_ANNUAL_SALARY = 1000
+MAX_ANNUAL_SALARY = 1000000
+
+# Relative posting dates, e.g. "Posted 3 days ago", "EmployerActive 30+ days ago", "Just posted", "Today"
+DAYS_AGO_PATTERN = r'(?P<days>\d+)(?P<capped>\+)?\s*days?\s+ago'
+TODAY_PATTERN = r'(?i)just posted|today|hours?\s+ago|minutes?\s+ago'
+
+# Default location of the normalised dataset
+DEFAULT_NORMALIZED_PATH = os.path.join('data', 'compacted', 'jobs_normalized.csv')
+
+def _parse_unique(values, parse):
+    """
+    Parse the distinct values of a column once and spread the result back over the rows
+
+    Salary and date strings repeat heavily, so this reduces the regex work to
+    the number of distinct strings.
+
+    Args:
+        values (pd.Series): Column to parse
+        parse (function): Takes a Series of distinct strings, returns a DataFrame with one row per string
+
+    Returns:
+        pd.DataFrame: parse() output aligned with values
+    """
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    parsed = parse(pd.Series(uniques, dtype=object).astype(str))
+    # Rows with a missing value take the extra all-NA row appended at the end
+    parsed = pd.concat([parsed, parsed.iloc[:0].reindex([len(parsed)])], ignore_index=True)
+    codes = np.where(codes < 0, len(uniques), codes)
+    return parsed.iloc[codes].set_axis(values.index)
+
+def _amount(digits, thousands):
+    amount = pd.to_numeric(digits.str.replace(',', '', regex=False), errors='coerce')
+    return amount.where(thousands.isna(), amount * 1000)
+
+def _parse_salaries(text):
+    parts = text.str.extract(SALARY_PATTERN)
+    low = _amount(parts['low'], parts['low_k'])
+    high = _amount(parts['high'], parts['high_k']).fillna(low)
+    period = parts['period'].str.lower().str.replace(r'\.$', '', regex=True).map(PERIODS)
+    inferred = np.select([high >= YEARLY_MIN, high <= HOURLY_MAX], ['year', 'hour'], default=None)
+    period = period.fillna(pd.Series(inferred, index=period.index)).where(low.notna())
+    factors = period.map(ANNUAL_FACTORS).astype('float64')
+    annual_min, annual_max = low * factors, high * factors
+    plausible = (annual_min >= MIN_ANNUAL_SALARY) & (annual_max <= MAX_ANNUAL_SALARY)
+    return pd.DataFrame({
+        'salary_min': low,
+        'salary_max': high,
+        'salary_currency': parts['currency'].map(CURRENCY_CODES),
+        'salary_period': period,
+        'salary_annual_min': annual_min.where(plausible),
+        'salary_annual_max': annual_max.where(plausible),
+    })
+
+def normalize_salaries(salary, default_currency=None):
+    """
+    Split free-text salaries into numeric ranges, currency and pay period
+
+    Args:
+        salary (pd.Series): Salary text, e.g. "£45,000 - £55,000 per annum" or "£12.50 an hour"
+        default_currency (str, optional): Currency for salaries without a symbol, e.g. 'GBP'
+
+    Returns:
+        pd.DataFrame: salary_min, salary_max, salary_currency, salary_period ('year', 'month',
+            'week', 'day' or 'hour'; inferred from the amount when not stated) and the
+            salaries annualised as salary_annual_min / salary_annual_max (empty when outside
+            MIN_ANNUAL_SALARY to MAX_ANNUAL_SALARY)
+    """
+    result = _parse_unique(salary, _parse_salaries)
+    if default_currency:
+        result['salary_currency'] = result['salary_currency'].where(
+            result['salary_min'].isna() | result['salary_currency'].notna(), default_currency
+        )
+    return result
+
+def _parse_posted(text):
+    days = text.str.extract(DAYS_AGO_PATTERN)
+    today = text.str.contains(TODAY_PATTERN, regex=True, na=False)
+    return pd.DataFrame({
+        'days_ago': pd.to_numeric(days['days'], errors='coerce').where(~today, 0),
+        'capped': days['capped'].notna(),
+    })
+
+def normalize_posted_dates(date_posted, scraped_at):
+    """
+    Resolve relative posting dates against the time each job was scraped
+
+    Args:
+        date_posted (pd.Series): Card text, e.g. "Posted 3 days ago" or "EmployerActive 30+ days ago"
+        scraped_at (pd.Series or datetime): When each job's card was scraped
+
+    Returns:
+        pd.DataFrame: posted_date (datetime64, midnight of the posting day, NaT when the text has
+            no age) and posted_date_capped (True for "30+ days ago", where the job is older)
+    """
+    parsed = _parse_unique(date_posted, _parse_posted)
+    scraped_day = pd.to_datetime(scraped_at)
+    scraped_day = scraped_day.dt.normalize() if isinstance(scraped_day, pd.Series) else scraped_day.normalize()
+    return pd.DataFrame({
+        'posted_date': scraped_day - pd.to_timedelta(parsed['days_ago'], unit='D'),
+        'posted_date_capped': parsed['capped'].fillna(False).astype(bool),
+    }, index=date_posted.index)
+
+def _ai_field(ai_data, key):
+    """One field of the ai_data column, which holds dicts or JSON strings"""
+    def get(value):
+        if isinstance(value, str):
+            try:
+                value = json.loads(value)
+            except ValueError:
+                return None
+        return value.get(key) if isinstance(value, dict) else None
+    return ai_data.map(get, na_action='ignore') if ai_data is not None else None
+
+def normalize_jobs(jobs, scraped_at=None, default_currency=None):
+    """
+    Add normalised salary and posting-date columns to a job table
+
+    Args:
+        jobs (pd.DataFrame): Jobs with date_posted and a salary column or ai_data['salary']
+        scraped_at (datetime, optional): Scrape time for every job; by default the
+            frame's scraped_at column is used
+        default_currency (str, optional): Currency for salaries without a symbol
+
+    Returns:
+        pd.DataFrame: jobs with the salary_* and posted_date columns added
+    """
+    salary = jobs['salary'] if 'salary' in jobs else _ai_field(jobs.get('ai_data'), 'salary')
+    if salary is None:
+        salary = pd.Series(None, index=jobs.index, dtype=object)
+    if scraped_at is None:
+        if 'scraped_at' not in jobs:
+            raise ValueError("jobs have no scraped_at column - pass scraped_at")
+        scraped_at = jobs['scraped_at']
+    date_posted = jobs['date_posted'] if 'date_posted' in jobs else pd.Series(None, index=jobs.index, dtype=object)
+    return pd.concat([
+        jobs,
+        normalize_salaries(salary, default_currency),
+        normalize_posted_dates(date_posted, scraped_at),
+    ], axis=1)
+
+def load_snapshot_frame(paths):
+    """
+    Load output files into one DataFrame with a scraped_at column
+
+    Jobs keep the scraped_at recorded during compaction. Other jobs get the
+    timestamp of their file (its modification time when the name has none).
+
+    Args:
+        paths (list): JSON or CSV files written by the scraper or by compaction
+
+    Returns:
+        pd.DataFrame: One row per job
+    """
+    frames = []
+    for path in paths:
+        jobs = pd.DataFrame(list(iter_snapshot_jobs(path)))
+        if jobs.empty:
+            continue
+        scraped_at = snapshot_scraped_at(path)
+        jobs['scraped_at'] = jobs['scraped_at'].fillna(scraped_at) if 'scraped_at' in jobs else scraped_at
+        frames.append(jobs)
+    if not frames:
+        return pd.DataFrame(columns=['date_posted', 'scraped_at'])
+    jobs = pd.concat(frames, ignore_index=True)
+    jobs['scraped_at'] = pd.to_datetime(jobs['scraped_at'], format=SCRAPED_AT_FORMAT)
+    return jobs
+
+def normalize_files(paths, output_path=DEFAULT_NORMALIZED_PATH, default_currency=None):
+    """
+    Normalise output files (or the compacted dataset) and write one CSV
+
+    Args:
+        paths (list): JSON or CSV files written by the scraper or by compaction
+        output_path (str): CSV file for the normalised jobs
+        default_currency (str, optional): Currency for salaries without a symbol
+
+    Returns:
+        dict: 'jobs' written, 'salaries' and 'dates' resolved, 'seconds' spent normalising and 'output'
+    """
+    jobs = load_snapshot_frame(paths)
+    start_time = time.perf_counter()
+    normalized = normalize_jobs(jobs, default_currency=default_currency)
+    elapsed = time.perf_counter() - start_time
+    if os.path.dirname(output_path):
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    if 'ai_data' in normalized:
+        normalized['ai_data'] = normalized['ai_data'].map(
+            lambda value: json.dumps(value, ensure_ascii=False) if isinstance(value, dict) else value
+        )
+    normalized.to_csv(output_path, index=False, date_format='%Y-%m-%d %H:%M:%S')
+    report = {
+        'jobs': len(normalized),
+        'salaries': int(normalized['salary_min'].notna().sum()),
+        'dates': int(normalized['posted_date'].notna().sum()),
+        'seconds': round(elapsed, 3),
+        'output': output_path,
+    }
+    logger.info(f"Normalised {report['jobs']} jobs into {output_path} [OK]", extra=Category.SAVING)
+    return report
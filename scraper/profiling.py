@@ -0,0 +1,264 @@
+"""
+Profiling mode for the Indeed Job Scraper
+"""
+import functools
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from scraper.logging_utils import logger, Category
+from scraper.metrics import MetricsRegistry
+
+# How often the sampling profiler records the stack of every thread
+SAMPLE_INTERVAL_SECONDS = 0.005
+
+# Number of entries in each section of the report
+DEFAULT_TOP_N = 25
+
+# Allocation sites shown for each page boundary
+PAGE_GROWTH_TOP_N = 3
+
+# Frames kept per allocation by tracemalloc - 1 is enough to group by source line
+TRACEMALLOC_FRAMES = 1
+
+# Profiler currently running, if any; stage timers and page boundaries are no-ops without one
+_active_profiler = None
+
+# Code of the stage_timer wrapper, left out of sampled stacks
+_hidden_code = set()
+
+def stage_timer(stage):
+    """
+    Decorator timing every call of a function as a profiling stage
+
+    The wrapped function is called directly when no profiler is running.
+    Stage times are inclusive, so a stage that calls another (e.g. a save
+    calling the description store) also contains its time.
+
+    Args:
+        stage (str): Stage name shown in the profile report
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active_profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            start_time = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record_stage(stage, time.perf_counter() - start_time)
+        _hidden_code.add(wrapper.__code__)
+        return wrapper
+    return decorator
+
+def page_boundary(label):
+    """Take a memory snapshot at the end of a search results page if a profiler is running"""
+    profiler = _active_profiler
+    if profiler is not None:
+        profiler.take_memory_snapshot(label)
+
+def _frame_label(code, cache={}):
+    label = cache.get(code)
+    if label is None:
+        label = cache[code] = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    return label
+
+class StackSampler:
+    """
+    Sampling profiler recording the call stack of every thread at a fixed interval
+
+    Samples are wall-clock, so time spent waiting on the network or a lock is
+    visible alongside CPU time. Stacks are kept as folded-stack counts.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack = []
+                while frame is not None:
+                    if frame.f_code not in _hidden_code:
+                        stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(thread_names.get(ident, f"thread-{ident}"))
+                self.stacks[tuple(reversed(stack))] += 1
+            self.samples += 1
+
+    def write_folded(self, path):
+        """
+        Write the samples in folded-stack format ("thread;outer;...;inner count")
+
+        The file can be rendered with flamegraph.pl, speedscope or inferno.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{';'.join(stack)} {count}\n")
+
+    def top_frames(self, thread_name, top_n):
+        """Return [(frame, self_samples, inclusive_samples)] for one thread, busiest first"""
+        self_counts = Counter()
+        inclusive_counts = Counter()
+        for stack, count in self.stacks.items():
+            if stack[0] != thread_name or len(stack) < 2:
+                continue
+            self_counts[stack[-1]] += count
+            for frame in set(stack[1:]):
+                inclusive_counts[frame] += count
+        return [(frame, self_counts[frame], samples) for frame, samples in inclusive_counts.most_common(top_n)]
+
+class Profiler:
+    """
+    Profiling session combining a stack sampler, stage timers and tracemalloc
+
+    While started, functions decorated with stage_timer record their duration
+    and page_boundary takes a memory snapshot. stop() writes a folded-stack
+    file for flame graphs and a text report with the stage times, the busiest
+    frames and the top allocation sites.
+    """
+
+    def __init__(self, output_dir='logs', sample_interval=SAMPLE_INTERVAL_SECONDS, top_n=DEFAULT_TOP_N):
+        """
+        Initialize the profiler
+
+        Args:
+            output_dir (str): Directory for the profile_<timestamp>.* files
+            sample_interval (float): Seconds between stack samples
+            top_n (int): Number of entries in each report section
+        """
+        self.path_prefix = os.path.join(output_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        self.top_n = top_n
+        self.sampler = StackSampler(sample_interval)
+        self.metrics = MetricsRegistry()
+        self.pages = []
+        self.start_time = None
+        self._baseline = None
+        self._previous = None
+
+    def start(self):
+        global _active_profiler
+        if _active_profiler is not None:
+            raise RuntimeError("A profiler is already running")
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+        self._baseline = self._previous = self._snapshot()
+        self.start_time = time.perf_counter()
+        self.sampler.start()
+        _active_profiler = self
+        logger.info(f"Profiling enabled - reports will be written to {self.path_prefix}.*", extra=Category.STARTING)
+        return self
+
+    def record_stage(self, stage, seconds):
+        self.metrics.observe('stage_duration_seconds', seconds, stage=stage)
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    def take_memory_snapshot(self, label):
+        """
+        Record traced memory and the biggest allocation growth since the previous snapshot
+
+        Args:
+            label (str): Name of the boundary, e.g. 'data engineer | page 3'
+        """
+        snapshot = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        growth = snapshot.compare_to(self._previous, 'lineno')[:PAGE_GROWTH_TOP_N]
+        self.pages.append((label, current, peak, growth))
+        self._previous = snapshot
+
+    def stop(self):
+        """
+        Stop profiling and write the reports
+
+        Returns:
+            dict: {'report': report path, 'folded': folded stacks path, 'text': report text}
+        """
+        global _active_profiler
+        _active_profiler = None
+        elapsed = time.perf_counter() - self.start_time
+        self.sampler.stop()
+        final = self._snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        if os.path.dirname(self.path_prefix):
+            os.makedirs(os.path.dirname(self.path_prefix), exist_ok=True)
+        folded_path = f"{self.path_prefix}.folded"
+        report_path = f"{self.path_prefix}.txt"
+        self.sampler.write_folded(folded_path)
+
+        text = self._render_report(elapsed, final, current, peak)
+        with open(report_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        logger.info(f"Saved profile report to {report_path} and flame graph stacks to {folded_path} [OK]",
+                    extra=Category.SAVING)
+        return {'report': report_path, 'folded': folded_path, 'text': text}
+
+    def _render_report(self, elapsed, final, current, peak):
+        top_n = self.top_n
+        lines = [f"Profile: {elapsed:.2f}s wall time, {self.sampler.samples} samples "
+                 f"every {self.sampler.interval * 1000:.0f}ms", ""]
+
+        lines.append("Stage timers (inclusive wall time)")
+        lines.append(f"  {'stage':<30} {'calls':>7} {'total s':>9} {'% wall':>7} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}")
+        stages = [(labels['stage'], histogram) for name, kind, labels, histogram in self.metrics.series()
+                  if kind == 'histogram']
+        for stage, histogram in sorted(stages, key=lambda item: item[1].total, reverse=True):
+            summary = histogram.summary()
+            lines.append(f"  {stage:<30} {summary['count']:>7} {summary['sum']:>9.3f} "
+                         f"{100 * summary['sum'] / elapsed:>6.1f}% {summary['mean'] * 1000:>9.1f} "
+                         f"{summary['p95'] * 1000:>9.1f} {summary['max'] * 1000:>9.1f}")
+        lines.append("")
+
+        main_thread = threading.main_thread().name
+        main_samples = sum(count for stack, count in self.sampler.stacks.items() if stack[0] == main_thread)
+        lines.append(f"Busiest frames on {main_thread} (sampled, {main_samples} samples)")
+        lines.append(f"  {'self %':>7} {'total %':>8}  frame")
+        for frame, self_samples, inclusive_samples in self.sampler.top_frames(main_thread, top_n):
+            lines.append(f"  {100 * self_samples / max(main_samples, 1):>6.1f}% "
+                         f"{100 * inclusive_samples / max(main_samples, 1):>7.1f}%  {frame}")
+        lines.append("")
+
+        lines.append(f"Memory at page boundaries (traced now {current / 1048576:.1f} MiB, peak {peak / 1048576:.1f} MiB)")
+        for label, page_current, page_peak, growth in self.pages:
+            lines.append(f"  {label}: {page_current / 1048576:.1f} MiB (peak {page_peak / 1048576:.1f} MiB)")
+            for stat in growth:
+                lines.append(f"      {stat.size_diff / 1024:+10.1f} KiB  {stat.traceback}")
+        lines.append("")
+
+        lines.append(f"Top {top_n} allocation sites still held at the end")
+        for stat in final.statistics('lineno')[:top_n]:
+            lines.append(f"  {stat.size / 1024:10.1f} KiB {stat.count:>8} blocks  {stat.traceback}")
+        lines.append("")
+
+        lines.append(f"Top {top_n} allocation growth since profiling started")
+        for stat in final.compare_to(self._baseline, 'lineno')[:top_n]:
+            lines.append(f"  {stat.size_diff / 1024:+10.1f} KiB {stat.count_diff:>+8} blocks  {stat.traceback}")
+        lines.append("")
+        return '\n'.join(lines)
@@ -0,0 +1,124 @@
+"""
+End-of-run performance summaries for the Indeed Job Scraper
+"""
+import json
+import os
+from datetime import datetime
+from scraper.logging_utils import logger, Category
+
+# Histograms whose totals make up the time breakdown, by summary stage
+STAGE_HISTOGRAMS = {
+    'fetch': 'request_latency_seconds',
+    'parse': 'parse_duration_seconds',
+    'save': 'save_duration_seconds',
+    'sleep': 'sleep_duration_seconds',
+}
+
+def _histogram_totals(metrics, name):
+    """Sum and count of a histogram across all its label values"""
+    total = 0.0
+    count = 0
+    for series_name, kind, labels, histogram in metrics.series():
+        if series_name == name and kind == 'histogram':
+            total += histogram.total
+            count += histogram.count
+    return total, count
+
+def build_summary(metrics, wall_seconds, **extra):
+    """
+    Summarise the work recorded in a metrics registry
+
+    Args:
+        metrics (MetricsRegistry): Registry of a search (or the scraper-wide registry for a run)
+        wall_seconds (float): Elapsed wall time covered by the registry
+        **extra: Additional top-level fields (e.g. search terms)
+
+    Returns:
+        dict: Pages, jobs, time per stage, jobs per minute, request latency by page type,
+            slowest requests, retries, failures and estimated / charged credits
+    """
+    stage_seconds = {stage: round(_histogram_totals(metrics, name)[0], 3)
+                     for stage, name in STAGE_HISTOGRAMS.items()}
+    stage_seconds['other'] = round(max(wall_seconds - sum(stage_seconds.values()), 0.0), 3)
+
+    latency = {}
+    failures = {}
+    for name, kind, labels, value in metrics.series():
+        if name == 'request_latency_seconds' and kind == 'histogram':
+            summary = value.summary()
+            latency[labels.get('page_type', 'unknown')] = {
+                key: summary[key] for key in ('count', 'mean', 'p50', 'p95', 'max')
+            }
+        elif name == 'errors_total' and kind == 'counter':
+            failures[labels.get('type', 'unknown')] = value
+
+    jobs = metrics.counter_total('jobs_total')
+    summary = dict(extra)
+    summary.update({
+        'pages': metrics.counter_total('pages_total'),
+        'jobs': jobs,
+        'wall_seconds': round(wall_seconds, 3),
+        'jobs_per_minute': round(jobs * 60 / wall_seconds, 2) if wall_seconds > 0 else None,
+        'stage_seconds': stage_seconds,
+        'requests': _histogram_totals(metrics, 'request_latency_seconds')[1],
+        'request_latency': latency,
+        'retries': metrics.counter_total('request_retries_total'),
+        'failures': sum(failures.values()),
+        'failures_by_type': failures,
+        'credits_estimated': metrics.counter_total('credits_estimated_total'),
+        'credits_charged': metrics.counter_total('credits_charged_total'),
+        'slowest_requests': metrics.slowest('requests'),
+    })
+    return summary
+
+def format_summary(summary, title):
+    """
+    Render a summary as printable text
+
+    Args:
+        summary (dict): Result of build_summary
+        title (str): Heading line
+
+    Returns:
+        str: Multi-line summary
+    """
+    wall = summary['wall_seconds'] or 1e-9
+    lines = [title, '-' * len(title)]
+    lines.append(f"Pages: {summary['pages']}   Jobs: {summary['jobs']}   "
+                 f"Wall time: {summary['wall_seconds']:.1f}s   Jobs/min: {summary['jobs_per_minute'] or 0:.1f}")
+    lines.append("Time: " + "   ".join(
+        f"{stage} {seconds:.1f}s ({100 * seconds / wall:.0f}%)" for stage, seconds in summary['stage_seconds'].items()
+    ))
+    for page_type, latency in sorted(summary['request_latency'].items()):
+        lines.append(f"  {page_type:<7} {latency['count']:>5} requests   mean {latency['mean']:.2f}s   "
+                     f"p50 {latency['p50']:.2f}s   p95 {latency['p95']:.2f}s   max {latency['max']:.2f}s")
+    failures = ', '.join(f"{kind}: {count}" for kind, count in sorted(summary['failures_by_type'].items()))
+    lines.append(f"Requests: {summary['requests']}   Retries: {summary['retries']}   "
+                 f"Failures: {summary['failures']}" + (f" ({failures})" if failures else ''))
+    lines.append(f"Estimated credits: {summary['credits_estimated']:,}   Charged: {summary['credits_charged']:,}")
+    if summary['slowest_requests']:
+        lines.append("Slowest requests:")
+        for request in summary['slowest_requests'][:5]:
+            lines.append(f"  {request['value']:6.2f}s  {request.get('page_type')}  "
+                         f"{request.get('status')}  {request.get('url')}")
+    return '\n'.join(lines)
+
+def write_run_summary(searches, total, path=None):
+    """
+    Write the per-search and aggregate summaries of a run to a JSON file
+
+    Args:
+        searches (list): Per-search summaries
+        total (dict): Aggregate summary
+        path (str, optional): Output file (default: logs/run_summary_<timestamp>.json)
+
+    Returns:
+        str: Path of the written file
+    """
+    path = path or os.path.join('logs', f"run_summary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'searches': searches, 'total': total}, f, indent=2)
+    logger.info(f"Saved run summary to {path} [OK]", extra=Category.SAVING)
+    return path
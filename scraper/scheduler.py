@@ -0,0 +1,202 @@
+"""
+Recurring searches run by the scraper daemon
+"""
+import json
+import math
+import time
+from scraper.logging_utils import logger, Category
+from scraper.run_summary import format_summary
+
+# Posting-age filters Indeed offers (fromage values, in days)
+FROMAGE_DAYS = (1, 3, 7, 14)
+
+# Settings of a scheduled search that the config file may leave out
+SEARCH_DEFAULTS = {
+    'location': 'london',
+    'interval_minutes': 360,
+    'retry_minutes': 30,
+    'initial_days': '',
+    'max_jobs': None,
+    'max_pages': None,
+    'fetch_descriptions': True,
+    'use_ai_extraction': True,
+    'search_budget': None,
+    'sort_by_date': True,
+    'stop_after_known_pages': 2,
+}
+
+# Longest the daemon sleeps before re-reading the clock
+MAX_IDLE_SECONDS = 300
+
+def load_schedule(path):
+    """
+    Load the searches of a schedule config file
+
+    The file is JSON with optional "defaults" and a list of "searches", e.g.
+    {"defaults": {"location": "london", "interval_minutes": 120},
+     "searches": [{"job": "data engineer"}, {"job": "data analyst", "location": "leeds"}]}
+
+    Args:
+        path (str): Config file
+
+    Returns:
+        list: One settings dict per search, with SEARCH_DEFAULTS filled in
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    defaults = dict(SEARCH_DEFAULTS, **config.get('defaults', {}))
+    searches = []
+    for entry in config.get('searches', []):
+        search = dict(defaults, **entry)
+        if not search.get('job'):
+            raise ValueError(f"Scheduled search without a 'job' in {path}: {entry}")
+        unknown = set(search) - set(SEARCH_DEFAULTS) - {'job'}
+        if unknown:
+            raise ValueError(f"Unknown settings {sorted(unknown)} for '{search['job']}' in {path}")
+        searches.append(search)
+    if not searches:
+        raise ValueError(f"No searches configured in {path}")
+    return searches
+
+def schedule_key(search):
+    return f"{search['job'].lower()}|{search['location'].lower()}"
+
+def fromage_for(last_success, now, initial_days=''):
+    """
+    Posting-age filter covering everything since the last successful run
+
+    Args:
+        last_success (float): Start of the last successful run (epoch seconds), or None
+        now (float): Current time (epoch seconds)
+        initial_days (str|int): Filter for the first run (default: '' = no filter)
+
+    Returns:
+        str: fromage value in days, or '' when the gap is longer than Indeed's widest filter
+    """
+    if last_success is None:
+        return str(initial_days) if initial_days else ''
+    days_since = max(math.ceil((now - last_success) / 86400), 1)
+    for days in FROMAGE_DAYS:
+        if days_since <= days:
+            return str(days)
+    return ''
+
+class SearchDaemon:
+    """
+    Runs scheduled searches incrementally against a JobStore
+
+    Each run only asks Indeed for jobs posted since the search last succeeded,
+    and fetches descriptions only for jobs the store does not describe yet.
+    Known jobs get a card refresh (title, location, last_seen). Results are
+    sorted by date, and a run stops after stop_after_known_pages consecutive
+    pages of known jobs. A cycle therefore costs roughly one description
+    request per new job plus a page or two, rather than a full re-crawl.
+    """
+
+    def __init__(self, scraper, store, searches, delay_between_pages=2, delay_between_jobs=1):
+        """
+        Initialize the daemon
+
+        Args:
+            scraper (ScrapingBeeIndeedScraper): Scraper used for the searches
+            store (JobStore): Job store holding the jobs and the run bookkeeping
+            searches (list): Search settings from load_schedule
+            delay_between_pages (int): Delay in seconds between page requests
+            delay_between_jobs (int): Delay in seconds between job description requests
+        """
+        self.scraper = scraper
+        self.store = store
+        self.searches = searches
+        self.delay_between_pages = delay_between_pages
+        self.delay_between_jobs = delay_between_jobs
+
+    def next_run_at(self, search):
+        """Epoch time at which a search is next due"""
+        state = self.store.last_search_run(schedule_key(search))
+        if state['last_attempt'] is None:
+            return 0.0
+        minutes = search['interval_minutes']
+        if state['last_success'] != state['last_attempt']:
+            minutes = min(minutes, search['retry_minutes'])
+        return state['last_attempt'] + minutes * 60
+
+    def run_search(self, search):
+        """
+        Run one scheduled search and record its outcome
+
+        Returns:
+            dict: Search summary (see build_summary), or None if the search raised
+        """
+        key = schedule_key(search)
+        started_at = time.time()
+        date_posted = fromage_for(self.store.last_search_run(key)['last_success'], started_at, search['initial_days'])
+        logger.info(f"Scheduled search '{search['job']}' in '{search['location']}' "
+                    f"(posted within: {date_posted or 'any time'})", extra=Category.STARTING)
+        jobs = 0
+        try:
+            for job in self.scraper.iter_indeed_jobs(
+                search['job'],
+                search['location'],
+                date_posted=date_posted,
+                fetch_descriptions=search['fetch_descriptions'],
+                use_ai_extraction=search['use_ai_extraction'],
+                max_jobs=search['max_jobs'],
+                max_pages=search['max_pages'],
+                delay_between_pages=self.delay_between_pages,
+                delay_between_jobs=self.delay_between_jobs,
+                search_budget=search['search_budget'],
+                known_job_keys=self.store.described_keys,
+                sort_by_date=search['sort_by_date'],
+                stop_after_known_pages=search['stop_after_known_pages'],
+                seen_job_keys=self.store.known_keys
+            ):
+                self.store.upsert_jobs([job])
+                jobs += 1
+        except Exception as e:
+            logger.error(f"Scheduled search '{search['job']}' in '{search['location']}' failed: {str(e)}")
+            self.store.record_search_run(key, started_at, False, jobs)
+            return None
+
+        summary = self.scraper.search_summaries[-1]
+        new_jobs = jobs - summary['jobs_refreshed']
+        self.store.record_search_run(key, started_at, summary['completed'], jobs, new_jobs)
+        if not summary['completed']:
+            logger.warning(f"Search '{search['job']}' in '{search['location']}' stopped early - "
+                           f"it will be retried in {search['retry_minutes']} minutes")
+        logger.info(f"{new_jobs} new and {summary['jobs_refreshed']} refreshed jobs for '{search['job']}' "
+                    f"in '{search['location']}' [OK]", extra=Category.SUCCESS)
+        return summary
+
+    def run_cycle(self, now=None):
+        """
+        Run every search that is due
+
+        Returns:
+            list: Summaries of the searches that ran
+        """
+        now = time.time() if now is None else now
+        summaries = []
+        for search in self.searches:
+            if self.next_run_at(search) <= now:
+                summary = self.run_search(search)
+                if summary is not None:
+                    print(format_summary(summary, f"{search['job']} in {search['location']}"))
+                    summaries.append(summary)
+        return summaries
+
+    def run(self, once=False):
+        """
+        Run due searches until interrupted
+
+        Args:
+            once (bool): Run the searches that are due once and return
+        """
+        logger.info(f"Daemon started with {len(self.searches)} scheduled searches", extra=Category.STARTING)
+        while True:
+            self.run_cycle()
+            if once:
+                return
+            wait = min(self.next_run_at(search) for search in self.searches) - time.time()
+            if wait > 0:
+                logger.info(f"Next search due in {wait / 60:.1f} minutes", extra=Category.NAVIGATION)
+                time.sleep(min(wait, MAX_IDLE_SECONDS))
@@ -0,0 +1,231 @@
+"""
+Local full-text search over scraped jobs
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from scraper.logging_utils import logger
+from scraper.job_record import as_job_dict, extract_job_key
+from scraper.compaction import SCRAPED_AT_FORMAT
+
+# Default location of the on-disk index
+DEFAULT_INDEX_PATH = os.path.join('data', 'search_index.db')
+
+# Relative posting dates as shown on Indeed cards, e.g. "Posted 3 days ago", "EmployerActive 30+ days ago"
+DAYS_AGO_PATTERN = re.compile(r'(\d+)\+?\s*days?\s+ago', re.IGNORECASE)
+TODAY_PATTERN = re.compile(r'just posted|today', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    job_key TEXT UNIQUE NOT NULL,
+    title TEXT,
+    company TEXT,
+    location TEXT,
+    url TEXT,
+    date_posted TEXT,
+    posted_on TEXT,
+    indexed_on TEXT,
+    content_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_posted_on ON jobs (posted_on);
+CREATE INDEX IF NOT EXISTS jobs_location ON jobs (location COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5 (
+    title, company, description,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+def resolve_posted_date(date_posted, reference=None):
+    """
+    Turn an Indeed relative posting date into a calendar date
+
+    Args:
+        date_posted (str): Posting date text from the job card
+        reference (datetime, optional): When the text was scraped (default: now)
+
+    Returns:
+        str: ISO date (YYYY-MM-DD) or None if the text has no recognisable date
+    """
+    reference = reference or datetime.now()
+    if not date_posted:
+        return None
+    match = DAYS_AGO_PATTERN.search(date_posted)
+    if match:
+        return (reference - timedelta(days=int(match.group(1)))).date().isoformat()
+    if TODAY_PATTERN.search(date_posted):
+        return reference.date().isoformat()
+    return None
+
+def _content_hash(job):
+    """Signature of the indexed fields, used to skip re-indexing unchanged jobs"""
+    text = '\x1f'.join(str(job.get(field) or '') for field in ('title', 'company', 'location', 'description'))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+class SearchIndex:
+    """
+    On-disk inverted index over job title, company and description
+
+    Backed by an SQLite FTS5 table, so queries support AND / OR / NOT,
+    "quoted phrases", prefix* terms and column filters (title: python),
+    and return in milliseconds on millions of rows.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        """
+        Open (or create) the index
+
+        Args:
+            path (str): Path of the SQLite index file
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def add_jobs(self, jobs, scraped_at=None):
+        """
+        Add or update jobs in the index
+
+        Jobs whose indexed fields have not changed since they were last added are
+        skipped, so re-saving the same growing job list after every page is cheap.
+        Relative posting dates are resolved against the job's own scraped_at
+        field when it has one, else against scraped_at.
+
+        Args:
+            jobs (list): List of JobRecord objects or job dictionaries
+            scraped_at (datetime, optional): When the jobs were scraped (default: now)
+
+        Returns:
+            int: Number of jobs inserted or updated
+        """
+        now = datetime.now()
+        scraped_at = scraped_at or now
+        changed = 0
+        with self._lock, self._conn:
+            for job in jobs:
+                job = as_job_dict(job)
+                job_key = extract_job_key(job.get('url'))
+                if not job_key:
+                    continue
+                content_hash = _content_hash(job)
+                row = self._conn.execute(
+                    'SELECT id, content_hash, indexed_on FROM jobs WHERE job_key = ?', (job_key,)
+                ).fetchone()
+                if row and row[1] == content_hash:
+                    continue
+
+                indexed_on = row[2] if row else now.date().isoformat()
+                reference = (datetime.strptime(job['scraped_at'], SCRAPED_AT_FORMAT)
+                             if job.get('scraped_at') else scraped_at)
+                values = (
+                    job.get('title'), job.get('company'), job.get('location'), job.get('url'),
+                    job.get('date_posted'), resolve_posted_date(job.get('date_posted'), reference),
+                    indexed_on, content_hash
+                )
+                if row:
+                    job_id = row[0]
+                    self._conn.execute(
+                        'UPDATE jobs SET title = ?, company = ?, location = ?, url = ?, date_posted = ?, '
+                        'posted_on = ?, indexed_on = ?, content_hash = ? WHERE id = ?',
+                        values + (job_id,)
+                    )
+                    self._conn.execute('DELETE FROM jobs_fts WHERE rowid = ?', (job_id,))
+                else:
+                    job_id = self._conn.execute(
+                        'INSERT INTO jobs (title, company, location, url, date_posted, posted_on, '
+                        'indexed_on, content_hash, job_key) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                        values + (job_key,)
+                    ).lastrowid
+                self._conn.execute(
+                    'INSERT INTO jobs_fts (rowid, title, company, description) VALUES (?, ?, ?, ?)',
+                    (job_id, job.get('title') or '', job.get('company') or '', job.get('description') or '')
+                )
+                changed += 1
+
+        if changed:
+            logger.debug(f"Indexed {changed} jobs in {self.path}")
+        return changed
+
+    def search(self, query, location=None, since=None, until=None, limit=20):
+        """
+        Run a full-text query
+
+        Args:
+            query (str): FTS5 query, e.g. 'python AND (airflow OR dagster) NOT senior' or '"machine learning"'
+            location (str, optional): Only jobs whose location contains this text
+            since (str, optional): Only jobs posted on or after this ISO date
+            until (str, optional): Only jobs posted on or before this ISO date
+            limit (int): Maximum number of results
+
+        Returns:
+            tuple: (results, seconds) where results is a list of dicts ordered by relevance
+        """
+        sql = (
+            "SELECT j.job_key, j.title, j.company, j.location, j.date_posted, j.posted_on, j.url, "
+            "snippet(jobs_fts, 2, '[', ']', '...', 12) "
+            "FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid WHERE jobs_fts MATCH ?"
+        )
+        params = [query]
+        if location:
+            sql += " AND j.location LIKE ?"
+            params.append(f"%{location}%")
+        if since:
+            sql += " AND COALESCE(j.posted_on, j.indexed_on) >= ?"
+            params.append(since)
+        if until:
+            sql += " AND COALESCE(j.posted_on, j.indexed_on) <= ?"
+            params.append(until)
+        sql += " ORDER BY bm25(jobs_fts) LIMIT ?"
+        params.append(limit)
+
+        start_time = time.perf_counter()
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            logger.error(f"Invalid search query '{query}': {str(e)}")
+            return [], 0.0
+        elapsed = time.perf_counter() - start_time
+
+        columns = ('job_key', 'title', 'company', 'location', 'date_posted', 'posted_on', 'url', 'snippet')
+        return [dict(zip(columns, row)) for row in rows], elapsed
+
+    def known_keys(self, job_keys):
+        """
+        Return which of job_keys are already indexed
+
+        Args:
+            job_keys (iterable): Indeed job keys
+
+        Returns:
+            set: The subset that is in the index
+        """
+        job_keys = [key for key in job_keys if key]
+        if not job_keys:
+            return set()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_key FROM jobs WHERE job_key IN ({','.join('?' * len(job_keys))})", job_keys
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def optimize(self):
+        """Merge the FTS5 index segments - worth running after large bulk loads"""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT INTO jobs_fts (jobs_fts) VALUES ('optimize')")
+
+    def close(self):
+        self._conn.close()
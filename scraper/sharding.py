@@ -0,0 +1,213 @@
+"""
+Search-space sharding for searches deeper than Indeed's pagination cap
+"""
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scraper.logging_utils import logger, Category
+from scraper.file_utils import generate_filename, save_jobs_to_json, save_jobs_to_csv
+
+# Jobs a single query can reach - Indeed stops paginating after about 40 pages of 15
+DEFAULT_SHARD_CAP = 600
+
+# Shards crawled at the same time
+DEFAULT_SHARD_WORKERS = 4
+
+# Job type filters (jt); together they cover almost every listing
+JOB_TYPES = ('fulltime', 'parttime', 'permanent', 'contract', 'temporary', 'internship')
+
+# Narrowing filters for a shard that cannot be split further, widest first. These are
+# nested rather than disjoint, so they are crawled next to the capped shard to reach more of it.
+RADIUS_NARROWING = ('10', '5', '0')
+FROMAGE_NARROWING = ('14', '7', '3', '1')
+
+class Shard:
+    """A sub-query of a search: location, posting-age filter and extra Indeed URL filters"""
+    __slots__ = ('location', 'date_posted', 'url_params', 'job_count', 'complete')
+
+    def __init__(self, location, date_posted='', url_params=None, job_count=None, complete=True):
+        self.location = location
+        self.date_posted = date_posted
+        self.url_params = dict(url_params or {})
+        self.job_count = job_count
+        self.complete = complete
+
+    def child(self, name, value):
+        """Shard with one more filter: 'location', 'fromage' or an Indeed URL parameter"""
+        if name == 'location':
+            return Shard(value, self.date_posted, self.url_params)
+        if name == 'fromage':
+            return Shard(self.location, value, self.url_params)
+        return Shard(self.location, self.date_posted, dict(self.url_params, **{name: value}))
+
+    def describe(self):
+        filters = [f"fromage={self.date_posted}"] if self.date_posted else []
+        filters += [f"{name}={value}" for name, value in self.url_params.items()]
+        return f"{self.location}" + (f" [{', '.join(filters)}]" if filters else '')
+
+    def __repr__(self):
+        return f"Shard({self.describe()}, jobs={self.job_count})"
+
+def plan_shards(count_jobs, job_location, date_posted='', sub_locations=None, cap=DEFAULT_SHARD_CAP):
+    """
+    Split a search into shards that each fit under the pagination cap
+
+    The search is split by sub-location (if given) and then by job type,
+    recursively, while a shard's job count is above the cap. A shard that is
+    still too large after every split is crawled up to the cap and marked
+    incomplete. It is crawled together with its widest radius and posting-age
+    narrowings that fit under the cap. Those return a different slice of the
+    same jobs, so the union reaches further than the capped shard alone.
+
+    Every count costs one search results request.
+
+    Args:
+        count_jobs (function): Called with a Shard; returns the job count Indeed reports, or None
+        job_location (str): Location of the search
+        date_posted (str): Posting-age filter of the search
+        sub_locations (list, optional): Locations that together cover job_location
+        cap (int): Jobs a single query can reach
+
+    Returns:
+        list: Shards to crawl
+    """
+    dimensions = []
+    if sub_locations:
+        dimensions.append(('location', tuple(sub_locations)))
+    dimensions.append(('jt', JOB_TYPES))
+    return _split(count_jobs, Shard(job_location, date_posted), dimensions, cap)
+
+def _split(count_jobs, shard, dimensions, cap):
+    shard.job_count = count_jobs(shard)
+    if shard.job_count is None or shard.job_count <= cap:
+        return [shard]
+    if not dimensions:
+        return _narrow(count_jobs, shard, cap)
+
+    (name, values), remaining_dimensions = dimensions[0], dimensions[1:]
+    logger.info(f"{shard.describe()} has {shard.job_count:,} jobs (cap {cap:,}) - splitting by {name}",
+                extra=Category.NAVIGATION)
+    shards = []
+    for value in values:
+        shards.extend(_split(count_jobs, shard.child(name, value), remaining_dimensions, cap))
+    covered = sum(child.job_count or 0 for child in shards)
+    if covered < shard.job_count:
+        logger.warning(f"Shards of {shard.describe()} cover about {covered:,} of {shard.job_count:,} jobs")
+    return shards
+
+def _narrow(count_jobs, shard, cap):
+    shard.complete = False
+    shards = [shard]
+    for name, values in (('radius', RADIUS_NARROWING), ('fromage', FROMAGE_NARROWING)):
+        for value in values:
+            if name == 'fromage' and shard.date_posted and int(value) >= int(shard.date_posted):
+                continue
+            narrowed = shard.child(name, value)
+            narrowed.job_count = count_jobs(narrowed)
+            if narrowed.job_count is not None and narrowed.job_count <= cap:
+                shards.append(narrowed)
+                break
+    logger.warning(f"{shard.describe()} has {shard.job_count:,} jobs and cannot be split further - crawling "
+                   f"its first {cap:,} plus {', '.join(s.describe() for s in shards[1:]) or 'no narrower query'}")
+    return shards
+
+def iter_sharded_jobs(scraper, job_position, shards, workers=DEFAULT_SHARD_WORKERS, max_jobs=None, **search_options):
+    """
+    Crawl shards in parallel and yield each job once
+
+    Shards overlap (a job can have several job types), so every job key is
+    claimed by the first shard that lists it. Other shards yield it as a card
+    refresh without a description request, and their copy is dropped.
+
+    Args:
+        scraper (ScrapingBeeIndeedScraper): Scraper shared by the shard threads
+        job_position (str): Job title to search for
+        shards (list): Shards from plan_shards
+        workers (int): Shards crawled at the same time
+        max_jobs (int): Maximum number of unique jobs (default: None = no limit)
+        **search_options: Passed to iter_indeed_jobs (fetch_descriptions, delay_between_pages, ...)
+
+    Yields:
+        JobRecord: Unique jobs, in the order they arrive
+    """
+    results = queue.Queue()
+    claims = {}
+    claims_lock = threading.Lock()
+    stop = threading.Event()
+    finished = object()
+
+    def crawl(index, shard):
+        def claimed_elsewhere(job_keys):
+            with claims_lock:
+                return {key for key in job_keys if claims.setdefault(key, index) != index}
+        try:
+            if stop.is_set():
+                return
+            for job in scraper.iter_indeed_jobs(job_position, shard.location, date_posted=shard.date_posted,
+                                                url_params=shard.url_params, known_job_keys=claimed_elsewhere,
+                                                **search_options):
+                if claims.get(job.job_key) == index:
+                    results.put(job)
+                if stop.is_set():
+                    break
+        except Exception as e:
+            logger.error(f"Shard {shard.describe()} failed: {str(e)}")
+        finally:
+            results.put(finished)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(workers, len(shards))), thread_name_prefix='shard')
+    for index, shard in enumerate(shards):
+        pool.submit(crawl, index, shard)
+    jobs_yielded = 0
+    shards_finished = 0
+    try:
+        while shards_finished < len(shards):
+            item = results.get()
+            if item is finished:
+                shards_finished += 1
+                continue
+            yield item
+            jobs_yielded += 1
+            if max_jobs is not None and jobs_yielded >= max_jobs:
+                break
+    finally:
+        stop.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def scrape_sharded_jobs(scraper, job_position, job_location, date_posted='', sub_locations=None,
+                        cap=DEFAULT_SHARD_CAP, workers=DEFAULT_SHARD_WORKERS, max_jobs=None, **search_options):
+    """
+    Plan, crawl and save a sharded search
+
+    Args:
+        scraper (ScrapingBeeIndeedScraper): Scraper used for the counts and the shards
+        job_position (str): Job title to search for
+        job_location (str): Location to search in
+        date_posted (str): Filter for jobs posted within X days
+        sub_locations (list, optional): Locations that together cover job_location
+        cap (int): Jobs a single query can reach
+        workers (int): Shards crawled at the same time
+        max_jobs (int): Maximum number of unique jobs (default: None = no limit)
+        **search_options: Passed to iter_indeed_jobs
+
+    Returns:
+        tuple: (list of unique jobs, list of shards)
+    """
+    def count_jobs(shard):
+        return scraper.count_jobs(job_position, shard.location, shard.date_posted, shard.url_params)
+
+    shards = plan_shards(count_jobs, job_location, date_posted, sub_locations, cap)
+    logger.info(f"Crawling '{job_position}' in '{job_location}' as {len(shards)} shard(s)", extra=Category.STARTING)
+    search_options['save_progress'] = False
+    jobs = list(iter_sharded_jobs(scraper, job_position, shards, workers, max_jobs, **search_options))
+
+    if jobs:
+        file_country = scraper.file_country()
+        json_path = f"data/{generate_filename(job_position, job_location, 'json', country=file_country)}"
+        csv_path = f"data/{generate_filename(job_position, job_location, 'csv', country=file_country)}"
+        save_jobs_to_json(jobs, job_position, job_location, json_path,
+                          description_store=scraper.description_store, search_index=scraper.search_index)
+        save_jobs_to_csv(jobs, job_position, job_location, csv_path, description_store=scraper.description_store)
+        logger.info(f"Saved {len(jobs)} unique jobs from {len(shards)} shard(s) to {json_path} and {csv_path} [OK]",
+                    extra=Category.SAVING)
+    return jobs, shards
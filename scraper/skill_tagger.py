@@ -0,0 +1,194 @@
+"""
+Skill and keyword tagging of descriptions with an Aho-Corasick automaton
+"""
+import functools
+import os
+from collections import deque
+
+# Vocabulary shipped with the scraper
+DEFAULT_VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), 'skills.txt')
+
+# Characters that continue a term, so "C" is not found in "C++" and "Java" is not found in "JavaScript"
+TERM_CHARACTERS = frozenset('_+#')
+
+# Prefix of a spelling that only matches in exactly that case, e.g. "!Excel" is not found in "excel at"
+EXACT_CASE_PREFIX = '!'
+
+def load_vocabulary(path=DEFAULT_VOCABULARY_PATH):
+    """
+    Read a vocabulary file
+
+    Each line holds a skill as it should appear in the output, or
+    "alias = Skill" to map another spelling to a skill. Blank lines and
+    lines starting with # are ignored. Matching ignores case, except for
+    spellings starting with !, which only match in the case written, so
+    skills that are also everyday words ("!Excel", "!Spring") are not
+    found in ordinary text.
+
+    Args:
+        path (str): Vocabulary file
+
+    Returns:
+        dict: Spelling -> skill; lower-cased, or ! and the exact spelling
+    """
+    vocabulary = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            spelling, _, skill = line.partition('=')
+            spelling = spelling.strip()
+            exact = spelling.startswith(EXACT_CASE_PREFIX)
+            if exact:
+                spelling = spelling[len(EXACT_CASE_PREFIX):].strip()
+            if not spelling:
+                raise ValueError(f"Empty term on line {line_number} of {path}")
+            skill = skill.strip() or spelling
+            vocabulary[EXACT_CASE_PREFIX + spelling if exact else spelling.lower()] = skill
+    return vocabulary
+
+def _is_term_character(character):
+    return character.isalnum() or character in TERM_CHARACTERS
+
+def _fold_case(text):
+    """Lower-case text without changing its length, so match positions also index the original"""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return ''.join(lower if len(lower) == 1 else character
+                   for character, lower in ((character, character.lower()) for character in text))
+
+class SkillTagger:
+    """
+    Finds vocabulary terms in text in one pass, whatever the vocabulary size
+
+    All spellings are compiled into one Aho-Corasick automaton: a trie of the
+    terms whose nodes also link to the longest suffix that is itself a trie
+    prefix. Scanning a text follows one edge per character and falls back
+    along the suffix links on a mismatch, so the work is linear in the text
+    length plus the number of matches. Matches must stand alone: they may not
+    be preceded or followed by a letter, digit, _, + or #, or followed by a
+    "." that starts a word, so "C++", "C#" and ".NET" are found but "Java" is
+    not found inside "JavaScript". Overlapping matches keep the leftmost,
+    longest term, so "SQL Server" is not also counted as "SQL". Terms are
+    matched ignoring case, and exact-case terms are then checked against the
+    original text.
+    """
+
+    def __init__(self, vocabulary):
+        """
+        Compile the automaton
+
+        Args:
+            vocabulary (dict): Spelling -> skill, e.g. from load_vocabulary(); a spelling
+                starting with ! only matches in the case written after it
+        """
+        self.skills = []
+        self._lengths = []
+        # Per term: the spelling the original text must equal, or None when case is ignored
+        self._exact = []
+        # Node 0 is the root; per node: outgoing edges, suffix link and the terms ending there
+        self._edges = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        for spelling, skill in vocabulary.items():
+            if spelling.startswith(EXACT_CASE_PREFIX):
+                self._add(spelling[len(EXACT_CASE_PREFIX):], skill, exact=True)
+            else:
+                self._add(spelling, skill)
+        self._link()
+
+    @classmethod
+    def from_file(cls, path=DEFAULT_VOCABULARY_PATH):
+        """Tagger for the vocabulary in a file (see load_vocabulary)"""
+        return cls(load_vocabulary(path))
+
+    def _add(self, spelling, skill, exact=False):
+        node = 0
+        for character in _fold_case(spelling):
+            child = self._edges[node].get(character)
+            if child is None:
+                child = len(self._edges)
+                self._edges[node][character] = child
+                self._edges.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = child
+        self._outputs[node].append(len(self.skills))
+        self.skills.append(skill)
+        self._lengths.append(len(spelling))
+        self._exact.append(spelling if exact else None)
+
+    def _link(self):
+        """Set the suffix links breadth first and merge each node's suffix outputs into it"""
+        queue = deque(self._edges[0].values())
+        while queue:
+            node = queue.popleft()
+            for character, child in self._edges[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and character not in self._edges[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._edges[fallback].get(character, 0)
+                if self._fail[child] == child:
+                    self._fail[child] = 0
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def _matches(self, original):
+        """(start, end, term) of every standalone term occurrence in text"""
+        edges, fail, outputs, lengths, exact = self._edges, self._fail, self._outputs, self._lengths, self._exact
+        text = _fold_case(original)
+        matches = []
+        node = 0
+        for end, character in enumerate(text, 1):
+            while node and character not in edges[node]:
+                node = fail[node]
+            node = edges[node].get(character, 0)
+            for term in outputs[node]:
+                start = end - lengths[term]
+                if start > 0 and (_is_term_character(text[start - 1]) or text[start - 1] == '.'):
+                    continue
+                if end < len(text) and (_is_term_character(text[end])
+                                        or (text[end] == '.' and end + 1 < len(text)
+                                            and _is_term_character(text[end + 1]))):
+                    continue
+                if exact[term] is not None and original[start:end] != exact[term]:
+                    continue
+                matches.append((start, end, term))
+        return matches
+
+    def tag(self, text):
+        """
+        Count the vocabulary skills in text
+
+        Args:
+            text (str): Description text
+
+        Returns:
+            dict: Skill -> number of mentions, in order of first mention
+        """
+        if not text:
+            return {}
+        counts = {}
+        covered = 0
+        # Leftmost first, longest first at the same position, skipping matches inside a kept one
+        for start, end, term in sorted(self._matches(text), key=lambda match: (match[0], -match[1])):
+            if start < covered:
+                continue
+            covered = end
+            skill = self.skills[term]
+            counts[skill] = counts.get(skill, 0) + 1
+        return counts
+
+    def tag_batch(self, texts):
+        """Skill counts (see tag) for each of texts"""
+        return [self.tag(text) for text in texts]
+
+    def __len__(self):
+        return len(self.skills)
+
+@functools.lru_cache(maxsize=None)
+def default_tagger():
+    """Shared tagger for the vocabulary shipped with the scraper"""
+    return SkillTagger.from_file(DEFAULT_VOCABULARY_PATH)
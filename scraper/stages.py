@@ -0,0 +1,193 @@
+"""
+Separate listing and description stages backed by the job store
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from scraper.logging_utils import logger, Category
+from scraper.work_queue import new_worker_id
+from scraper.job_store import DEFAULT_CLAIM_SECONDS, DEFAULT_MAX_ENRICH_ATTEMPTS
+
+# Jobs claimed per enrich batch
+DEFAULT_ENRICH_BATCH = 20
+
+# Description requests sent at the same time
+DEFAULT_ENRICH_CONCURRENCY = 4
+
+# Hours during which a listed search is not listed again
+DEFAULT_RELIST_HOURS = 12
+
+def list_search_key(job_position, job_location, date_posted=''):
+    return f"list:{job_position.lower()}|{job_location.lower()}|{date_posted}"
+
+def list_searches(scraper, store, job_titles, locations, date_posted='', max_jobs=None, max_pages=None,
+                  delay_between_pages=2, relist_hours=DEFAULT_RELIST_HOURS, sort_by_date=False,
+                  stop_after_known_pages=None):
+    """
+    Crawl search results pages only and store the job cards
+
+    No description requests are sent. Each search is recorded in the store when
+    it finishes, so re-running after an interruption skips the searches listed
+    within relist_hours and continues with the rest.
+
+    Args:
+        scraper (ScrapingBeeIndeedScraper): Scraper used for the searches
+        store (JobStore): Store the cards are written to
+        job_titles (list): Job titles to search for
+        locations (list): Locations to search in
+        date_posted (str): Filter for jobs posted within X days
+        max_jobs (int): Maximum number of jobs per search
+        max_pages (int): Maximum number of pages per search
+        delay_between_pages (int): Delay in seconds between page requests
+        relist_hours (float): Skip searches listed successfully this recently (0 = never skip)
+        sort_by_date (bool): Sort results newest first
+        stop_after_known_pages (int): Stop a search after this many consecutive pages of stored jobs
+
+    Returns:
+        dict: 'searches' run, 'skipped' and 'failed', and 'jobs' stored
+    """
+    stats = {'searches': 0, 'skipped': 0, 'failed': 0, 'jobs': 0}
+    for job_title in job_titles:
+        for location in locations:
+            key = list_search_key(job_title, location, date_posted)
+            last_success = store.last_search_run(key)['last_success']
+            if relist_hours and last_success is not None and time.time() - last_success < relist_hours * 3600:
+                logger.info(f"'{job_title}' in '{location}' was listed {(time.time() - last_success) / 3600:.1f}h ago "
+                            f"- skipping", extra=Category.NAVIGATION)
+                stats['skipped'] += 1
+                continue
+
+            started_at = time.time()
+            jobs = 0
+            completed = False
+            try:
+                for job in scraper.iter_indeed_jobs(
+                    job_title,
+                    location,
+                    date_posted=date_posted,
+                    fetch_descriptions=False,
+                    use_ai_extraction=False,
+                    max_jobs=max_jobs,
+                    max_pages=max_pages,
+                    delay_between_pages=delay_between_pages,
+                    sort_by_date=sort_by_date,
+                    stop_after_known_pages=stop_after_known_pages,
+                    seen_job_keys=store.known_keys
+                ):
+                    store.upsert_jobs([job])
+                    jobs += 1
+                completed = scraper.search_summaries[-1]['completed']
+            except Exception as e:
+                logger.error(f"Listing '{job_title}' in '{location}' failed: {str(e)}")
+            store.record_search_run(key, started_at, completed, jobs)
+            stats['searches'] += 1
+            stats['jobs'] += jobs
+            if not completed:
+                stats['failed'] += 1
+                logger.warning(f"Listing '{job_title}' in '{location}' stopped early after {jobs} jobs")
+            else:
+                logger.info(f"Listed {jobs} jobs for '{job_title}' in '{location}' [OK]", extra=Category.SUCCESS)
+    return stats
+
+class Enricher:
+    """
+    Fetches missing descriptions for stored jobs in parallel batches
+
+    Each batch claims jobs in the store, so several enrich processes can share
+    one store and an interrupted process leaves its claims to expire. A failed
+    fetch counts against the job, and a job is skipped after max_attempts.
+    Enrichment stops when the credit budget cannot pay for another request,
+    when the circuit breaker opens, or once max_jobs descriptions are stored.
+    """
+
+    def __init__(self, scraper, store, use_ai_extraction=False, batch_size=DEFAULT_ENRICH_BATCH,
+                 concurrency=DEFAULT_ENRICH_CONCURRENCY, claim_seconds=DEFAULT_CLAIM_SECONDS,
+                 prefer_titles=None, order='newest', owner=None, **filters):
+        """
+        Initialize the enricher
+
+        Args:
+            scraper (ScrapingBeeIndeedScraper): Scraper whose budget pays for the descriptions
+            store (JobStore): Store holding the jobs
+            use_ai_extraction (bool): Whether to use AI extraction
+            batch_size (int): Jobs claimed at a time
+            concurrency (int): Description requests sent at the same time
+            claim_seconds (float): Seconds before an unfinished claim expires
+            prefer_titles (list, optional): Jobs whose title contains one of these words come first
+            order (str): 'newest' or 'oldest' jobs first
+            owner (str): Identifier recorded on claims (default: host:pid:random)
+            **filters: title, location, company (substrings), seen_within_days, max_attempts
+        """
+        self.scraper = scraper
+        self.store = store
+        self.use_ai_extraction = use_ai_extraction
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.claim_seconds = claim_seconds
+        self.prefer_titles = prefer_titles
+        self.order = order
+        self.owner = owner or new_worker_id()
+        self.filters = dict(filters)
+        self.filters.setdefault('max_attempts', DEFAULT_MAX_ENRICH_ATTEMPTS)
+        self._job_credits = scraper.request_credits(use_ai_extraction)
+
+    def _fetch(self, job_key, url):
+        try:
+            result = self.scraper.fetch_job_description(url, self.use_ai_extraction, job=self.store.get(job_key))
+        except Exception as e:
+            logger.error(f"Description fetch for {job_key} failed: {str(e)}")
+            result = {}
+        if result.get('conventional'):
+            self.store.set_description(job_key, result['conventional'], result.get('ai'),
+                                       result.get('duplicate_cluster'), result.get('skill_tags'))
+            return True
+        # A request the budget or the open circuit refused is not the job's fault
+        refused = not self.scraper.budget.can_afford(self._job_credits) or self._circuit_open()
+        self.store.release_claim(job_key, self.owner, failed=not refused)
+        return False
+
+    def _circuit_open(self):
+        return self.scraper.circuit is not None and self.scraper.circuit.is_open()
+
+    def run(self, max_jobs=None):
+        """
+        Enrich jobs until none match, the budget runs out or max_jobs are done
+
+        Args:
+            max_jobs (int): Maximum number of descriptions to store (default: None = no limit)
+
+        Returns:
+            dict: 'enriched' and 'failed' job counts and the reason enrichment 'stopped'
+        """
+        stats = {'enriched': 0, 'failed': 0, 'stopped': 'done'}
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='enrich') as pool:
+            while True:
+                if max_jobs is not None and stats['enriched'] >= max_jobs:
+                    stats['stopped'] = 'max_jobs'
+                    break
+                remaining = self.scraper.budget.remaining()
+                if remaining is not None and remaining < self._job_credits:
+                    stats['stopped'] = 'budget'
+                    break
+                if self._circuit_open():
+                    stats['stopped'] = 'circuit_open'
+                    break
+
+                # Claim no more jobs than the budget and max_jobs can still cover
+                limit = self.batch_size
+                if remaining is not None:
+                    limit = min(limit, remaining // self._job_credits)
+                if max_jobs is not None:
+                    limit = min(limit, max_jobs - stats['enriched'])
+                claimed = self.store.claim_undescribed(self.owner, limit, self.claim_seconds,
+                                                       prefer_titles=self.prefer_titles, order=self.order,
+                                                       **self.filters)
+                if not claimed:
+                    break
+
+                logger.info(f"Fetching descriptions for a batch of {len(claimed)} jobs", extra=Category.DESCRIPTION)
+                results = list(pool.map(lambda row: self._fetch(*row), claimed))
+                stats['enriched'] += sum(results)
+                stats['failed'] += len(results) - sum(results)
+                logger.info(f"{stats['enriched']} descriptions stored, {stats['failed']} failed so far",
+                            extra=Category.DESCRIPTION)
+        return stats
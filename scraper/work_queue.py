@@ -0,0 +1,302 @@
+"""
+Durable local work queue shared by scraper worker processes
+"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+# Default location of the queue file
+DEFAULT_QUEUE_PATH = os.path.join('data', 'work_queue.db')
+
+# Seconds a leased task stays invisible to other workers before it is handed out again
+DEFAULT_VISIBILITY_TIMEOUT = 300
+
+# Attempts before a task is marked failed
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Delay before a failed attempt is retried, doubled on each attempt
+RETRY_BACKOFF_SECONDS = 30
+
+# Task states
+PENDING = 'pending'
+LEASED = 'leased'
+DONE = 'done'
+FAILED = 'failed'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    dedupe_key TEXT UNIQUE,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL,
+    available_at REAL NOT NULL,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_ready ON tasks (status, priority DESC, available_at);
+"""
+
+def new_worker_id():
+    """Identifier for a worker: host, process ID and a random suffix"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+class Task:
+    """A leased task"""
+    __slots__ = ('id', 'kind', 'payload', 'attempts', 'lease_owner')
+
+    def __init__(self, id, kind, payload, attempts, lease_owner):
+        self.id = id
+        self.kind = kind
+        self.payload = payload
+        self.attempts = attempts
+        self.lease_owner = lease_owner
+
+    def __repr__(self):
+        return f"Task({self.id}, {self.kind!r}, attempt {self.attempts})"
+
+class WorkQueue:
+    """
+    SQLite-backed task queue with leases and visibility timeouts
+
+    A worker leases a task for a visibility timeout. While the lease is held
+    no other worker receives the task. If the worker completes it, the task is
+    done. If the worker crashes or stalls, the lease expires and the task is
+    handed out again. Delivery is therefore at-least-once, and task handlers
+    must be idempotent. Enqueueing is idempotent too: a task with the same
+    dedupe key is not added twice while it is pending or leased.
+
+    Several processes (or machines sharing the file on a network volume) can
+    use the same queue file; every state change is one short IMMEDIATE
+    transaction.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, wal=True):
+        """
+        Open (or create) the queue
+
+        Args:
+            path (str): Path of the SQLite queue file
+            wal (bool): Use write-ahead logging; disable it when the file is on a
+                network volume, where WAL is not supported
+        """
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, isolation_level=None, check_same_thread=False)
+        self._conn.execute(f"PRAGMA journal_mode={'WAL' if wal else 'DELETE'}")
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(SCHEMA)
+
+    def _transaction(self, statements):
+        """Run statements(conn) inside BEGIN IMMEDIATE ... COMMIT and return its result"""
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                result = statements(self._conn)
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+            return result
+
+    def enqueue(self, kind, payload, dedupe_key=None, priority=0, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        """
+        Add a task
+
+        A task whose dedupe_key already exists is left alone while it is pending
+        or leased, and re-armed if it is done or failed, so enqueueing the same
+        work again is safe.
+
+        Args:
+            kind (str): Task type, e.g. 'search' or 'description'
+            payload (dict): JSON-serialisable task arguments
+            dedupe_key (str, optional): Identity of the work (default: no deduplication)
+            priority (int): Higher priorities are leased first
+            max_attempts (int): Attempts before the task is marked failed
+
+        Returns:
+            bool: True if a task was added or re-armed
+        """
+        now = time.time()
+        def insert(conn):
+            cursor = conn.execute(
+                'INSERT INTO tasks (kind, payload, dedupe_key, priority, status, max_attempts, available_at, '
+                'created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT (dedupe_key) DO UPDATE SET payload = excluded.payload, priority = excluded.priority, '
+                'status = excluded.status, attempts = 0, max_attempts = excluded.max_attempts, '
+                'available_at = excluded.available_at, lease_owner = NULL, lease_expires = NULL, '
+                'last_error = NULL, updated_at = excluded.updated_at '
+                'WHERE tasks.status IN (?, ?)',
+                (kind, json.dumps(payload), dedupe_key, priority, PENDING, max_attempts, now, now, now, DONE, FAILED)
+            )
+            return cursor.rowcount > 0
+        return self._transaction(insert)
+
+    def lease(self, worker_id, kinds=None, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """
+        Lease the next ready task
+
+        Ready tasks are pending tasks whose retry delay has passed and leased
+        tasks whose lease has expired (their worker crashed or stalled). An
+        expired task that has used up its attempts is marked failed instead.
+
+        Args:
+            worker_id (str): Identifier of the leasing worker
+            kinds (list, optional): Only lease tasks of these kinds
+            visibility_timeout (float): Seconds before the task is handed out again
+
+        Returns:
+            Task: The leased task, or None if no task is ready
+        """
+        now = time.time()
+        kind_filter = ''
+        kind_params = ()
+        if kinds:
+            kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})"
+            kind_params = tuple(kinds)
+
+        def take(conn):
+            conn.execute(
+                'UPDATE tasks SET status = ?, last_error = ?, lease_owner = NULL, updated_at = ? '
+                'WHERE status = ? AND lease_expires < ? AND attempts >= max_attempts',
+                (FAILED, 'lease expired on final attempt', now, LEASED, now)
+            )
+            row = conn.execute(
+                'SELECT id, kind, payload, attempts FROM tasks '
+                'WHERE ((status = ? AND available_at <= ?) OR (status = ? AND lease_expires < ?))'
+                + kind_filter + ' ORDER BY priority DESC, id LIMIT 1',
+                (PENDING, now, LEASED, now) + kind_params
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                'UPDATE tasks SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires = ?, '
+                'updated_at = ? WHERE id = ?',
+                (LEASED, worker_id, now + visibility_timeout, now, row[0])
+            )
+            return Task(row[0], row[1], json.loads(row[2]), row[3] + 1, worker_id)
+        return self._transaction(take)
+
+    def heartbeat(self, task, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT):
+        """
+        Extend the lease of a long-running task
+
+        Returns:
+            bool: False if the lease was lost (it expired and another worker took the task)
+        """
+        now = time.time()
+        def extend(conn):
+            return conn.execute(
+                'UPDATE tasks SET lease_expires = ?, updated_at = ? WHERE id = ? AND status = ? AND lease_owner = ?',
+                (now + visibility_timeout, now, task.id, LEASED, task.lease_owner)
+            ).rowcount > 0
+        return self._transaction(extend)
+
+    def complete(self, task):
+        """
+        Mark a task done
+
+        Returns:
+            bool: False if the lease had been lost; the work was still done, and
+                handlers are idempotent, so this only matters for reporting
+        """
+        now = time.time()
+        def finish(conn):
+            return conn.execute(
+                'UPDATE tasks SET status = ?, lease_owner = NULL, lease_expires = NULL, last_error = NULL, '
+                'updated_at = ? WHERE id = ? AND lease_owner = ?',
+                (DONE, now, task.id, task.lease_owner)
+            ).rowcount > 0
+        return self._transaction(finish)
+
+    def fail(self, task, error, retry_delay=None):
+        """
+        Record a failed attempt; the task is retried with exponential backoff until
+        it runs out of attempts
+
+        Args:
+            task (Task): Leased task
+            error (str): Error description
+            retry_delay (float, optional): Seconds before the retry (default: exponential backoff)
+        """
+        now = time.time()
+        delay = retry_delay if retry_delay is not None else RETRY_BACKOFF_SECONDS * 2 ** (task.attempts - 1)
+        def record(conn):
+            conn.execute(
+                'UPDATE tasks SET status = CASE WHEN attempts >= max_attempts THEN ? ELSE ? END, '
+                'available_at = ?, lease_owner = NULL, lease_expires = NULL, last_error = ?, updated_at = ? '
+                'WHERE id = ? AND lease_owner = ?',
+                (FAILED, PENDING, now + delay, str(error)[:1000], now, task.id, task.lease_owner)
+            )
+        self._transaction(record)
+
+    def release(self, task, delay=0):
+        """
+        Give a leased task back without counting the attempt (e.g. on shutdown)
+
+        Args:
+            task (Task): Leased task
+            delay (float): Seconds before the task can be leased again
+        """
+        now = time.time()
+        def give_back(conn):
+            conn.execute(
+                'UPDATE tasks SET status = ?, attempts = MAX(attempts - 1, 0), available_at = ?, '
+                'lease_owner = NULL, lease_expires = NULL, updated_at = ? WHERE id = ? AND lease_owner = ?',
+                (PENDING, now + delay, now, task.id, task.lease_owner)
+            )
+        self._transaction(give_back)
+
+    def requeue_failed(self, kinds=None):
+        """
+        Make failed tasks pending again with fresh attempts
+
+        Returns:
+            int: Number of tasks re-queued
+        """
+        now = time.time()
+        kind_filter = f" AND kind IN ({','.join('?' * len(kinds))})" if kinds else ''
+        def requeue(conn):
+            return conn.execute(
+                'UPDATE tasks SET status = ?, attempts = 0, available_at = ?, updated_at = ? WHERE status = ?'
+                + kind_filter,
+                (PENDING, now, now, FAILED) + tuple(kinds or ())
+            ).rowcount
+        return self._transaction(requeue)
+
+    def counts(self):
+        """
+        Number of tasks per kind and status
+
+        Returns:
+            dict: {kind: {status: count}}
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status').fetchall()
+        result = {}
+        for kind, status, count in rows:
+            result.setdefault(kind, {})[status] = count
+        return result
+
+    def outstanding(self):
+        """Number of tasks that are pending or leased"""
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM tasks WHERE status IN (?, ?)', (PENDING, LEASED)
+            ).fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,265 @@
+"""
+Queue workers that run searches and fetch job descriptions
+"""
+import multiprocessing
+import time
+from scraper.core import ScrapingBeeIndeedScraper
+from scraper.logging_utils import logger, Category
+from scraper.job_record import extract_job_key
+from scraper.job_store import JobStore, DEFAULT_JOB_STORE_PATH
+from scraper.work_queue import WorkQueue, DEFAULT_QUEUE_PATH, DEFAULT_VISIBILITY_TIMEOUT, new_worker_id
+
+# Task kinds
+SEARCH_TASK = 'search'
+DESCRIPTION_TASK = 'description'
+
+# Description tasks are leased before searches so enriched jobs land early
+DESCRIPTION_PRIORITY = 1
+
+# Seconds an idle worker waits before polling the queue again
+DEFAULT_POLL_INTERVAL = 5
+
+def search_dedupe_key(job_position, job_location, date_posted=''):
+    return f"search:{job_position.lower()}|{job_location.lower()}|{date_posted}"
+
+def enqueue_search(queue, job_position, job_location, date_posted='', fetch_descriptions=True,
+                   use_ai_extraction=True, max_jobs=None, max_pages=None, priority=0):
+    """
+    Add a search task to the queue
+
+    Args:
+        queue (WorkQueue): Queue to add to
+        job_position (str): Job title to search for
+        job_location (str): Location to search in
+        date_posted (str): Filter for jobs posted within X days
+        fetch_descriptions (bool): Whether to queue description tasks for the jobs found
+        use_ai_extraction (bool): Whether the description tasks use AI extraction
+        max_jobs (int): Maximum number of jobs to process
+        max_pages (int): Maximum number of pages to scrape
+        priority (int): Higher priorities are leased first
+
+    Returns:
+        bool: True if the task was added (False if the same search is already queued)
+    """
+    payload = {
+        'job_position': job_position,
+        'job_location': job_location,
+        'date_posted': date_posted,
+        'fetch_descriptions': fetch_descriptions,
+        'use_ai_extraction': use_ai_extraction,
+        'max_jobs': max_jobs,
+        'max_pages': max_pages,
+    }
+    return queue.enqueue(SEARCH_TASK, payload, dedupe_key=search_dedupe_key(job_position, job_location, date_posted),
+                         priority=priority)
+
+class Worker:
+    """
+    Single-process worker: leases tasks, runs them and records the results
+
+    Search tasks scrape the results pages only, store the job cards and queue
+    one description task per job that has no description yet. Description
+    tasks fetch one job page. Both write through JobStore upserts, so a task
+    that is delivered twice produces the same rows.
+
+    While the scraper's circuit breaker is open, the worker leases nothing,
+    and a task that failed because the circuit opened is released back to the
+    queue without using up an attempt.
+    """
+
+    def __init__(self, queue, store, scraper, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT,
+                 delay_between_pages=2, delay_between_jobs=1, worker_id=None):
+        """
+        Initialize the worker
+
+        Args:
+            queue (WorkQueue): Task queue
+            store (JobStore): Job store the results are written to
+            scraper (ScrapingBeeIndeedScraper): Scraper used to run the tasks
+            visibility_timeout (float): Lease length in seconds, renewed while a search runs
+            delay_between_pages (int): Delay in seconds between search results pages
+            delay_between_jobs (int): Delay in seconds after each description task
+            worker_id (str): Identifier recorded on leases (default: host:pid:random)
+        """
+        self.queue = queue
+        self.store = store
+        self.scraper = scraper
+        self.visibility_timeout = visibility_timeout
+        self.delay_between_pages = delay_between_pages
+        self.delay_between_jobs = delay_between_jobs
+        self.worker_id = worker_id or new_worker_id()
+        self.handlers = {
+            SEARCH_TASK: self.run_search,
+            DESCRIPTION_TASK: self.run_description,
+        }
+
+    def run_search(self, task):
+        """Scrape the results pages of a search and queue its description tasks"""
+        payload = task.payload
+        last_heartbeat = time.monotonic()
+        jobs_found = 0
+        for job in self.scraper.iter_indeed_jobs(
+            payload['job_position'],
+            payload['job_location'],
+            date_posted=payload.get('date_posted', ''),
+            fetch_descriptions=False,
+            use_ai_extraction=False,
+            max_jobs=payload.get('max_jobs'),
+            max_pages=payload.get('max_pages'),
+            delay_between_pages=self.delay_between_pages,
+            save_progress=False
+        ):
+            self.store.upsert_jobs([job])
+            jobs_found += 1
+            job_key = extract_job_key(job.url)
+            wants_description = payload.get('fetch_descriptions', True) or payload.get('use_ai_extraction', True)
+            if wants_description and job_key and not self.store.has_description(job_key):
+                self.queue.enqueue(
+                    DESCRIPTION_TASK,
+                    {'job_key': job_key, 'url': job.url, 'use_ai_extraction': payload.get('use_ai_extraction', True)},
+                    dedupe_key=f"{DESCRIPTION_TASK}:{job_key}",
+                    priority=DESCRIPTION_PRIORITY
+                )
+            # Renew the lease well before it expires so a long search is not handed out twice
+            if time.monotonic() - last_heartbeat > self.visibility_timeout / 3:
+                if not self.queue.heartbeat(task, self.visibility_timeout):
+                    logger.warning(f"Lease on {task} was lost - another worker may repeat it")
+                last_heartbeat = time.monotonic()
+
+        summary = self.scraper.search_summaries[-1] if self.scraper.search_summaries else {}
+        if not summary.get('pages'):
+            raise RuntimeError("no search results page could be retrieved")
+        if not summary.get('completed') and self._circuit_open():
+            raise RuntimeError("the ScrapingBee circuit opened before the search finished")
+        logger.info(f"Search task {task.id} stored {jobs_found} jobs [OK]", extra=Category.SUCCESS)
+
+    def run_description(self, task):
+        """Fetch and store the description of one job"""
+        payload = task.payload
+        job_key = payload['job_key']
+        if self.store.has_description(job_key):
+            logger.info(f"Description for {job_key} already stored - skipping", extra=Category.DESCRIPTION)
+            return
+        result = self.scraper.fetch_job_description(payload['url'], payload.get('use_ai_extraction', True),
+                                                    job=self.store.get(job_key))
+        if not result.get('conventional'):
+            raise RuntimeError(f"no description extracted from {payload['url']}")
+        self.store.set_description(job_key, result['conventional'], result.get('ai'),
+                                   result.get('duplicate_cluster'), result.get('skill_tags'))
+        time.sleep(self.delay_between_jobs)
+
+    def _circuit_open(self):
+        return self.scraper.circuit is not None and self.scraper.circuit.is_open()
+
+    def run_once(self):
+        """
+        Lease and run one task
+
+        Returns:
+            bool: False if no task was ready, or the circuit breaker is open
+        """
+        if self._circuit_open():
+            return False
+        task = self.queue.lease(self.worker_id, visibility_timeout=self.visibility_timeout)
+        if task is None:
+            return False
+        handler = self.handlers.get(task.kind)
+        try:
+            if handler is None:
+                raise ValueError(f"unknown task kind {task.kind!r}")
+            handler(task)
+        except KeyboardInterrupt:
+            self.queue.release(task)
+            raise
+        except Exception as e:
+            if self._circuit_open():
+                delay = self.scraper.circuit.retry_after()
+                logger.warning(f"{task} interrupted by the open ScrapingBee circuit - released for {delay:.0f}s")
+                self.queue.release(task, delay=delay)
+                return True
+            logger.error(f"{task} failed: {str(e)}")
+            self.queue.fail(task, f"{type(e).__name__}: {e}")
+        else:
+            self.queue.complete(task)
+        return True
+
+    def run(self, exit_when_empty=False, poll_interval=DEFAULT_POLL_INTERVAL):
+        """
+        Process tasks until interrupted
+
+        Args:
+            exit_when_empty (bool): Stop once no task is pending or leased
+            poll_interval (float): Seconds to wait when no task is ready
+
+        Returns:
+            int: Number of tasks processed
+        """
+        processed = 0
+        logger.info(f"Worker {self.worker_id} started", extra=Category.STARTING)
+        while True:
+            if self.run_once():
+                processed += 1
+                continue
+            if exit_when_empty and self.queue.outstanding() == 0:
+                break
+            time.sleep(poll_interval)
+        logger.info(f"Worker {self.worker_id} finished after {processed} tasks", extra=Category.SUCCESS)
+        return processed
+
+def run_worker_process(queue_path=DEFAULT_QUEUE_PATH, store_path=DEFAULT_JOB_STORE_PATH, wal=True,
+                       exit_when_empty=False, poll_interval=DEFAULT_POLL_INTERVAL, credit_budget=None, **worker_options):
+    """
+    Entry point of a worker process: open the queue and store and run a Worker
+
+    Args:
+        queue_path (str): Queue file
+        store_path (str): Job store file
+        wal (bool): Use write-ahead logging on both files
+        exit_when_empty (bool): Stop once no task is pending or leased
+        poll_interval (float): Seconds to wait when no task is ready
+        credit_budget (int): Credit budget of this worker process (default: unlimited)
+        **worker_options: Passed to Worker (visibility_timeout, delay_between_pages, delay_between_jobs)
+
+    Returns:
+        int: Number of tasks processed
+    """
+    queue = WorkQueue(queue_path, wal=wal)
+    store = JobStore(store_path, wal=wal)
+    scraper = ScrapingBeeIndeedScraper(credit_budget=credit_budget)
+    try:
+        return Worker(queue, store, scraper, **worker_options).run(exit_when_empty, poll_interval)
+    except KeyboardInterrupt:
+        logger.warning("Worker interrupted - leased task released")
+        return 0
+    finally:
+        queue.close()
+        store.close()
+
+def run_workers(workers, **options):
+    """
+    Start worker processes and wait for them to exit
+
+    A worker process that dies (crash, OOM kill) leaves its task leased; the
+    lease expires after the visibility timeout and another worker repeats it.
+
+    Args:
+        workers (int): Number of worker processes
+        **options: Passed to run_worker_process
+
+    Returns:
+        list: Exit codes of the worker processes
+    """
+    processes = [
+        multiprocessing.Process(target=run_worker_process, kwargs=options, name=f"scraper-worker-{index}")
+        for index in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        # Workers receive the interrupt too and release their tasks; give them time to finish
+        for process in processes:
+            process.join(timeout=30)
+    return [process.exitcode for process in processes]